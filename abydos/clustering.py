@@ -20,15 +20,20 @@
 
 The clustering module implements clustering algorithms such as:
     - string fingerprinting
+    - mean pairwise similarity & (parallelized) pairwise similarity matrices
 """
 
 from __future__ import unicode_literals
 from __future__ import division
 import unicodedata
+import multiprocessing
+import os
+import tempfile
+import numpy
 from ._compat import _unicode, _range
 from .phonetic import double_metaphone
 from .qgram import QGrams
-from .distance import sim
+from .distance import sim, metric_info, _batch_scorer
 from .stats import hmean
 
 
@@ -166,8 +171,200 @@ def omission_key(word):
     return key
 
 
+def _condensed_index(num, i, j):
+    """Return the index of the pair (i, j) in a condensed matrix
+
+    A condensed matrix holds the upper triangle (excluding the diagonal) of an
+    num x num matrix as a flat array, in row-major order.
+
+    :param int num: the number of rows (& columns) in the full matrix
+    :param int i, j: the row & column of the pair (i < j)
+    :returns: the index of (i, j) in the condensed matrix
+    :rtype: int
+    """
+    return num*i - i*(i+1)//2 + j - i - 1
+
+
+# set in each worker process by _pairwise_init, to spare sending the
+# collection with every tile
+_PAIRWISE_STATE = {}
+
+
+def _pairwise_init(collection, metric, filename, shape, mirror=False):
+    """Initialize a pairwise_matrix worker process
+
+    :param list collection: the collection of terms
+    :param function metric: the similarity metric function
+    :param str filename: the file backing the shared result matrix
+    :param tuple shape: the shape of the result matrix
+    :param bool mirror: if True, the metric is symmetric, so only the upper
+        triangle of a full matrix is computed & then mirrored
+    """
+    _PAIRWISE_STATE['collection'] = collection
+    _PAIRWISE_STATE['metric'] = metric
+    _PAIRWISE_STATE['mirror'] = mirror
+    # pylint: disable=no-member
+    _PAIRWISE_STATE['matrix'] = numpy.memmap(filename, dtype=numpy.float64,
+                                             mode='r+', shape=shape)
+    # pylint: enable=no-member
+
+
+def _pairwise_tile(tile):
+    """Compute a tile of a pairwise similarity matrix
+
+    Values are written to the matrix in _PAIRWISE_STATE, which is condensed if
+    it is 1-dimensional.
+
+    :param tuple tile: the first & last+1 rows & columns of the tile
+    """
+    row_start, row_stop, col_start, col_stop = tile
+    collection = _PAIRWISE_STATE['collection']
+    metric = _PAIRWISE_STATE['metric']
+    matrix = _PAIRWISE_STATE['matrix']
+    mirror = _PAIRWISE_STATE.get('mirror', False)
+    num = len(collection)
+
+    for i in _range(row_start, row_stop):
+        # the metric's batch kernel, if it has one, preprocesses
+        # collection[i] once for the whole row
+        score = _batch_scorer(collection[i], metric)
+        if matrix.ndim == 1:
+            j_start = max(col_start, i+1)
+            if j_start >= col_stop:
+                continue
+            offset = _condensed_index(num, i, j_start)
+            for j in _range(j_start, col_stop):
+                matrix[offset + j - j_start] = score(collection[j])
+        elif mirror:
+            # for a symmetric metric, only the upper triangle of a full
+            # matrix is computed, and each value is copied below the diagonal
+            for j in _range(max(col_start, i), col_stop):
+                matrix[i, j] = matrix[j, i] = score(collection[j])
+        else:
+            for j in _range(col_start, col_stop):
+                matrix[i, j] = score(collection[j])
+    if isinstance(matrix, numpy.memmap):
+        matrix.flush()
+
+
+def pairwise_matrix(collection, metric=sim, symmetric=True, n_jobs=1,
+                    filename=None, tile_size=256):
+    """Pairwise similarity matrix of a collection of strings
+
+    Computes the similarity between each pair of members of a collection.
+
+    For a symmetric metric, only the upper triangle of the matrix is computed
+    and it is returned in condensed form (as by scipy's pdist): a flat array
+    of the n*(n-1)/2 similarities of each pair (i, j), i < j, in row-major
+    order. Otherwise, the full n x n matrix is returned, such that
+    matrix[i, j] = metric(collection[i], collection[j]).
+
+    The matrix is computed in square tiles of pairs, which are distributed
+    over n_jobs worker processes. Where the metric has a batch kernel (as used
+    by abydos.distance.sim_many), each row of a tile is computed with it. To
+    compute matrices larger than will fit in memory, supply a filename, in
+    which case the matrix is built in a numpy.memmap backed by that file
+    (which is returned), rather than in memory.
+
+    :param list collection: a collection of terms or a string that can be split
+    :param function metric: a similarity metric function (this must be
+        picklable, i.e. defined at the top level of a module, if n_jobs is not
+        1)
+    :param bool symmetric: set to True if metric(a, b) equals metric(b, a),
+        in which case only the condensed upper triangle is computed (if this
+        is False, but abydos.distance.metric_info reports that the metric is
+        symmetric, the full matrix is returned, but only its upper triangle is
+        computed)
+    :param int n_jobs: the number of worker processes to use; if this is less
+        than 1, one worker per CPU is used
+    :param str filename: a file in which to store the matrix as a
+        numpy.memmap (by default, None, meaning the matrix is returned as an
+        in-memory array)
+    :param int tile_size: the number of rows & columns in each tile
+    :returns: the pairwise similarity matrix (condensed if symmetric)
+    :rtype: numpy.ndarray
+    """
+    if hasattr(collection, 'split'):
+        collection = collection.split()
+    if not hasattr(collection, '__iter__'):
+        raise ValueError('collection is neither a string nor iterable type')
+    collection = list(collection)
+    if not hasattr(metric, '__call__'):
+        raise ValueError('metric must be a function')
+    if tile_size < 1:
+        raise ValueError('tile_size must be at least 1')
+    if n_jobs < 1:
+        n_jobs = multiprocessing.cpu_count()
+
+    num = len(collection)
+    shape = (num*(num-1)//2,) if symmetric else (num, num)
+    if 0 in shape:
+        # pylint: disable=no-member
+        return numpy.zeros(shape, dtype=numpy.float64)
+        # pylint: enable=no-member
+
+    # a full matrix of a metric known to be symmetric need only have its
+    # upper triangle computed
+    info = metric_info(metric)
+    mirror = not symmetric and info is not None and info.symmetric
+
+    # the tiles of the upper triangle (incl. the diagonal), or of all pairs
+    tiles = [(i, min(i+tile_size, num), j, min(j+tile_size, num))
+             for i in _range(0, num, tile_size)
+             for j in _range(i if symmetric or mirror else 0, num,
+                             tile_size)]
+
+    if n_jobs == 1:
+        # pylint: disable=no-member
+        if filename is None:
+            matrix = numpy.zeros(shape, dtype=numpy.float64)
+        else:
+            matrix = numpy.memmap(filename, dtype=numpy.float64, mode='w+',
+                                  shape=shape)
+        # pylint: enable=no-member
+        _PAIRWISE_STATE.update(collection=collection, metric=metric,
+                               matrix=matrix, mirror=mirror)
+        try:
+            for tile in tiles:
+                _pairwise_tile(tile)
+        finally:
+            _PAIRWISE_STATE.clear()
+        return matrix
+
+    temp_file = None
+    if filename is None:
+        temp_fd, temp_file = tempfile.mkstemp(suffix='.dat')
+        os.close(temp_fd)
+    # create the file, which each worker then opens for writing
+    # pylint: disable=no-member
+    matrix = numpy.memmap(filename or temp_file, dtype=numpy.float64,
+                          mode='w+', shape=shape)
+    # pylint: enable=no-member
+    del matrix
+
+    pool = multiprocessing.Pool(n_jobs, _pairwise_init,
+                                (collection, metric, filename or temp_file,
+                                 shape, mirror))
+    try:
+        pool.map(_pairwise_tile, tiles)
+    finally:
+        pool.close()
+        pool.join()
+
+    # pylint: disable=no-member
+    matrix = numpy.memmap(filename or temp_file, dtype=numpy.float64,
+                          mode='r+', shape=shape)
+    # pylint: enable=no-member
+    if temp_file is not None:
+        in_memory = numpy.array(matrix)
+        del matrix
+        os.remove(temp_file)
+        return in_memory
+    return matrix
+
+
 def mean_pairwise_similarity(collection, metric=sim,
-                             meanfunc=hmean, symmetric=False):
+                             meanfunc=hmean, symmetric=False, n_jobs=1):
     """Mean pairwise similarity of a collection of strings
 
     Takes the mean of the pairwise similarity between each member of a
@@ -180,6 +377,8 @@ def mean_pairwise_similarity(collection, metric=sim,
         returns a float
     :param bool symmetric: set to True if all pairwise similarities should be
         calculated in both directions
+    :param int n_jobs: the number of worker processes with which to compute
+        the pairwise similarities, as in pairwise_matrix()
     :returns: the mean pairwise similarity of a collection of strings
     :rtype: str
     """
@@ -192,13 +391,25 @@ def mean_pairwise_similarity(collection, metric=sim,
 
     collection = list(collection)
 
-    pairwise_values = []
-
-    for i in _range(len(collection)):
-        for j in _range(i+1, len(collection)):
-            pairwise_values.append(metric(collection[i], collection[j]))
-            if symmetric:
-                pairwise_values.append(metric(collection[j], collection[i]))
+    info = metric_info(metric)
+    if symmetric and info is not None and info.symmetric:
+        # the similarities in the two directions are known to be equal, so
+        # each is computed only once
+        pairwise_values = []
+        for value in pairwise_matrix(collection, metric, True,
+                                     n_jobs).tolist():
+            pairwise_values.append(value)
+            pairwise_values.append(value)
+    elif symmetric:
+        matrix = pairwise_matrix(collection, metric, False, n_jobs)
+        pairwise_values = []
+        for i in _range(len(collection)):
+            for j in _range(i+1, len(collection)):
+                pairwise_values.append(matrix[i, j])
+                pairwise_values.append(matrix[j, i])
+    else:
+        pairwise_values = pairwise_matrix(collection, metric, True,
+                                          n_jobs).tolist()
 
     if not hasattr(meanfunc, '__call__'):
         raise ValueError('meanfunc must be a function')
@@ -24,14 +24,25 @@ for use within Abydos, including implementations of the following:
     - arithmetic coding functions (ac_train, ac_encode, & ac_decode)
     - Burrows-Wheeler transform encoder/decoder (bwt_encode & bwt_decode)
     - Run-Length Encoding encoder/decoder (rle_encode & rle_decode)
+    - a Compressor class, which measures (and caches) the compressed lengths
+      of strings, for the normalized compression distance
 """
 
 from __future__ import unicode_literals
 from __future__ import division
-from collections import Counter
+import codecs
+import sys
+import zlib
+from collections import Counter, OrderedDict
 from itertools import groupby
 from .util import Rational
 from ._compat import _unicode, _long, _range
+try:
+    import lzma
+except ImportError:  # pragma: no cover
+    # If the system lacks the lzma library, that's fine, but lzma compression
+    # won't be supported.
+    pass
 
 
 def ac_train(text):
@@ -251,3 +262,200 @@ def rle_decode(text, use_bwt=True):
     if use_bwt:
         text = bwt_decode(text)
     return text
+
+
+class Compressor(object):
+    """A compressor that measures the compressed lengths of strings
+
+    This measures lengths as dist_compression does, excluding the headers
+    that the bz2, lzma, and zlib formats add to every compressed string. The
+    compressed lengths of single strings are kept in a least recently used
+    cache, so that a string that is compared to many others is compressed
+    only once. Only lengths are retained, never the compressed strings. To
+    compare one string to many, the concatenations may be compressed by a
+    compressor primed with that string (see primed & ncd_many).
+    """
+
+    # the length of the header of each compressed string, which is excluded
+    # from its length
+    _header_lengths = {'bz2': 15, 'lzma': 14, 'zlib': 2}
+
+    def __init__(self, compressor='bz2', probs=None, cache_size=4096):
+        """Initialize Compressor
+
+        :param str compressor: a compression scheme, from the following:
+
+                - `zlib` -- standard zlib/gzip
+                - `bz2` -- bzip2
+                - `lzma` -- Lempel–Ziv–Markov chain algorithm
+                - `arith` -- arithmetic coding
+                - `rle` -- run-length encoding
+                - `bwtrle` -- Burrows-Wheeler transform followed by
+                  run-length encoding
+
+            As in dist_compression, any other value selects zlib.
+        :param dict probs: a dictionary trained with ac_train (required for
+            the arith compressor)
+        :param int cache_size: the maximum number of compressed lengths of
+            single strings to cache (0 disables the cache)
+        """
+        if compressor not in frozenset(['bz2', 'lzma', 'arith', 'rle',
+                                        'bwtrle']):
+            compressor = 'zlib'
+        if compressor == 'lzma' and 'lzma' not in sys.modules:
+            raise ValueError('Install the PylibLZMA module in order to use ' +
+                             'lzma compression similarity')
+        if compressor == 'arith' and probs is None:
+            raise ValueError('The arith compressor requires a dictionary ' +
+                             'trained with ac_train.')
+        self.compressor = compressor
+        self.probs = probs
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+
+    def _compressed_length(self, text):
+        """Return the compressed length of text, without consulting the cache
+
+        :param str text: the string to compress
+        :returns: the compressed length of text, in bytes (or in bits, for
+            the arith compressor, or characters, for the rle & bwtrle
+            compressors)
+        :rtype: int
+        """
+        if self.compressor == 'arith':
+            return ac_encode(text, self.probs)[1]
+        if self.compressor in frozenset(['rle', 'bwtrle']):
+            if self.compressor == 'bwtrle':
+                text = bwt_encode(text)
+            # the length of rle_encode(text, False), without building it
+            length = 0
+            for _, group in groupby(text):
+                run = len(list(group))
+                length += len(str(run)) + 1 if run > 2 else run
+            return length
+
+        text = text.encode('utf-8')
+        if self.compressor == 'bz2':
+            comp = codecs.encode(text, 'bz2_codec')
+        elif self.compressor == 'lzma':
+            comp = lzma.compress(text)
+        else:
+            comp = codecs.encode(text, 'zlib_codec')
+        # (an empty string compresses to less than a bz2 header)
+        return max(0, len(comp) - self._header_lengths[self.compressor])
+
+    def length(self, text):
+        """Return the compressed length of text
+
+        :param str text: the string to compress
+        :returns: the compressed length of text
+        :rtype: int
+        """
+        if not self.cache_size:
+            return self._compressed_length(text)
+        try:
+            length = self._cache.pop(text)
+        except KeyError:
+            length = self._compressed_length(text)
+            if len(self._cache) >= self.cache_size:
+                self._cache.popitem(last=False)
+        # (re-)inserting text marks it as the most recently used
+        self._cache[text] = length
+        return length
+
+    def concat_length(self, src, tar, both_orders=True):
+        """Return the compressed length of the concatenation of two strings
+
+        :param str src, tar: the two strings to concatenate
+        :param bool both_orders: if True, the lesser of the compressed lengths
+            of src+tar & tar+src is returned; otherwise, only src+tar is
+            compressed
+        :returns: the compressed length of the concatenation
+        :rtype: int
+        """
+        length = self._compressed_length(src+tar)
+        if both_orders:
+            length = min(length, self._compressed_length(tar+src))
+        return length
+
+    def primed(self, src):
+        """Return a function measuring the compressed lengths of src followed
+        by other strings
+
+        For zlib, a compressor is primed with src only once, and each string
+        is fed to a copy of it, so the cost of each measurement is
+        proportional to the length of that string alone. (The compressors of
+        the other schemes cannot be copied, so for them, the concatenation is
+        compressed in full.)
+
+        :param str src: the string to prime the compressor with
+        :returns: a function of a string, tar, returning the compressed
+            length of src+tar
+        :rtype: function
+        """
+        if self.compressor != 'zlib':
+            return lambda tar: self._compressed_length(src+tar)
+
+        primer = zlib.compressobj()
+        primed_length = len(primer.compress(src.encode('utf-8')))
+
+        def _length(tar):
+            """Return the compressed length of src+tar
+            """
+            comp = primer.copy()
+            return (primed_length + len(comp.compress(tar.encode('utf-8'))) +
+                    len(comp.flush()) - self._header_lengths['zlib'])
+
+        return _length
+
+    def ncd(self, src, tar, both_orders=True):
+        """Return the normalized compression distance of two strings
+
+        :param str src, tar: two strings to be compared
+        :param bool both_orders: if True, both concatenations of src & tar
+            are compressed, as in dist_compression; otherwise, only src+tar
+        :returns: normalized compression distance
+        :rtype: float
+        """
+        if src == tar:
+            return 0.0
+        return _ncd(self.length(src), self.length(tar),
+                    self.concat_length(src, tar, both_orders))
+
+    def ncd_many(self, src, tars, both_orders=True):
+        """Yield the normalized compression distances of src & each of tars
+
+        The concatenations src+tar are compressed with a compressor primed
+        with src (see primed), so with both_orders set to False, the cost of
+        each distance is proportional to the length of tar alone.
+
+        :param str src: the string that all of tars are compared to
+        :param tars: a collection of strings to compare to src
+        :param bool both_orders: if True, both concatenations of src & each
+            tar are compressed, as in dist_compression; otherwise, only
+            src+tar
+        :returns: the normalized compression distance of src & each tar
+        :rtype: generator
+        """
+        concat_length = self.primed(src)
+        src_comp = self.length(src)
+        for tar in tars:
+            if tar == src:
+                yield 0.0
+                continue
+            concat_comp = concat_length(tar)
+            if both_orders:
+                concat_comp = min(concat_comp,
+                                  self._compressed_length(tar+src))
+            yield _ncd(src_comp, self.length(tar), concat_comp)
+
+
+def _ncd(src_comp, tar_comp, concat_comp):
+    """Return the normalized compression distance, given compressed lengths
+
+    :param int src_comp, tar_comp: the compressed lengths of two strings
+    :param int concat_comp: the compressed length of their concatenation
+    :returns: normalized compression distance
+    :rtype: float
+    """
+    return (concat_comp - min(src_comp, tar_comp)) / max(src_comp, tar_comp)
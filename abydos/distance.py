@@ -35,7 +35,8 @@ The distance module implements string edit distance functions including:
     - Longest common substring
     - Ratcliff-Obershelp similarity & distance
     - Match Rating Algorithm similarity
-    - Normalized Compression Distance (NCD) & similarity
+    - Normalized Compression Distance (NCD) & similarity (incl. NCD
+      matrices)
     - Monge-Elkan similarity & distance
     - Matrix similarity
     - Needleman-Wunsch score
@@ -47,7 +48,14 @@ The distance module implements string edit distance functions including:
       distance
     - Bag distance (incl. a [0, 1] normalized variant)
     - Editex distance (incl. a [0, 1] normalized variant)
-    - TF-IDF similarity
+    - TF-IDF similarity (incl. a document-frequency index, TfidfIndex)
+
+The properties of each of these functions (whether it is symmetric, a true
+metric, integer-valued, etc.) are available from metric_info().
+
+Any of these functions may be passed Profile objects in place of strings;
+a Profile caches the q-grams, normal forms, etc. that the functions compute
+from a string, so that they are computed only once.
 
 Functions beginning with the prefixes 'sim' and 'dist' are guaranteed to be
 in the range [0, 1], and sim_X = 1 - dist_X since the two are complements.
@@ -60,22 +68,250 @@ from __future__ import division
 from ._compat import _range, _unicode
 import numpy
 import sys
+import heapq
 import math
-from collections import defaultdict, Counter
+from collections import defaultdict, Counter, namedtuple
 from .qgram import QGrams
 from .phonetic import mra
-import codecs
-from .compression import ac_train, ac_encode, rle_encode
+from .compression import ac_train, Compressor, _ncd
+from .corpus import Corpus
 import unicodedata
-try:
-    import lzma
-except ImportError:  # pragma: no cover
-    # If the system lacks the lzma library, that's fine, but lzma comrpession
-    # similarity won't be supported.
-    pass
 
+# The dynamic programming functions fill their matrices one anti-diagonal at
+# a time, with numpy vector operations, once both strings are at least this
+# long; below it, the overhead of the vector operations outweighs the gain.
+_ANTIDIAGONAL_MIN_LENGTH = 48
+
+# lcsseq traces back the subsequence in linear memory (by Hirschberg's
+# algorithm), rather than from a full length matrix, once the matrix would
+# have at least this many cells.
+_HIRSCHBERG_MIN_CELLS = 2**20
+
+
+def _antidiagonals(len_src, len_tar):
+    """Yield the cells of a dynamic programming matrix by anti-diagonal
+
+    Each cell (i, j) of a Wagner-Fischer-style matrix depends only on
+    (i-1, j-1), (i-1, j), and (i, j-1), which lie on the two preceding
+    anti-diagonals (i+j is constant along an anti-diagonal), so all of the
+    cells of an anti-diagonal can be computed at once, from the same values
+    and with the same operations as a cell-by-cell loop would use.
+
+    :param int len_src, len_tar: the lengths of the two strings
+    :returns: for each anti-diagonal, in order, the (i, j) index arrays of its
+        cells with i in [1, len_src] & j in [1, len_tar]
+    :rtype: generator
+    """
+    for diag in _range(2, len_src+len_tar+1):
+        # pylint: disable=no-member
+        i = numpy.arange(max(1, diag-len_tar), min(len_src, diag-1)+1)
+        # pylint: enable=no-member
+        yield i, diag-i
+
+
+def _symbol_codes(word, codes=None):
+    """Return a string encoded as an array of integer symbol codes
+
+    :param str word: a string
+    :param dict codes: a dict mapping symbols to codes, to which any new
+        symbols are added (by default, a new dict)
+    :returns: the symbols of word, each encoded as the order in which it was
+        first added to codes
+    :rtype: numpy.ndarray
+    """
+    if codes is None:
+        codes = {}
+    # pylint: disable=no-member
+    word_codes = numpy.array([codes.setdefault(char, len(codes)) for char in
+                              word], dtype=numpy.int)
+    # pylint: enable=no-member
+    return word_codes
+
+
+def _sim_table(src, tar, sim_func):
+    """Return a table of sim_func's values for the symbols of src & tar
+
+    This lets sim_func be called once per pair of distinct symbols, rather
+    than once per pair of positions.
+
+    :param str src, tar: two strings
+    :param function sim_func: a function that returns the similarity of two
+        characters
+    :returns: the symbol codes of src & of tar, and a table whose [a, b]
+        value is sim_func of the src symbol coded a & the tar symbol coded b
+    :rtype: tuple
+    """
+    src_symbols = {}
+    tar_symbols = {}
+    src_codes = _symbol_codes(src, src_symbols)
+    tar_codes = _symbol_codes(tar, tar_symbols)
+    # pylint: disable=no-member
+    table = numpy.array([[sim_func(src_char, tar_char) for tar_char in
+                          sorted(tar_symbols, key=tar_symbols.get)]
+                         for src_char in sorted(src_symbols,
+                                                key=src_symbols.get)],
+                        dtype=numpy.float).reshape(len(src_symbols),
+                                                   len(tar_symbols))
+    # pylint: enable=no-member
+    return src_codes, tar_codes, table
+
+
+def _antidiagonal_sims(src, tar, sim_func):
+    """Yield the interior cells of each anti-diagonal of an alignment matrix
+
+    This supports filling an alignment matrix an anti-diagonal at a time
+    while keeping only the last three anti-diagonals, each held in an array
+    indexed by row. The cells (i-1, j-1), (i-1, j), & (i, j-1) that cell
+    (i, j) depends on are then at index i-1 of the anti-diagonal before last
+    and at indices i-1 & i of the last, so a whole anti-diagonal can be
+    computed from slices of those two.
+
+    :param str src, tar: two strings to be compared
+    :param function sim_func: a function that returns the similarity of two
+        characters
+    :returns: for each anti-diagonal (diag = i+j), from 1 to
+        len(src)+len(tar), the tuple (diag, i_lo, i_hi, sim_vals), where
+        i_lo to i_hi (inclusive) are the rows of its cells that have i & j of
+        at least 1, and sim_vals holds sim_func(src[i-1], tar[j-1]) for each
+    :rtype: generator
+    """
+    src_codes, tar_codes, sim_table = _sim_table(src, tar, sim_func)
+    tar_codes = tar_codes[::-1]
+    len_src, len_tar = len(src), len(tar)
+    for diag in _range(1, len_src+len_tar+1):
+        i_lo = max(1, diag-len_tar)
+        i_hi = min(len_src, diag-1)
+        # tar[j-1] for j = diag-i is reversed tar[len_tar-diag+i]
+        yield diag, i_lo, i_hi, sim_table[
+            src_codes[i_lo-1:i_hi],
+            tar_codes[len_tar-diag+i_lo:len_tar-diag+i_hi+1]]
+
+
+def _lcsseq_len_bitparallel(src, tar):
+    """Return the length of the longest common subsequence of src & tar
 
-def levenshtein(src, tar, mode='lev', cost=(1, 1, 1, 1)):
+    :param str src, tar: two strings to be compared
+    :returns: the length of the longest common subsequence
+    :rtype: int
+    """
+    peq = _bitparallel_profile(src)
+    mask = (1 << len(src)) - 1
+    # the 0 bits of v mark the positions of src that end a longer common
+    # subsequence than the position before
+    v = mask
+    for char in tar:
+        u = v & peq.get(char, 0)
+        v = ((v + u) | (v - u)) & mask
+    return len(src) - bin(v).count('1')
+
+
+def _band(max_distance, cost, length):
+    """Return the half-width of the diagonal band of an edit distance matrix
+
+    Any cell further than this from the diagonal (in the direction of an
+    edit with the given cost) requires more than max_distance worth of those
+    edits to reach, so it cannot lie on an alignment within max_distance.
+
+    :param max_distance: the maximum distance of interest
+    :param cost: the cost of an insertion (or deletion)
+    :param int length: the length of the string, used if cost is 0
+    :returns: the band's half-width
+    :rtype: int
+    """
+    if cost > 0:
+        return int(max_distance // cost)
+    return length
+
+
+def _bitparallel_profile(src):
+    """Return the match bit-vectors of each character of src
+
+    :param str src: the string to profile
+    :returns: a dict mapping each character of src to an int, whose i-th bit
+        is set iff src[i] is that character
+    :rtype: dict
+    """
+    if isinstance(src, Profile):
+        return src.bitparallel
+    peq = defaultdict(int)
+    for i, char in enumerate(src):
+        peq[char] |= 1 << i
+    return dict(peq)
+
+
+def _levenshtein_bitparallel(src, tar, osa=False, max_distance=None,
+                             peq=None):
+    """Return the unit-cost Levenshtein (or OSA) distance of src & tar
+
+    This is the bit-vector algorithm of Myers, as reformulated by Hyyrö, with
+    Hyyrö's extension for transpositions when osa is True. Cf.
+    Myers, Gene. 1999. "A fast bit-vector algorithm for approximate string
+    matching based on dynamic programming." Journal of the ACM, 46(3).
+    395--415.
+    Hyyrö, Heikki. 2003. "A bit-vector algorithm for computing Levenshtein
+    and Damerau edit distances." Nordic Journal of Computing, 10(1). 29--39.
+
+    Each column of the Wagner-Fischer matrix is encoded in a pair of Python
+    ints, whose bits represent the vertical +1/-1 deltas, so a whole column is
+    computed with a handful of word-level operations.
+
+    :param str src, tar: two (non-empty) strings to be compared
+    :param bool osa: if True, the Optimal String Alignment distance is
+        computed
+    :param int max_distance: if set, stop as soon as the distance is known to
+        exceed this value & return max_distance + 1
+    :param dict peq: the profile of src, as returned by _bitparallel_profile,
+        if it has already been computed
+    :returns: the Levenshtein (or OSA) distance between src & tar
+    :rtype: int
+    """
+    if peq is None:
+        # Both distances are symmetric under unit costs, so encode the longer
+        # string as the bit-vector & iterate over the shorter one.
+        if len(src) < len(tar):
+            src, tar = tar, src
+        peq = _bitparallel_profile(src)
+
+    all_ones = (1 << len(src)) - 1
+    last_bit = 1 << (len(src) - 1)
+    v_pos = all_ones
+    v_neg = 0
+    d_zero = 0
+    prev_eq = 0
+    distance = len(src)
+    remaining = len(tar)
+
+    for char in tar:
+        eq_mask = peq.get(char, 0)
+        if osa:
+            # transpositions are detected from the previous column's D0
+            trans = ((~d_zero & eq_mask) << 1) & prev_eq
+            prev_eq = eq_mask
+        d_zero = (((eq_mask & v_pos) + v_pos) ^ v_pos) | eq_mask | v_neg
+        if osa:
+            d_zero |= trans
+        h_pos = v_neg | (~(d_zero | v_pos) & all_ones)
+        h_neg = d_zero & v_pos
+
+        if h_pos & last_bit:
+            distance += 1
+        elif h_neg & last_bit:
+            distance -= 1
+
+        # each remaining column can lower the distance by at most 1
+        remaining -= 1
+        if max_distance is not None and distance - remaining > max_distance:
+            return max_distance + 1
+
+        h_pos = ((h_pos << 1) | 1) & all_ones
+        h_neg = (h_neg << 1) & all_ones
+        v_pos = h_neg | (~(d_zero | h_pos) & all_ones)
+        v_neg = h_pos & d_zero
+
+    return distance
+
+
+def levenshtein(src, tar, mode='lev', cost=(1, 1, 1, 1), max_distance=None):
     """Levenshtein distance
 
     This is the standard edit distance measure. Cf.
@@ -89,6 +325,16 @@ def levenshtein(src, tar, mode='lev', cost=(1, 1, 1, 1)):
     The ordinary Levenshtein & Optimal String Alignment distance both
     employ the Wagner-Fischer dynamic programming algorithm. Cf.
     https://en.wikipedia.org/wiki/Wagner%E2%80%93Fischer_algorithm
+    When all costs are 1, the same distances are instead computed with the
+    much faster bit-parallel algorithm of Myers & Hyyrö. Otherwise, the
+    matrix for long strings is filled an anti-diagonal at a time, with numpy
+    vector operations.
+
+    If max_distance is set, only the diagonal band of the matrix that could
+    hold an alignment costing at most max_distance is computed (cf. Ukkonen,
+    Esko. 1985. "Algorithms for approximate string matching." Information
+    and Control, 64(1-3). 100--118.) and computation stops as soon as the
+    distance is known to exceed max_distance.
 
     Levenshtein edit distance ordinarily has unit insertion, deletion, and
     substitution costs.
@@ -108,6 +354,9 @@ def levenshtein(src, tar, mode='lev', cost=(1, 1, 1, 1)):
     :param tuple cost: a 4-tuple representing the cost of the four possible
         edits: inserts, deletes, substitutions, and transpositions,
         respectively (by default: (1, 1, 1, 1))
+    :param max_distance: the maximum distance of interest; if the distance
+        exceeds this, max_distance + 1 is returned instead (by default: None,
+        in which case the distance is always computed in full)
     :returns: the Levenshtein distance between src & tar
     :rtype: int (may return a float if cost has float values)
     """
@@ -115,24 +364,74 @@ def levenshtein(src, tar, mode='lev', cost=(1, 1, 1, 1)):
 
     if src == tar:
         return 0
+
+    if max_distance is not None:
+        if len(src) > len(tar):
+            min_distance = (len(src) - len(tar)) * del_cost
+        else:
+            min_distance = (len(tar) - len(src)) * ins_cost
+        if min_distance > max_distance:
+            return max_distance + 1
+
     if len(src) == 0:
         return len(tar) * ins_cost
     if len(tar) == 0:
         return len(src) * del_cost
 
     if 'dam' in mode:
-        return damerau_levenshtein(src, tar, cost)
+        return damerau_levenshtein(src, tar, cost, max_distance)
+
+    if ins_cost == del_cost == sub_cost == 1 and (mode != 'osa' or
+                                                  trans_cost == 1):
+        return _levenshtein_bitparallel(src, tar, mode == 'osa', max_distance)
 
     # pylint: disable=no-member
-    d_mat = numpy.zeros((len(src)+1, len(tar)+1), dtype=numpy.int)
+    if max_distance is None:
+        d_mat = numpy.zeros((len(src)+1, len(tar)+1), dtype=numpy.int)
+        del_band = len(src)
+        ins_band = len(tar)
+    else:
+        # cells outside the band are left holding max_distance + 1, which is
+        # as good as infinity for the purposes of the computation
+        d_mat = numpy.full((len(src)+1, len(tar)+1), max_distance + 1,
+                           dtype=numpy.int)
+        del_band = _band(max_distance, del_cost, len(src))
+        ins_band = _band(max_distance, ins_cost, len(tar))
     # pylint: enable=no-member
     for i in _range(len(src)+1):
         d_mat[i, 0] = i * del_cost
     for j in _range(len(tar)+1):
         d_mat[0, j] = j * ins_cost
 
+    if ((max_distance is None and
+         min(len(src), len(tar)) >= _ANTIDIAGONAL_MIN_LENGTH)):
+        codes = {}
+        src_codes = _symbol_codes(src, codes)
+        tar_codes = _symbol_codes(tar, codes)
+        for i, j in _antidiagonals(len(src), len(tar)):
+            # pylint: disable=no-member
+            cells = numpy.minimum(numpy.minimum(
+                d_mat[i, j-1] + ins_cost,  # ins
+                d_mat[i-1, j] + del_cost),  # del
+                d_mat[i-1, j-1] + numpy.where(src_codes[i-1] !=
+                                              tar_codes[j-1], sub_cost, 0)
+            )  # sub/==
+            if mode == 'osa':
+                # (i-2 & j-2 wrap around where i or j is 1, but those cells
+                # are masked out)
+                trans = ((i > 1) & (j > 1) &
+                         (src_codes[i-1] == tar_codes[j-2]) &
+                         (src_codes[i-2] == tar_codes[j-1]))
+                cells = numpy.where(trans, numpy.minimum(
+                    cells, d_mat[i-2, j-2] + trans_cost), cells)  # trans
+            # pylint: enable=no-member
+            d_mat[i, j] = cells
+        return d_mat[len(src), len(tar)]
+
     for i in _range(len(src)):
-        for j in _range(len(tar)):
+        j_lo = max(0, i - del_band)
+        j_hi = min(len(tar), i + ins_band + 1)
+        for j in _range(j_lo, j_hi):
             d_mat[i+1, j+1] = min(
                 d_mat[i+1, j] + ins_cost,  # ins
                 d_mat[i, j+1] + del_cost,  # del
@@ -146,10 +445,18 @@ def levenshtein(src, tar, mode='lev', cost=(1, 1, 1, 1)):
                                           d_mat[i-1, j-1] + trans_cost  # trans
                                           )
 
+        if ((max_distance is not None and
+             min(d_mat[i+1, 0], d_mat[i+1, j_lo+1:j_hi+1].min()) >
+             max_distance)):
+            return max_distance + 1
+
+    if max_distance is not None and d_mat[len(src), len(tar)] > max_distance:
+        return max_distance + 1
     return d_mat[len(src), len(tar)]
 
 
-def dist_levenshtein(src, tar, mode='lev', cost=(1, 1, 1, 1)):
+def dist_levenshtein(src, tar, mode='lev', cost=(1, 1, 1, 1),
+                     max_distance=None):
     """Levenshtein distance normalized to the interval [0, 1]
 
     The Levenshtein distance is normalized by dividing the Levenshtein distance
@@ -174,14 +481,23 @@ def dist_levenshtein(src, tar, mode='lev', cost=(1, 1, 1, 1)):
     :param tuple cost: a 4-tuple representing the cost of the four possible
         edits: inserts, deletes, substitutions, and transpositions,
         respectively (by default: (1, 1, 1, 1))
+    :param float max_distance: the maximum normalized distance of interest;
+        if the normalized distance exceeds this, 1.0 is returned instead (by
+        default: None, in which case the distance is always computed in full)
     :returns: normalized Levenshtein distance
     :rtype: float
     """
     if src == tar:
         return 0
     ins_cost, del_cost = cost[:2]
-    return (levenshtein(src, tar, mode, cost) /
-            (max(len(src)*del_cost, len(tar)*ins_cost)))
+    normalizer = max(len(src)*del_cost, len(tar)*ins_cost)
+    if max_distance is None:
+        return levenshtein(src, tar, mode, cost) / normalizer
+
+    distance = levenshtein(src, tar, mode, cost, max_distance*normalizer)
+    if distance > max_distance*normalizer:
+        return 1.0
+    return distance / normalizer
 
 
 def sim_levenshtein(src, tar, mode='lev', cost=(1, 1, 1, 1)):
@@ -214,7 +530,7 @@ def sim_levenshtein(src, tar, mode='lev', cost=(1, 1, 1, 1)):
     return 1 - dist_levenshtein(src, tar, mode, cost)
 
 
-def damerau_levenshtein(src, tar, cost=(1, 1, 1, 1)):
+def damerau_levenshtein(src, tar, cost=(1, 1, 1, 1), max_distance=None):
     """Damerau-Levenshtein distance
 
     This computes the Damerau-Levenshtein distance. Cf.
@@ -229,6 +545,9 @@ def damerau_levenshtein(src, tar, cost=(1, 1, 1, 1)):
         edits:
         inserts, deletes, substitutions, and transpositions, respectively
         (by default: (1, 1, 1, 1))
+    :param max_distance: the maximum distance of interest; if the distance
+        exceeds this, max_distance + 1 is returned instead (by default: None,
+        in which case the distance is always computed in full)
     :returns: the Damerau-Levenshtein distance between src & tar
     :rtype: int (may return a float if cost has float values)
     """
@@ -236,6 +555,15 @@ def damerau_levenshtein(src, tar, cost=(1, 1, 1, 1)):
 
     if src == tar:
         return 0
+
+    if max_distance is not None:
+        if len(src) > len(tar):
+            min_distance = (len(src) - len(tar)) * del_cost
+        else:
+            min_distance = (len(tar) - len(src)) * ins_cost
+        if min_distance > max_distance:
+            return max_distance + 1
+
     if len(src) == 0:
         return len(tar) * ins_cost
     if len(tar) == 0:
@@ -247,8 +575,19 @@ def damerau_levenshtein(src, tar, cost=(1, 1, 1, 1)):
                          'an insert plus a delete.')
 
     # pylint: disable=no-member
-    d_mat = (numpy.zeros((len(src))*(len(tar)), dtype=numpy.int).
-             reshape((len(src), len(tar))))
+    if max_distance is None:
+        d_mat = (numpy.zeros((len(src))*(len(tar)), dtype=numpy.int).
+                 reshape((len(src), len(tar))))
+        del_band = len(src)
+        ins_band = len(tar)
+    else:
+        # cells outside the band are left holding max_distance + 1, which is
+        # as good as infinity for the purposes of the computation
+        d_mat = numpy.full((len(src), len(tar)), max_distance + 1,
+                           dtype=numpy.int)
+        d_mat[0, 0] = 0
+        del_band = _band(max_distance, del_cost, len(src))
+        ins_band = _band(max_distance, ins_cost, len(tar))
     # pylint: enable=no-member
 
     if src[0] != tar[0]:
@@ -271,8 +610,14 @@ def damerau_levenshtein(src, tar, cost=(1, 1, 1, 1)):
         d_mat[0, j] = min(del_distance, ins_distance, match_distance)
 
     for i in _range(1, len(src)):
-        max_src_letter_match_index = (0 if src[i] == tar[0] else -1)
-        for j in _range(1, len(tar)):
+        j_lo = max(1, i - del_band)
+        j_hi = min(len(tar), i + ins_band + 1)
+        if j_lo > 1:
+            # matches to the left of the band may still start a swap
+            max_src_letter_match_index = tar.rfind(src[i], 0, j_lo)
+        else:
+            max_src_letter_match_index = (0 if src[i] == tar[0] else -1)
+        for j in _range(j_lo, j_hi):
             candidate_swap_index = (-1 if tar[j] not in
                                     src_index_by_character else
                                     src_index_by_character[tar[j]])
@@ -302,6 +647,16 @@ def damerau_levenshtein(src, tar, cost=(1, 1, 1, 1)):
                               match_distance, swap_distance)
         src_index_by_character[src[i]] = i
 
+        # (i+1) * del_cost stands in for the column of the empty tar prefix
+        if ((max_distance is not None and
+             min((i+1) * del_cost, d_mat[i, 0],
+                 d_mat[i, j_lo:j_hi].min() if j_lo < j_hi else
+                 max_distance + 1) > max_distance)):
+            return max_distance + 1
+
+    if ((max_distance is not None and
+         d_mat[len(src)-1, len(tar)-1] > max_distance)):
+        return max_distance + 1
     return d_mat[len(src)-1, len(tar)-1]
 
 
@@ -493,12 +848,9 @@ def sim_tversky(src, tar, qval=2, alpha=1, beta=1, bias=None):
     if isinstance(src, Counter) and isinstance(tar, Counter):
         q_src = src
         q_tar = tar
-    elif qval and qval > 0:
-        q_src = QGrams(src, qval)
-        q_tar = QGrams(tar, qval)
     else:
-        q_src = Counter(src.strip().split())
-        q_tar = Counter(tar.strip().split())
+        q_src = _tokenize(src, qval)
+        q_tar = _tokenize(tar, qval)
     q_src_mag = sum(q_src.values())
     q_tar_mag = sum(q_tar.values())
     q_intersection_mag = sum((q_src & q_tar).values())
@@ -629,12 +981,9 @@ def sim_overlap(src, tar, qval=2):
     if isinstance(src, Counter) and isinstance(tar, Counter):
         q_src = src
         q_tar = tar
-    elif qval and qval > 0:
-        q_src = QGrams(src, qval)
-        q_tar = QGrams(tar, qval)
     else:
-        q_src = Counter(src.strip().split())
-        q_tar = Counter(tar.strip().split())
+        q_src = _tokenize(src, qval)
+        q_tar = _tokenize(tar, qval)
     q_src_mag = sum(q_src.values())
     q_tar_mag = sum(q_tar.values())
     q_intersection_mag = sum((q_src & q_tar).values())
@@ -712,12 +1061,9 @@ def sim_cosine(src, tar, qval=2):
     if isinstance(src, Counter) and isinstance(tar, Counter):
         q_src = src
         q_tar = tar
-    elif qval and qval > 0:
-        q_src = QGrams(src, qval)
-        q_tar = QGrams(tar, qval)
     else:
-        q_src = Counter(src.strip().split())
-        q_tar = Counter(tar.strip().split())
+        q_src = _tokenize(src, qval)
+        q_tar = _tokenize(tar, qval)
     q_src_mag = sum(q_src.values())
     q_tar_mag = sum(q_tar.values())
     q_intersection_mag = sum((q_src & q_tar).values())
@@ -740,6 +1086,152 @@ def dist_cosine(src, tar, qval=2):
     return 1 - sim_cosine(src, tar, qval)
 
 
+def _jaro_matches(src, tar, peq=None):
+    """Return the characters of src & tar matched by the Jaro algorithm
+
+    Each character of src, in order, is matched to the first unmatched equal
+    character of tar within the search window. Rather than scanning the window
+    character by character, this intersects the occurrence bit-vector of the
+    character in tar with the window and the set of unmatched positions, and
+    takes the lowest set bit.
+
+    :param src, tar: two sequences (strings or lists of q-grams) to be
+        compared
+    :param dict peq: the bit-parallel profile of tar, if precomputed
+    :returns: bit-vectors of the matched positions of src and of tar, the
+        number of matches, and the number of transpositions
+    :rtype: tuple
+    """
+    lens = len(src)
+    lent = len(tar)
+    if peq is None:
+        peq = _bitparallel_profile(tar)
+    search_range = max(0, max(lens, lent)//2 - 1)
+
+    src_mask = 0
+    avail = (1 << lent) - 1
+    num_com = 0
+    for i in _range(lens):
+        lowlim = (i - search_range) if (i >= search_range) else 0
+        hilim = min(i + search_range, lent - 1)
+        if lowlim > hilim:
+            break
+        cand = peq.get(src[i], 0) & avail
+        if cand:
+            cand &= ((1 << (hilim - lowlim + 1)) - 1) << lowlim
+            if cand:
+                cand &= -cand
+                avail ^= cand
+                src_mask |= 1 << i
+                num_com += 1
+
+    # Count the number of transpositions
+    tar_mask = avail ^ ((1 << lent) - 1)
+    n_trans = 0
+    j = 0
+    for i in _range(lens):
+        if (src_mask >> i) & 1:
+            while not (tar_mask >> j) & 1:
+                j += 1
+            if src[i] != tar[j]:
+                n_trans += 1
+            j += 1
+    n_trans = n_trans // 2
+
+    return src_mask, tar_mask, num_com, n_trans
+
+
+def _jaro_sequence(word, qval):
+    """Return the sequence that the Jaro(-Winkler) similarity compares
+
+    :param str word: the string to be compared
+    :param int qval: the length of each q-gram
+    :returns: the stripped string if qval is 1, and otherwise the list of its
+        q-grams, in order
+    :rtype: str or list
+    """
+    if qval == 1:
+        # the ordered list of 1-grams is just the string itself
+        return word.strip()
+    if isinstance(word, Profile):
+        return word.ordered_qgrams(qval)
+    return QGrams(word.strip(), qval).ordered_list
+
+
+def _jaro_winkler(src, tar, mode='winkler', long_strings=False,
+                  boost_threshold=0.7, scaling_factor=0.1, peq=None):
+    """Return the Jaro(-Winkler) similarity of two stripped sequences
+
+    :param src, tar: two sequences (strings or lists of q-grams) to be
+        compared
+    :param str mode: 'winkler' or 'jaro'
+    :param bool long_strings: the long strings adjustment, as in
+        sim_jaro_winkler
+    :param float boost_threshold: the Winkler boost threshold
+    :param float scaling_factor: the Winkler scaling factor
+    :param dict peq: the bit-parallel profile of tar, if precomputed
+    :returns: Jaro or Jaro-Winkler similarity
+    :rtype: float
+    """
+    lens = len(src)
+    lent = len(tar)
+
+    # If either string is blank - return - added in Version 2
+    if lens == 0 or lent == 0:
+        return 0.0
+
+    minv = min(lens, lent)
+
+    # Looking only within the search range, count the matched pairs and
+    # transpositions.
+    _, _, num_com, n_trans = _jaro_matches(src, tar, peq)
+
+    # If no characters in common - return
+    if num_com == 0:
+        return 0.0
+
+    # Main weight computation for Jaro distance
+    weight = num_com / lens + num_com / lent + (num_com - n_trans) / num_com
+    weight = weight / 3.0
+
+    # Continue to boost the weight if the strings are similar
+    # This is the Winkler portion of Jaro-Winkler distance
+    if mode == 'winkler' and weight > boost_threshold:
+
+        # Adjust for having up to the first 4 characters in common
+        j = 4 if (minv >= 4) else minv
+        i = 0
+        while (i < j) and (src[i] == tar[i]):
+            i += 1
+        if i:
+            weight += i * scaling_factor * (1.0 - weight)
+
+        # Optionally adjust for long strings.
+
+        # After agreeing beginning chars, at least two more must agree and
+        # the agreeing characters must be > .5 of remaining characters.
+        if (((long_strings) and (minv > 4) and (num_com > i+1) and
+             (2*num_com >= minv+i))):
+            weight += (1.0-weight) * ((num_com-i-1) / (lens+lent-i*2+2))
+
+    return weight
+
+
+# The adjwt table is used to give partial credit for characters that may be
+# errors due to known phonetic or character recognition errors. A typical
+# example is to match the letter "O" with the number "0".
+_STRCMP95_SP_MX = (
+    ('A', 'E'), ('A', 'I'), ('A', 'O'), ('A', 'U'), ('B', 'V'), ('E', 'I'),
+    ('E', 'O'), ('E', 'U'), ('I', 'O'), ('I', 'U'), ('O', 'U'), ('I', 'Y'),
+    ('E', 'Y'), ('C', 'G'), ('E', 'F'), ('W', 'U'), ('W', 'V'), ('X', 'K'),
+    ('S', 'Z'), ('X', 'S'), ('Q', 'C'), ('U', 'V'), ('M', 'N'), ('L', 'I'),
+    ('Q', 'O'), ('P', 'R'), ('I', 'J'), ('2', 'Z'), ('5', 'S'), ('8', 'B'),
+    ('1', 'I'), ('1', 'L'), ('0', 'O'), ('0', 'Q'), ('C', 'K'), ('G', 'J')
+)
+_STRCMP95_ADJWT = dict.fromkeys(_STRCMP95_SP_MX +
+                                tuple((b, a) for a, b in _STRCMP95_SP_MX), 3)
+
+
 def sim_strcmp95(src, tar, long_strings=False):
     """strcmp95 similarity
 
@@ -776,74 +1268,28 @@ def sim_strcmp95(src, tar, long_strings=False):
     if len(ying) == 0 or len(yang) == 0:
         return 0.0
 
-    adjwt = defaultdict(int)
-    sp_mx = (
-        ('A', 'E'), ('A', 'I'), ('A', 'O'), ('A', 'U'), ('B', 'V'), ('E', 'I'),
-        ('E', 'O'), ('E', 'U'), ('I', 'O'), ('I', 'U'), ('O', 'U'), ('I', 'Y'),
-        ('E', 'Y'), ('C', 'G'), ('E', 'F'), ('W', 'U'), ('W', 'V'), ('X', 'K'),
-        ('S', 'Z'), ('X', 'S'), ('Q', 'C'), ('U', 'V'), ('M', 'N'), ('L', 'I'),
-        ('Q', 'O'), ('P', 'R'), ('I', 'J'), ('2', 'Z'), ('5', 'S'), ('8', 'B'),
-        ('1', 'I'), ('1', 'L'), ('0', 'O'), ('0', 'Q'), ('C', 'K'), ('G', 'J')
-    )
-
-    # Initialize the adjwt array on the first call to the function only.
-    # The adjwt array is used to give partial credit for characters that
-    # may be errors due to known phonetic or character recognition errors.
-    # A typical example is to match the letter "O" with the number "0"
-    for i in sp_mx:
-        adjwt[(i[0], i[1])] = 3
-        adjwt[(i[1], i[0])] = 3
-
     if len(ying) > len(yang):
-        search_range = len(ying)
         minv = len(yang)
     else:
-        search_range = len(yang)
         minv = len(ying)
 
-    # Blank out the flags
-    ying_flag = [0 for i in _range(search_range)]
-    yang_flag = [0 for j in _range(search_range)]
-    search_range = max(0, search_range // 2 - 1)
-
     # Looking only within the search range, count and flag the matched pairs.
-    num_com = 0
-    yl1 = len(yang) - 1
-    for i in _range(len(ying)):
-        lowlim = (i - search_range) if (i >= search_range) else 0
-        hilim = (i + search_range) if ((i + search_range) <= yl1) else yl1
-        for j in _range(lowlim, hilim+1):
-            if (yang_flag[j] == 0) and (yang[j] == ying[i]):
-                yang_flag[j] = 1
-                ying_flag[i] = 1
-                num_com += 1
-                break
+    ying_mask, yang_mask, num_com, n_trans = _jaro_matches(ying, yang)
 
     # If no characters in common - return
     if num_com == 0:
         return 0.0
 
-    # Count the number of transpositions
-    k = n_trans = 0
-    for i in _range(len(ying)):
-        if ying_flag[i] != 0:
-            for j in _range(k, len(yang)):
-                if yang_flag[j] != 0:
-                    k = j + 1
-                    break
-            if ying[i] != yang[j]:
-                n_trans += 1
-    n_trans = n_trans // 2
-
     # Adjust for similarities in unmatched characters
     n_simi = 0
     if minv > num_com:
+        yang_flag = [(yang_mask >> j) & 1 for j in _range(len(yang))]
         for i in _range(len(ying)):
-            if ying_flag[i] == 0 and _in_range(ying[i]):
+            if not (ying_mask >> i) & 1 and _in_range(ying[i]):
                 for j in _range(len(yang)):
                     if yang_flag[j] == 0 and _in_range(yang[j]):
-                        if (ying[i], yang[j]) in adjwt:
-                            n_simi += adjwt[(ying[i], yang[j])]
+                        if (ying[i], yang[j]) in _STRCMP95_ADJWT:
+                            n_simi += _STRCMP95_ADJWT[(ying[i], yang[j])]
                             yang_flag[j] = 2
                             break
     num_sim = n_simi/10.0 + num_com
@@ -939,82 +1385,8 @@ def sim_jaro_winkler(src, tar, qval=1, mode='winkler', long_strings=False,
     if src == tar:
         return 1.0
 
-    src = QGrams(src.strip(), qval).ordered_list
-    tar = QGrams(tar.strip(), qval).ordered_list
-
-    lens = len(src)
-    lent = len(tar)
-
-    # If either string is blank - return - added in Version 2
-    if lens == 0 or lent == 0:
-        return 0.0
-
-    if lens > lent:
-        search_range = lens
-        minv = lent
-    else:
-        search_range = lent
-        minv = lens
-
-    # Zero out the flags
-    src_flag = [0 for i in _range(search_range)]
-    tar_flag = [0 for j in _range(search_range)]
-    search_range = max(0, search_range//2 - 1)
-
-    # Looking only within the search range, count and flag the matched pairs.
-    num_com = 0
-    yl1 = lent - 1
-    for i in _range(lens):
-        lowlim = (i - search_range) if (i >= search_range) else 0
-        hilim = (i + search_range) if ((i + search_range) <= yl1) else yl1
-        for j in _range(lowlim, hilim+1):
-            if (tar_flag[j] == 0) and (tar[j] == src[i]):
-                tar_flag[j] = 1
-                src_flag[i] = 1
-                num_com += 1
-                break
-
-    # If no characters in common - return
-    if num_com == 0:
-        return 0.0
-
-    # Count the number of transpositions
-    k = n_trans = 0
-    for i in _range(lens):
-        if src_flag[i] != 0:
-            for j in _range(k, lent):
-                if tar_flag[j] != 0:
-                    k = j + 1
-                    break
-            if src[i] != tar[j]:
-                n_trans += 1
-    n_trans = n_trans // 2
-
-    # Main weight computation for Jaro distance
-    weight = num_com / lens + num_com / lent + (num_com - n_trans) / num_com
-    weight = weight / 3.0
-
-    # Continue to boost the weight if the strings are similar
-    # This is the Winkler portion of Jaro-Winkler distance
-    if mode == 'winkler' and weight > boost_threshold:
-
-        # Adjust for having up to the first 4 characters in common
-        j = 4 if (minv >= 4) else minv
-        i = 0
-        while (i < j) and (src[i] == tar[i]):
-            i += 1
-        if i:
-            weight += i * scaling_factor * (1.0 - weight)
-
-        # Optionally adjust for long strings.
-
-        # After agreeing beginning chars, at least two more must agree and
-        # the agreeing characters must be > .5 of remaining characters.
-        if (((long_strings) and (minv > 4) and (num_com > i+1) and
-             (2*num_com >= minv+i))):
-            weight += (1.0-weight) * ((num_com-i-1) / (lens+lent-i*2+2))
-
-    return weight
+    return _jaro_winkler(_jaro_sequence(src, qval), _jaro_sequence(tar, qval),
+                         mode, long_strings, boost_threshold, scaling_factor)
 
 
 def dist_jaro_winkler(src, tar, qval=1, mode='winkler', long_strings=False,
@@ -1052,6 +1424,79 @@ def dist_jaro_winkler(src, tar, qval=1, mode='winkler', long_strings=False,
                                 boost_threshold, scaling_factor)
 
 
+def _lcsseq_next_row(row, matches):
+    """Return the next row of a longest common subsequence length matrix
+
+    :param numpy.ndarray row: a row of the matrix
+    :param numpy.ndarray matches: for each character of tar, whether it
+        matches the character of src belonging to the next row
+    :returns: the next row
+    :rtype: numpy.ndarray
+    """
+    # with a match, lengths[i-1, j-1] + 1 is at least lengths[i-1, j] &
+    # lengths[i, j-1], so each cell is the max of the three, which can be
+    # taken along the row with a cumulative max
+    # pylint: disable=no-member
+    next_row = numpy.empty_like(row)
+    next_row[0] = 0
+    next_row[1:] = numpy.maximum.accumulate(numpy.maximum(row[1:],
+                                                          row[:-1] + matches))
+    # pylint: enable=no-member
+    return next_row
+
+
+def _lcsseq_hirschberg(src, tar, src_codes, tar_codes, top):
+    """Trace back the longest common subsequence in linear memory
+
+    This is a variant of Hirschberg's divide & conquer algorithm (Hirschberg,
+    Daniel S. 1975. "A linear space algorithm for computing maximal common
+    subsequences." Communications of the ACM, 18(6). 341--343.) that follows
+    exactly the path lcsseq's traceback takes through the length matrix, so
+    as to recover the same subsequence. The traceback of the lower half of
+    src's rows is found first, starting from the middle row of lengths (found
+    by a forward pass), then the traceback of the upper half, which needs
+    only the columns up to where the lower traceback left off.
+
+    :param str src, tar: two strings, as parts of those passed to lcsseq (src
+        a substring & tar a prefix)
+    :param numpy.ndarray src_codes, tar_codes: the symbol codes of src & tar
+    :param numpy.ndarray top: the row of the length matrix above src's rows
+    :returns: the part of the subsequence within src's rows, and the column at
+        which the traceback left them
+    :rtype: tuple
+    """
+    if len(src) <= 16:
+        rows = [top]
+        for code in src_codes:
+            rows.append(_lcsseq_next_row(rows[-1], tar_codes == code))
+        rows = [row.tolist() for row in rows]
+
+        result = ''
+        i, j = len(src), len(tar)
+        while i != 0 and j != 0:
+            if rows[i][j] == rows[i-1][j]:
+                i -= 1
+            elif rows[i][j] == rows[i][j-1]:
+                j -= 1
+            else:
+                result = src[i-1] + result
+                i -= 1
+                j -= 1
+        return result, j
+
+    mid = len(src) // 2
+    row = top
+    for code in src_codes[:mid]:
+        row = _lcsseq_next_row(row, tar_codes == code)
+    lower, j = _lcsseq_hirschberg(src[mid:], tar, src_codes[mid:], tar_codes,
+                                  row)
+    if j == 0:
+        return lower, 0
+    upper, j = _lcsseq_hirschberg(src[:mid], tar[:j], src_codes[:mid],
+                                  tar_codes[:j], top[:j+1])
+    return upper + lower, j
+
+
 def lcsseq(src, tar):
     """longest common subsequence (LCSseq)
 
@@ -1061,22 +1506,46 @@ def lcsseq(src, tar):
 
     Modifications include:
         conversion to a numpy array in place of a list of lists
+        filling the array by anti-diagonals, for long strings
+        a linear memory (Hirschberg) traceback, for very long strings
 
     :param str src, tar: two strings to be compared
     :returns: the longes common subsequence
     :rtype: str
     """
+    if len(src) * len(tar) >= _HIRSCHBERG_MIN_CELLS:
+        codes = {}
+        src_codes = _symbol_codes(src, codes)
+        tar_codes = _symbol_codes(tar, codes)
+        # pylint: disable=no-member
+        top = numpy.zeros(len(tar)+1, dtype=numpy.int)
+        # pylint: enable=no-member
+        return _lcsseq_hirschberg(src, tar, src_codes, tar_codes, top)[0]
+
     # pylint: disable=no-member
     lengths = numpy.zeros((len(src)+1, len(tar)+1), dtype=numpy.int)
     # pylint: enable=no-member
 
     # row 0 and column 0 are initialized to 0 already
-    for i, src_char in enumerate(src):
-        for j, tar_char in enumerate(tar):
-            if src_char == tar_char:
-                lengths[i+1, j+1] = lengths[i, j] + 1
-            else:
-                lengths[i+1, j+1] = max(lengths[i+1, j], lengths[i, j+1])
+    if min(len(src), len(tar)) >= _ANTIDIAGONAL_MIN_LENGTH:
+        codes = {}
+        src_codes = _symbol_codes(src, codes)
+        tar_codes = _symbol_codes(tar, codes)
+        for i, j in _antidiagonals(len(src), len(tar)):
+            # pylint: disable=no-member
+            lengths[i, j] = numpy.where(src_codes[i-1] == tar_codes[j-1],
+                                        lengths[i-1, j-1] + 1,
+                                        numpy.maximum(lengths[i, j-1],
+                                                      lengths[i-1, j]))
+            # pylint: enable=no-member
+    else:
+        for i, src_char in enumerate(src):
+            for j, tar_char in enumerate(tar):
+                if src_char == tar_char:
+                    lengths[i+1, j+1] = lengths[i, j] + 1
+                else:
+                    lengths[i+1, j+1] = max(lengths[i+1, j],
+                                            lengths[i, j+1])
 
     # read the substring out from the matrix
     result = ""
@@ -1100,6 +1569,11 @@ def sim_lcsseq(src, tar):
     This employs the LCSseq function to derive a similarity metric:
     :math:`sim_{LCSseq}(s,t) = \\frac{|LCSseq(s,t)|}{max(|s|, |t|)}`
 
+    Since only its length is needed, the LCSseq is not itself found; its
+    length is computed by the bit-parallel algorithm of Hyyrö, Heikki. 2004.
+    "Bit-parallel LCS-length computation revisited." Proceedings of the 15th
+    Australasian Workshop on Combinatorial Algorithms. 16--27.
+
     :param str src, tar: two strings to be compared
     :returns: LCSseq similarity
     :rtype: float
@@ -1108,7 +1582,7 @@ def sim_lcsseq(src, tar):
         return 1.0
     elif len(src) == 0 or len(tar) == 0:
         return 0.0
-    return len(lcsseq(src, tar)) / max(len(src), len(tar))
+    return _lcsseq_len_bitparallel(src, tar) / max(len(src), len(tar))
 
 
 def dist_lcsseq(src, tar):
@@ -1124,6 +1598,85 @@ def dist_lcsseq(src, tar):
     return 1 - sim_lcsseq(src, tar)
 
 
+def _suffix_automaton(word):
+    """Return the suffix automaton of a string
+
+    The suffix automaton is the smallest deterministic automaton accepting
+    every substring of word. It is built in linear time with the online
+    algorithm of Blumer, Anselm, et al. 1985. "The smallest automaton
+    recognizing the subwords of a text." Theoretical Computer Science, 40.
+    31--55.
+
+    :param str word: the string
+    :returns: for each state (the initial state being 0), its transitions (a
+        dict mapping characters to states), its suffix link, the length of
+        the longest substring it accepts, and the end position (in word) of
+        the first occurrence of the substrings it accepts
+    :rtype: tuple
+    """
+    trans, link, length, first_end = [{}], [-1], [0], [-1]
+    last = 0
+    for pos, char in enumerate(word):
+        cur = len(length)
+        trans.append({})
+        link.append(0)
+        length.append(length[last] + 1)
+        first_end.append(pos)
+        state = last
+        while state != -1 and char not in trans[state]:
+            trans[state][char] = cur
+            state = link[state]
+        if state != -1:
+            nxt = trans[state][char]
+            if length[state] + 1 == length[nxt]:
+                link[cur] = nxt
+            else:
+                clone = len(length)
+                trans.append(dict(trans[nxt]))
+                link.append(link[nxt])
+                length.append(length[state] + 1)
+                first_end.append(first_end[nxt])
+                while state != -1 and trans[state].get(char) == nxt:
+                    trans[state][char] = clone
+                    state = link[state]
+                link[nxt] = clone
+                link[cur] = clone
+        last = cur
+    return trans, link, length, first_end
+
+
+def _lcsstr_stl(src, tar):
+    """Return the start position in the source string, start position in
+    the target string, and length of the longest common substring of
+    strings src and tar
+
+    src is run through the suffix automaton of tar, following the longest
+    suffix of each prefix of src that is a substring of tar. Of several
+    longest common substrings, the one ending first in src (and, of its
+    occurrences, the one ending first in tar) is returned.
+
+    :param str src, tar: two strings to be compared
+    :returns: the start positions in src & tar and the length of the
+        longest common substring
+    :rtype: tuple
+    """
+    trans, link, length, first_end = _suffix_automaton(tar)
+    state, match = 0, 0
+    longest, src_longest, tar_longest = 0, 0, 0
+    for i, char in enumerate(src):
+        while state and char not in trans[state]:
+            state = link[state]
+            match = length[state]
+        if char in trans[state]:
+            state = trans[state][char]
+            match += 1
+        if match > longest:
+            longest = match
+            src_longest = i + 1
+            tar_longest = first_end[state] + 1
+    return (src_longest-longest, tar_longest-longest, longest)
+
+
 def lcsstr(src, tar):
     """longest common substring (LCSstr)
 
@@ -1135,25 +1688,15 @@ def lcsstr(src, tar):
 
         - conversion to a numpy array in place of a list of lists
         - conversion to Python 2/3-safe _range from xrange
+        - replacement of the dynamic programming matrix with a suffix
+          automaton, in linear time
 
     :param str src, tar: two strings to be compared
     :returns: the longes common substring
     :rtype: float
     """
-    # pylint: disable=no-member
-    lengths = numpy.zeros((len(src)+1, len(tar)+1), dtype=numpy.int)
-    # pylint: enable=no-member
-    longest, i_longest = 0, 0
-    for i in _range(1, len(src)+1):
-        for j in _range(1, len(tar)+1):
-            if src[i-1] == tar[j-1]:
-                lengths[i, j] = lengths[i-1, j-1] + 1
-                if lengths[i, j] > longest:
-                    longest = lengths[i, j]
-                    i_longest = i
-            else:
-                lengths[i, j] = 0
-    return src[i_longest - longest:i_longest]
+    src_start, _, length = _lcsstr_stl(src, tar)
+    return src[src_start:src_start+length]
 
 
 def sim_lcsstr(src, tar):
@@ -1207,27 +1750,6 @@ def sim_ratcliff_obershelp(src, tar):
     :returns: Ratcliff-Obserhelp similarity
     :rtype: float
     """
-    def _lcsstr_stl(src, tar):
-        """Return the start position in the source string, start position in
-        the target string, and length of the longest common substring of
-        strings src and tar
-        """
-        # pylint: disable=no-member
-        lengths = numpy.zeros((len(src)+1, len(tar)+1), dtype=numpy.int)
-        # pylint: enable=no-member
-        longest, src_longest, tar_longest = 0, 0, 0
-        for i in _range(1, len(src)+1):
-            for j in _range(1, len(tar)+1):
-                if src[i-1] == tar[j-1]:
-                    lengths[i, j] = lengths[i-1, j-1] + 1
-                    if lengths[i, j] > longest:
-                        longest = lengths[i, j]
-                        src_longest = i
-                        tar_longest = j
-                else:
-                    lengths[i, j] = 0
-        return (src_longest-longest, tar_longest-longest, longest)
-
     def _sstr_matches(src, tar):
         """Return the sum of substring match lengths by following the
         Ratcliff-Obershelp algorithm:
@@ -1343,6 +1865,26 @@ def dist_mra(src, tar):
     return 1 - sim_mra(src, tar)
 
 
+# the compressors used by dist_compression, which retain the compressed
+# lengths of recently compared strings from one call to the next
+_COMPRESSORS = {}
+
+
+def _shared_compressor(compressor):
+    """Return the shared Compressor for a compression scheme
+
+    :param str compressor: a compression scheme, as for dist_compression
+        (other than arith)
+    :returns: a Compressor
+    :rtype: Compressor
+    """
+    if compressor not in _COMPRESSORS:
+        comp = Compressor(compressor)
+        _COMPRESSORS[compressor] = _COMPRESSORS.setdefault(comp.compressor,
+                                                           comp)
+    return _COMPRESSORS[compressor]
+
+
 def dist_compression(src, tar, compressor='bz2', probs=None):
     """normalized compression distance (NCD)
 
@@ -1369,47 +1911,12 @@ def dist_compression(src, tar, compressor='bz2', probs=None):
     if src == tar:
         return 0.0
 
-    if compressor not in frozenset(['arith', 'rle', 'bwtrle']):
-        src = src.encode('utf-8')
-        tar = tar.encode('utf-8')
-
-    if compressor == 'bz2':
-        src_comp = codecs.encode(src, 'bz2_codec')[15:]
-        tar_comp = codecs.encode(tar, 'bz2_codec')[15:]
-        concat_comp = codecs.encode(src+tar, 'bz2_codec')[15:]
-        concat_comp2 = codecs.encode(tar+src, 'bz2_codec')[15:]
-    elif compressor == 'lzma':
-        if 'lzma' in sys.modules:
-            src_comp = lzma.compress(src)[14:]
-            tar_comp = lzma.compress(tar)[14:]
-            concat_comp = lzma.compress(src+tar)[14:]
-            concat_comp2 = lzma.compress(tar+src)[14:]
-        else:  # pragma: no cover
-            raise ValueError('Install the PylibLZMA module in order to use ' +
-                             'lzma compression similarity')
-    elif compressor == 'arith':
+    if compressor == 'arith':
         if probs is None:
             # lacking a reasonable dictionary, train on the strings themselves
             probs = ac_train(src+tar)
-        src_comp = ac_encode(src, probs)[1]
-        tar_comp = ac_encode(tar, probs)[1]
-        concat_comp = ac_encode(src+tar, probs)[1]
-        concat_comp2 = ac_encode(tar+src, probs)[1]
-        return ((min(concat_comp, concat_comp2) - min(src_comp, tar_comp)) /
-                max(src_comp, tar_comp))
-    elif compressor in frozenset(['rle', 'bwtrle']):
-        src_comp = rle_encode(src, (compressor == 'bwtrle'))
-        tar_comp = rle_encode(tar, (compressor == 'bwtrle'))
-        concat_comp = rle_encode(src+tar, (compressor == 'bwtrle'))
-        concat_comp2 = rle_encode(tar+src, (compressor == 'bwtrle'))
-    else:  # zlib
-        src_comp = codecs.encode(src, 'zlib_codec')[2:]
-        tar_comp = codecs.encode(tar, 'zlib_codec')[2:]
-        concat_comp = codecs.encode(src+tar, 'zlib_codec')[2:]
-        concat_comp2 = codecs.encode(tar+src, 'zlib_codec')[2:]
-    return ((min(len(concat_comp), len(concat_comp2)) -
-             min(len(src_comp), len(tar_comp))) /
-            max(len(src_comp), len(tar_comp)))
+        return Compressor('arith', probs, 0).ncd(src, tar)
+    return _shared_compressor(compressor).ncd(src, tar)
 
 
 def sim_compression(src, tar, compressor='bz2', probs=None):
@@ -1439,6 +1946,47 @@ def sim_compression(src, tar, compressor='bz2', probs=None):
     return 1 - dist_compression(src, tar, compressor, probs)
 
 
+def ncd_matrix(collection, compressor='bz2', probs=None, both_orders=True):
+    """normalized compression distance (NCD) matrix
+
+    This computes the normalized compression distance between each pair of
+    members of a collection, compressing each member by itself only once.
+
+    :param list collection: a collection of strings
+    :param str compressor: a compression scheme, as for dist_compression
+    :param dict probs: a dictionary trained with ac_train (for the arith
+        compressor only); if None, a dictionary is trained on the whole
+        collection
+    :param bool both_orders: if True, both concatenations of each pair are
+        compressed, as in dist_compression; otherwise only the concatenation
+        of the earlier member & the later member is, which halves the number
+        of compressions (and, for zlib, lets each row be compressed from a
+        single compressor primed with its member)
+    :returns: an n x n matrix, such that matrix[i, j] is the NCD of
+        collection[i] & collection[j]
+    :rtype: numpy.ndarray
+    """
+    collection = list(collection)
+    num = len(collection)
+    if compressor == 'arith' and probs is None:
+        probs = ac_train(''.join(collection))
+    comp = Compressor(compressor, probs, max(num, 1))
+
+    # pylint: disable=no-member
+    matrix = numpy.zeros((num, num), dtype=numpy.float64)
+    # pylint: enable=no-member
+    for i in _range(num-1):
+        # the compressor is primed with collection[i] once per row
+        # pylint: disable=no-member
+        row = numpy.fromiter(comp.ncd_many(collection[i], collection[i+1:],
+                                           both_orders),
+                             dtype=numpy.float64, count=num-i-1)
+        # pylint: enable=no-member
+        matrix[i, i+1:] = row
+        matrix[i+1:, i] = row
+    return matrix
+
+
 def sim_monge_elkan(src, tar, sim_func=sim_levenshtein, symmetric=False):
     """Monge-Elkan similarity
 
@@ -1463,8 +2011,8 @@ def sim_monge_elkan(src, tar, sim_func=sim_levenshtein, symmetric=False):
     if src == tar:
         return 1.0
 
-    q_src = sorted(QGrams(src).elements())
-    q_tar = sorted(QGrams(tar).elements())
+    q_src = sorted(_tokenize(src).elements())
+    q_tar = sorted(_tokenize(tar).elements())
 
     if len(q_src) == 0 or len(q_tar) == 0:
         return 0.0
@@ -1590,6 +2138,9 @@ def needleman_wunsch(src, tar, gap_cost=1, sim_func=sim_ident):
     Cf.
     http://csb.stanford.edu/class/public/readings/Bioinformatics_I_Lecture6/Needleman_Wunsch_JMB_70_Global_alignment.pdf
 
+    Since only the score is returned, only two rows of the matrix (or, for
+    long strings, three anti-diagonals) are kept at a time.
+
     :param str src, tar: two strings to be compared
     :param float gap_cost: the cost of an alignment gap (1 by default)
     :param function sim_func: a function that returns the similarity of two
@@ -1597,21 +2148,37 @@ def needleman_wunsch(src, tar, gap_cost=1, sim_func=sim_ident):
     :returns: Needleman-Wunsch score
     :rtype: int (in fact dependent on the gap_cost & return value of sim_func)
     """
-    # pylint: disable=no-member
-    d_mat = numpy.zeros((len(src)+1, len(tar)+1), dtype=numpy.float)
-    # pylint: enable=no-member
-
-    for i in _range(len(src)+1):
-        d_mat[i, 0] = -(i * gap_cost)
-    for j in _range(len(tar)+1):
-        d_mat[0, j] = -(j * gap_cost)
+    if min(len(src), len(tar)) >= _ANTIDIAGONAL_MIN_LENGTH:
+        # pylint: disable=no-member
+        diag2, diag1, diag0 = (numpy.zeros(len(src)+1, dtype=numpy.float)
+                               for _ in _range(3))
+        # pylint: enable=no-member
+        diag1[0] = -(0 * gap_cost)
+        for diag, i_lo, i_hi, sim_vals in _antidiagonal_sims(src, tar,
+                                                             sim_func):
+            if diag <= len(tar):
+                diag0[0] = -(diag * gap_cost)
+            if diag <= len(src):
+                diag0[diag] = -(diag * gap_cost)
+            match = diag2[i_lo-1:i_hi] + sim_vals
+            delete = diag1[i_lo-1:i_hi] - gap_cost
+            insert = diag1[i_lo:i_hi+1] - gap_cost
+            # pylint: disable=no-member
+            diag0[i_lo:i_hi+1] = numpy.maximum(numpy.maximum(match, delete),
+                                               insert)
+            # pylint: enable=no-member
+            diag2, diag1, diag0 = diag1, diag0, diag2
+        return diag1[len(src)]
+
+    d_row = [float(-(j * gap_cost)) for j in _range(len(tar)+1)]
     for i in _range(1, len(src)+1):
+        d_prev, d_row = d_row, [float(-(i * gap_cost))]
         for j in _range(1, len(tar)+1):
-            match = d_mat[i-1, j-1] + sim_func(src[i-1], tar[j-1])
-            delete = d_mat[i-1, j] - gap_cost
-            insert = d_mat[i, j-1] - gap_cost
-            d_mat[i, j] = max(match, delete, insert)
-    return d_mat[d_mat.shape[0]-1, d_mat.shape[1]-1]
+            match = d_prev[j-1] + sim_func(src[i-1], tar[j-1])
+            delete = d_prev[j] - gap_cost
+            insert = d_row[j-1] - gap_cost
+            d_row.append(max(match, delete, insert))
+    return d_row[len(tar)]
 
 
 def smith_waterman(src, tar, gap_cost=1, sim_func=sim_ident):
@@ -1621,6 +2188,9 @@ def smith_waterman(src, tar, gap_cost=1, sim_func=sim_ident):
 
     Cf. https://en.wikipedia.org/wiki/Smith–Waterman_algorithm
 
+    Only two rows of the matrix (or, for long strings, three anti-diagonals)
+    are kept at a time.
+
     :param str src, tar: two strings to be compared
     :param float gap_cost: the cost of an alignment gap (1 by default)
     :param function sim_func: a function that returns the similarity of two
@@ -1628,21 +2198,33 @@ def smith_waterman(src, tar, gap_cost=1, sim_func=sim_ident):
     :returns: Smith-Waterman score
     :rtype: int (in fact dependent on the gap_cost & return value of sim_func)
     """
-    # pylint: disable=no-member
-    d_mat = numpy.zeros((len(src)+1, len(tar)+1), dtype=numpy.float)
-    # pylint: enable=no-member
-
-    for i in _range(len(src)+1):
-        d_mat[i, 0] = 0
-    for j in _range(len(tar)+1):
-        d_mat[0, j] = 0
+    if min(len(src), len(tar)) >= _ANTIDIAGONAL_MIN_LENGTH:
+        # the first row & column are 0, and never overwritten
+        # pylint: disable=no-member
+        diag2, diag1, diag0 = (numpy.zeros(len(src)+1, dtype=numpy.float)
+                               for _ in _range(3))
+        # pylint: enable=no-member
+        for _, i_lo, i_hi, sim_vals in _antidiagonal_sims(src, tar,
+                                                          sim_func):
+            match = diag2[i_lo-1:i_hi] + sim_vals
+            delete = diag1[i_lo-1:i_hi] - gap_cost
+            insert = diag1[i_lo:i_hi+1] - gap_cost
+            # pylint: disable=no-member
+            diag0[i_lo:i_hi+1] = numpy.maximum(numpy.maximum(numpy.maximum(
+                0, match), delete), insert)
+            # pylint: enable=no-member
+            diag2, diag1, diag0 = diag1, diag0, diag2
+        return diag1[len(src)]
+
+    d_row = [0.0] * (len(tar)+1)
     for i in _range(1, len(src)+1):
+        d_prev, d_row = d_row, [0.0]
         for j in _range(1, len(tar)+1):
-            match = d_mat[i-1, j-1] + sim_func(src[i-1], tar[j-1])
-            delete = d_mat[i-1, j] - gap_cost
-            insert = d_mat[i, j-1] - gap_cost
-            d_mat[i, j] = max(0, match, delete, insert)
-    return d_mat[d_mat.shape[0]-1, d_mat.shape[1]-1]
+            match = d_prev[j-1] + sim_func(src[i-1], tar[j-1])
+            delete = d_prev[j] - gap_cost
+            insert = d_row[j-1] - gap_cost
+            d_row.append(float(max(0, match, delete, insert)))
+    return d_row[len(tar)]
 
 
 def gotoh(src, tar, gap_open=1, gap_ext=0.4, sim_func=sim_ident):
@@ -1652,6 +2234,9 @@ def gotoh(src, tar, gap_open=1, gap_ext=0.4, sim_func=sim_ident):
     penalties:
     https://www.cs.umd.edu/class/spring2003/cmsc838t/papers/gotoh1982.pdf
 
+    Only two rows of each of the three matrices (or, for long strings, three
+    anti-diagonals of each) are kept at a time.
+
     :param str src, tar: two strings to be compared
     :param float gap_open: the cost of an open alignment gap (1 by default)
     :param float gap_ext: the cost of an alignment gap extension (0.4 by
@@ -1662,41 +2247,69 @@ def gotoh(src, tar, gap_open=1, gap_ext=0.4, sim_func=sim_ident):
     :rtype: float (in fact dependent on the gap_cost & return value of
         sim_func)
     """
-    # pylint: disable=no-member
-    d_mat = numpy.zeros((len(src)+1, len(tar)+1), dtype=numpy.float)
-    p_mat = numpy.zeros((len(src)+1, len(tar)+1), dtype=numpy.float)
-    q_mat = numpy.zeros((len(src)+1, len(tar)+1), dtype=numpy.float)
-    # pylint: enable=no-member
-
-    d_mat[0, 0] = 0
-    p_mat[0, 0] = float('-inf')
-    q_mat[0, 0] = float('-inf')
-    for i in _range(1, len(src)+1):
-        d_mat[i, 0] = float('-inf')
-        p_mat[i, 0] = -gap_open - gap_ext*(i-1)
-        q_mat[i, 0] = float('-inf')
-        q_mat[i, 1] = -gap_open
-    for j in _range(1, len(tar)+1):
-        d_mat[0, j] = float('-inf')
-        p_mat[0, j] = float('-inf')
-        p_mat[1, j] = -gap_open
-        q_mat[0, j] = -gap_open - gap_ext*(j-1)
+    neg_inf = float('-inf')
 
+    if min(len(src), len(tar)) >= _ANTIDIAGONAL_MIN_LENGTH:
+        # pylint: disable=no-member
+        d_diags, p_diags, q_diags = ([numpy.full(len(src)+1, neg_inf)
+                                      for _ in _range(3)] for _ in _range(3))
+        # pylint: enable=no-member
+        d_diags[1][0] = 0
+        for diag, i_lo, i_hi, sim_vals in _antidiagonal_sims(src, tar,
+                                                             sim_func):
+            d_diag2, d_diag1, d_diag0 = d_diags
+            p_diag2, p_diag1, p_diag0 = p_diags
+            q_diag2, q_diag1, q_diag0 = q_diags
+            if diag <= len(tar):
+                d_diag0[0] = neg_inf
+                p_diag0[0] = neg_inf
+                q_diag0[0] = -gap_open - gap_ext*(diag-1)
+            if diag <= len(src):
+                d_diag0[diag] = neg_inf
+                p_diag0[diag] = -gap_open - gap_ext*(diag-1)
+                q_diag0[diag] = neg_inf
+            # pylint: disable=no-member
+            d_diag0[i_lo:i_hi+1] = numpy.maximum(numpy.maximum(
+                d_diag2[i_lo-1:i_hi] + sim_vals,
+                p_diag2[i_lo-1:i_hi] + sim_vals),
+                                                 q_diag2[i_lo-1:i_hi] +
+                                                 sim_vals)
+
+            p_diag0[i_lo:i_hi+1] = numpy.maximum(
+                d_diag1[i_lo-1:i_hi] - gap_open,
+                p_diag1[i_lo-1:i_hi] - gap_ext)
+
+            q_diag0[i_lo:i_hi+1] = numpy.maximum(
+                d_diag1[i_lo:i_hi+1] - gap_open,
+                q_diag1[i_lo:i_hi+1] - gap_ext)
+            # pylint: enable=no-member
+            d_diags = [d_diag1, d_diag0, d_diag2]
+            p_diags = [p_diag1, p_diag0, p_diag2]
+            q_diags = [q_diag1, q_diag0, q_diag2]
+        return max(d_diags[1][len(src)], p_diags[1][len(src)],
+                   q_diags[1][len(src)])
+
+    d_row = [0.0] + [neg_inf] * len(tar)
+    p_row = [neg_inf] * (len(tar)+1)
+    q_row = [neg_inf] + [-gap_open - gap_ext*(j-1) for j in
+                         _range(1, len(tar)+1)]
     for i in _range(1, len(src)+1):
+        d_prev, d_row = d_row, [neg_inf]
+        p_prev, p_row = p_row, [-gap_open - gap_ext*(i-1)]
+        q_prev, q_row = q_row, [neg_inf]
         for j in _range(1, len(tar)+1):
             sim_val = sim_func(src[i-1], tar[j-1])
-            d_mat[i, j] = max(d_mat[i-1, j-1] + sim_val,
-                              p_mat[i-1, j-1] + sim_val,
-                              q_mat[i-1, j-1] + sim_val)
+            d_row.append(max(d_prev[j-1] + sim_val,
+                             p_prev[j-1] + sim_val,
+                             q_prev[j-1] + sim_val))
 
-            p_mat[i, j] = max(d_mat[i-1, j] - gap_open,
-                              p_mat[i-1, j] - gap_ext)
+            p_row.append(max(d_prev[j] - gap_open,
+                             p_prev[j] - gap_ext))
 
-            q_mat[i, j] = max(d_mat[i, j-1] - gap_open,
-                              q_mat[i, j-1] - gap_ext)
+            q_row.append(max(d_row[j-1] - gap_open,
+                             q_row[j-1] - gap_ext))
 
-    i, j = (n - 1 for n in d_mat.shape)
-    return max(d_mat[i, j], p_mat[i, j], q_mat[i, j])
+    return max(d_row[len(tar)], p_row[len(tar)], q_row[len(tar)])
 
 
 def sim_length(src, tar):
@@ -1919,7 +2532,146 @@ def sim_bag(src, tar):
     return 1-dist_bag(src, tar)
 
 
-def editex(src, tar, cost=(0, 1, 2), local=False):
+# Zobel & Dart's letter groups, as a map from each letter to a bit-vector of
+# the groups it belongs to, so that two letters share a group iff the bitwise
+# and of their entries is non-zero
+_EDITEX_GROUPS = {char: sum(1 << i for i, group in
+                            enumerate(('AEIOUY', 'BP', 'CKQ', 'DT', 'LR',
+                                       'MN', 'GJ', 'FPV', 'SXZ', 'CSZ'))
+                            if char in group)
+                  for char in 'AEIOUYBPCKQDTLRMNGJFVSXZ'}
+
+_EDITEX_NORMALIZE_CACHE = {}
+_EDITEX_NORMALIZE_CACHE_SIZE = 2**14
+
+
+def _editex_normalize(word):
+    """Return word in the NFKD normalized, upper-cased form Editex compares
+
+    Normalized forms are cached, since the same words (e.g. a query, or the
+    entries of an index) tend to be compared many times.
+
+    :param str word: the word to normalize
+    :returns: the normalized word
+    :rtype: str
+    """
+    if isinstance(word, Profile):
+        return word.editex_form
+    try:
+        return _EDITEX_NORMALIZE_CACHE[word]
+    except KeyError:
+        pass
+    norm = unicodedata.normalize('NFKD', _unicode(word.upper()))
+    # convert ß to SS (for Python2)
+    norm = norm.replace('ß', 'SS')
+    if len(_EDITEX_NORMALIZE_CACHE) >= _EDITEX_NORMALIZE_CACHE_SIZE:
+        _EDITEX_NORMALIZE_CACHE.clear()
+    _EDITEX_NORMALIZE_CACHE[word] = norm
+    return norm
+
+
+def _editex_d_costs(word, cost):
+    """Return the costs of deleting each character of a normalized word
+
+    :param str word: a word normalized by _editex_normalize
+    :param tuple cost: the match, same-group, and mismatch costs
+    :returns: a list whose i-th entry is d(word[i-1], word[i]) according to
+        Zobel & Dart's definition, with word[-1] taken to be a space; the
+        0-th entry is unused
+    :rtype: list
+    """
+    match_cost, group_cost, mismatch_cost = cost
+    d_costs = [0]
+    prev = ' '
+    for char in word:
+        if char == prev:
+            d_costs.append(match_cost)
+        elif prev == 'H' or prev == 'W':
+            d_costs.append(group_cost)
+        elif _EDITEX_GROUPS.get(prev, 0) & _EDITEX_GROUPS.get(char, 0):
+            d_costs.append(group_cost)
+        else:
+            d_costs.append(mismatch_cost)
+        prev = char
+    return d_costs
+
+
+def _editex(src, tar, cost=(0, 1, 2), local=False, max_distance=None):
+    """Return the Editex distance of two strings normalized by
+    _editex_normalize
+
+    The arguments are identical to those of the editex() function.
+    """
+    match_cost, group_cost, mismatch_cost = cost
+
+    if src == tar:
+        return 0
+    if len(src) == 0 or len(tar) == 0:
+        distance = (len(src) + len(tar)) * mismatch_cost
+        if max_distance is not None and distance > max_distance:
+            return max_distance + 1
+        return distance
+
+    lens = len(src)
+    lent = len(tar)
+
+    # the delete/insert cost of each position is computed up front
+    del_costs = _editex_d_costs(src, cost)
+    ins_costs = _editex_d_costs(tar, cost)
+    tar_groups = [_EDITEX_GROUPS.get(char, 0) for char in tar]
+
+    if max_distance is None:
+        del_band = lens
+        ins_band = lent
+        big = None
+    else:
+        # cells outside the band are left holding max_distance + 1, which is
+        # as good as infinity for the purposes of the computation
+        big = max_distance + 1
+        # deletes from the start of src are free in the local variant
+        del_band = (lens if local else
+                    _band(max_distance, min(del_costs[1:]), lens))
+        ins_band = _band(max_distance, min(ins_costs[1:]), lent)
+        if lens - lent > del_band or lent - lens > ins_band:
+            return max_distance + 1
+
+    # the first row & column, as in the full matrix
+    prev = [0] * (lent+1)
+    for j in _range(1, lent+1):
+        prev[j] = prev[j-1] + ins_costs[j]
+
+    col = 0
+    for i in _range(1, lens+1):
+        if not local:
+            col += del_costs[i]
+        cur = [big] * (lent+1) if big is not None else [0] * (lent+1)
+        cur[0] = col
+        del_cost = del_costs[i]
+        j_lo = max(1, i - del_band)
+        j_hi = min(lent, i + ins_band)
+        # r(a,b) for src[i] & each character of tar within the band
+        char = src[i-1]
+        groups = _EDITEX_GROUPS.get(char, 0)
+        r_row = [match_cost if char == tar[j] else
+                 group_cost if groups & tar_groups[j] else
+                 mismatch_cost for j in _range(j_lo-1, j_hi)]
+        left = cur[j_lo-1]
+        for j in _range(j_lo, j_hi+1):
+            left = min(prev[j] + del_cost, left + ins_costs[j],
+                       prev[j-1] + r_row[j-j_lo])
+            cur[j] = left
+
+        if ((big is not None and
+             min(col, min(cur[j_lo:j_hi+1])) > max_distance)):
+            return max_distance + 1
+        prev = cur
+
+    if max_distance is not None and prev[lent] > max_distance:
+        return max_distance + 1
+    return prev[lent]
+
+
+def editex(src, tar, cost=(0, 1, 2), local=False, max_distance=None):
     """Editex distance
 
     As described on pages 3 & 4 of
@@ -1939,69 +2691,14 @@ def editex(src, tar, cost=(0, 1, 2), local=False):
         edits:
         match, same-group, and mismatch respectively (by default: (0, 1, 2))
     :param bool local: if True, the local variant of Editex is used
+    :param int max_distance: the maximum distance of interest; if the distance
+        exceeds this, max_distance + 1 is returned instead (by default: None,
+        in which case the distance is always computed in full)
     :returns: Editex distance
     :rtype: int
     """
-    match_cost, group_cost, mismatch_cost = cost
-    letter_groups = (frozenset('AEIOUY'), frozenset('BP'), frozenset('CKQ'),
-                     frozenset('DT'), frozenset('LR'), frozenset('MN'),
-                     frozenset('GJ'), frozenset('FPV'), frozenset('SXZ'),
-                     frozenset('CSZ'))
-    all_letters = frozenset('AEIOUYBPCKQDTLRMNGJFVSXZ')
-
-    def r_cost(ch1, ch2):
-        """Return r(a,b) according to Zobel & Dart's definition
-        """
-        if ch1 == ch2:
-            return match_cost
-        if ch1 in all_letters and ch2 in all_letters:
-            for group in letter_groups:
-                if ch1 in group and ch2 in group:
-                    return group_cost
-        return mismatch_cost
-
-    def d_cost(ch1, ch2):
-        """Return d(a,b) according to Zobel & Dart's definition
-        """
-        if ch1 != ch2 and (ch1 == 'H' or ch1 == 'W'):
-            return group_cost
-        return r_cost(ch1, ch2)
-
-    # convert both src & tar to NFKD normalized unicode
-    src = unicodedata.normalize('NFKD', _unicode(src.upper()))
-    tar = unicodedata.normalize('NFKD', _unicode(tar.upper()))
-    # convert ß to SS (for Python2)
-    src = src.replace('ß', 'SS')
-    tar = tar.replace('ß', 'SS')
-
-    if src == tar:
-        return 0
-    if len(src) == 0:
-        return len(tar) * mismatch_cost
-    if len(tar) == 0:
-        return len(src) * mismatch_cost
-
-    # pylint: disable=no-member
-    d_mat = numpy.zeros((len(src)+1, len(tar)+1), dtype=numpy.int)
-    # pylint: enable=no-member
-    lens = len(src)
-    lent = len(tar)
-    src = ' '+src
-    tar = ' '+tar
-
-    if not local:
-        for i in _range(1, lens+1):
-            d_mat[i, 0] = d_mat[i-1, 0] + d_cost(src[i-1], src[i])
-    for j in _range(1, lent+1):
-        d_mat[0, j] = d_mat[0, j-1] + d_cost(tar[j-1], tar[j])
-
-    for i in _range(1, lens+1):
-        for j in _range(1, lent+1):
-            d_mat[i, j] = min(d_mat[i-1, j] + d_cost(src[i-1], src[i]),
-                              d_mat[i, j-1] + d_cost(tar[j-1], tar[j]),
-                              d_mat[i-1, j-1] + r_cost(src[i], tar[j]))
-
-    return d_mat[lens, lent]
+    return _editex(_editex_normalize(src), _editex_normalize(tar), cost,
+                   local, max_distance)
 
 
 def dist_editex(src, tar, cost=(0, 1, 2), local=False):
@@ -2048,49 +2745,290 @@ def sim_editex(src, tar, cost=(0, 1, 2), local=False):
     return 1 - dist_editex(src, tar, cost, local)
 
 
+class TfidfIndex(object):
+    """A document-frequency index for TF-IDF similarity
+
+    The index holds the document frequency of each term (q-gram or token) in
+    a collection of documents, along with the inverse document frequency
+    (IDF) of each term and the TF-IDF vector & L2 norm of each document, all
+    computed once, so that comparing two strings (sim_tfidf) or searching the
+    collection for the documents most similar to a string (nearest & search)
+    is a sparse dot product.
+
+    Term frequencies & IDFs follow the "Formal Definition of TF/IDF
+    Distance" at:
+    http://alias-i.com/lingpipe/docs/api/com/aliasi/spell/TfIdfDistance.html
+    :math:`tf(t, d) = \\sqrt{count(t, d)}` and
+    :math:`idf(t) = \\log \\frac{N}{df(t)}`, where N is the number of
+    documents; a term that occurs in no document has an IDF of 0.
+    """
+    def __init__(self, docs=None, qval=2):
+        """TfidfIndex initializer
+
+        :param docs: the documents to index: a Corpus, a string (whose
+            whitespace-delimited words are each taken to be a document), or a
+            collection of strings
+        :param int qval: the length of each q-gram; 0 or None to index
+            whitespace-delimited tokens instead (by default 2)
+        """
+        self.qval = qval
+        self._docs = []
+        self._tfs = []
+        self._df = Counter()
+        self._idf = {}
+        self._vectors = []
+        self._norms = []
+        self._postings = {}
+        self._built = True
+        if docs is not None:
+            self.update(docs)
+
+    def __len__(self):
+        """Return the number of documents in the index
+
+        :returns: the number of documents in the index
+        :rtype: int
+        """
+        return len(self._docs)
+
+    def __iter__(self):
+        """Iterate over the documents in the index, in the order they were
+        added
+        """
+        return iter(self._docs)
+
+    def __getitem__(self, index):
+        """Return the document with the given index
+
+        :param int index: the index of a document, in the order documents were
+            added
+        :returns: the document
+        :rtype: str
+        """
+        return self._docs[index]
+
+    def add(self, doc):
+        """Add a document to the index
+
+        Since adding a document changes the IDF of every term, the weights of
+        the index are recomputed (once) before its next use.
+
+        :param str doc: the document to add
+        :returns: the index of the document
+        :rtype: int
+        """
+        index = len(self._docs)
+        q_doc = _tokenize(doc, self.qval)
+        self._docs.append(doc)
+        self._tfs.append(q_doc)
+        self._df.update(q_doc.keys())
+        self._built = False
+        return index
+
+    def update(self, docs):
+        """Add each of a collection of documents to the index
+
+        :param docs: the documents to add: a Corpus, a string (whose
+            whitespace-delimited words are each taken to be a document), or a
+            collection of strings
+        """
+        if isinstance(docs, Corpus):
+            docs = [' '.join(doc) for doc in docs.docs_of_words()]
+        elif isinstance(docs, (str, _unicode)):
+            docs = docs.split()
+        for doc in docs:
+            self.add(doc)
+
+    def _build(self):
+        """Recompute the IDFs, document vectors, norms, & posting lists
+        """
+        num_docs = len(self._docs)
+        self._idf = {term: math.log(num_docs/doc_freq) for term, doc_freq in
+                     self._df.items()}
+        self._vectors = [self._weigh(q_doc) for q_doc in self._tfs]
+        self._norms = [_l2_norm(vector) for vector in self._vectors]
+        self._postings = defaultdict(list)
+        for index, vector in enumerate(self._vectors):
+            for term, weight in vector.items():
+                self._postings[term].append((index, weight))
+        self._built = True
+
+    def _weigh(self, q_doc):
+        """Return the TF-IDF vector of a multiset of terms
+
+        :param Counter q_doc: the terms (q-grams or tokens)
+        :returns: the non-zero TF-IDF weight of each term
+        :rtype: dict
+        """
+        idf = self._idf
+        return {term: math.sqrt(count)*idf[term] for term, count in
+                q_doc.items() if idf.get(term)}
+
+    def idf(self, term):
+        """Return the inverse document frequency of a term
+
+        :param str term: the term (q-gram or token)
+        :returns: the IDF of term (0 if it occurs in no document)
+        :rtype: float
+        """
+        if not self._built:
+            self._build()
+        return self._idf.get(term, 0.0)
+
+    def vector(self, src):
+        """Return the TF-IDF vector of a string
+
+        :param src: a string (or the Counter of its terms, as by QGrams)
+        :returns: the non-zero TF-IDF weight of each term of src
+        :rtype: dict
+        """
+        if not self._built:
+            self._build()
+        if not isinstance(src, Counter):
+            src = _tokenize(src, self.qval)
+        return self._weigh(src)
+
+    def _scores(self, query):
+        """Return the cosine similarity of a query to each document with which
+        it shares a weighted term
+
+        :param str query: the string to search for
+        :returns: the similarity of each such document, by index
+        :rtype: dict
+        """
+        vector = self.vector(query)
+        norm = _l2_norm(vector)
+        dots = defaultdict(float)
+        for term, weight in vector.items():
+            for index, doc_weight in self._postings.get(term, ()):
+                dots[index] += weight*doc_weight
+        return {index: min(1.0, dot/(norm*self._norms[index])) for
+                index, dot in dots.items()}
+
+    def search(self, query, threshold):
+        """Return the documents whose TF-IDF similarity to a query reaches a
+        threshold
+
+        :param str query: the string to search for
+        :param float threshold: the minimum similarity (greater than 0)
+        :returns: (similarity, document) pairs, sorted by descending
+            similarity (ties are broken in the order the documents were added)
+        :rtype: list
+        """
+        matches = sorted((-score, index) for index, score in
+                         self._scores(query).items() if score >= threshold)
+        return [(-score, self._docs[index]) for score, index in matches]
+
+    def nearest(self, query, k=1):
+        """Return the k documents most similar to a query
+
+        Only the posting lists of the terms of query are read, so documents
+        sharing no weighted term with it are never visited (and are never
+        returned).
+
+        :param str query: the string to search for
+        :param int k: the number of documents to return
+        :returns: up to k (similarity, document) pairs, sorted by descending
+            similarity (ties are broken in the order the documents were added)
+        :rtype: list
+        """
+        if k < 1:
+            return []
+        best = heapq.nsmallest(k, ((-score, index) for index, score in
+                                   self._scores(query).items()))
+        return [(-score, self._docs[index]) for score, index in best]
+
+
+def _l2_norm(vector):
+    """Return the L2 (Euclidean) norm of a sparse vector
+
+    :param dict vector: the non-zero elements of the vector
+    :returns: the norm
+    :rtype: float
+    """
+    return math.sqrt(math.fsum(weight*weight for weight in vector.values()))
+
+
 def sim_tfidf(src, tar, qval=2, docs_src=None, docs_tar=None):
     """TF-IDF similarity
 
     This is chiefly based on the "Formal Definition of TF/IDF Distance" at:
     http://alias-i.com/lingpipe/docs/api/com/aliasi/spell/TfIdfDistance.html
 
+    The TF-IDF similarity is the cosine of the TF-IDF vectors of src & tar,
+    with term frequencies & IDFs as defined in TfidfIndex. Each IDF is looked
+    up in an index of the document corpus, which is built from docs_src &
+    docs_tar if they are not already TfidfIndex objects; to compare many
+    pairs against the same corpus, build its TfidfIndex once and pass that.
+    If no corpus is supplied, every term has an IDF of 1.
+
+    Identical strings have a similarity of 1. Distinct strings are compared
+    by their TF-IDF vectors alone, so that, if a corpus is supplied, their
+    similarity is 0 if each of their terms has an IDF of 0 (i.e. occurs in no
+    document, or in every document), and, if docs_tar differs from docs_src,
+    their terms are weighted differently even where they are shared.
+
     :param str src, tar: two strings to be compared (or QGrams/Counter objects)
     :param int qval: the length of each q-gram; 0 or None for non-q-gram
         version
-    :param Counter docs_src: a Counter object or string representing the
-        document corpus for the src string
-    :param Counter docs_tar: a Counter object or string representing the
-        document corpus for the tar string (or set to None to use the docs_src
-        for both)
+    :param docs_src: a TfidfIndex, Corpus, string, or collection of strings
+        representing the document corpus for the src string
+    :param docs_tar: a TfidfIndex, Corpus, string, or collection of strings
+        representing the document corpus for the tar string (or set to None to
+        use the docs_src for both)
     :returns: TF-IDF similarity
     :rtype: float
     """
     if src == tar:
-        return 1.0  # TODO: confirm correctness of this when docs are different
+        return 1.0
     elif len(src) == 0 or len(tar) == 0:
         return 0.0
 
     if isinstance(src, Counter) and isinstance(tar, Counter):
         q_src = src
         q_tar = tar
-    elif qval and qval > 0:
-        q_src = QGrams(src, qval)
-        q_tar = QGrams(tar, qval)
     else:
-        q_src = Counter(src.strip().split())
-        q_tar = Counter(tar.strip().split())
-
-    if isinstance(docs_src, Counter):
-        q_docs = docs_src
-    elif qval and qval > 0:
-        q_docs = QGrams(docs_src, qval)
-    else:
-        q_docs = Counter(docs_src.strip().split())
+        q_src = _tokenize(src, qval)
+        q_tar = _tokenize(tar, qval)
 
     if len(q_src) == 0 or len(q_tar) == 0:
         return 0.0
 
-    # TODO: finish implementation
+    if docs_src is None:
+        v_src = {term: math.sqrt(count) for term, count in q_src.items()}
+        v_tar = {term: math.sqrt(count) for term, count in q_tar.items()}
+    else:
+        if not isinstance(docs_src, TfidfIndex):
+            docs_src = TfidfIndex(docs_src, qval)
+        if docs_tar is None:
+            docs_tar = docs_src
+        elif not isinstance(docs_tar, TfidfIndex):
+            docs_tar = TfidfIndex(docs_tar, qval)
+        v_src = docs_src.vector(q_src)
+        v_tar = docs_tar.vector(q_tar)
+
+    return _sim_vectors(v_src, v_tar)
+
+
+def _sim_vectors(v_src, v_tar):
+    """Return the cosine similarity of two sparse vectors
+
+    :param dict v_src, v_tar: the non-zero elements of the two vectors
+    :returns: the cosine similarity (0 if either vector is 0)
+    :rtype: float
+    """
+    if len(v_src) > len(v_tar):
+        v_src, v_tar = v_tar, v_src
+    if not v_src:
+        return 0.0
+    if v_src == v_tar:
+        return 1.0
+    # fsum is exact, so the result does not depend on the order of the terms
+    dot = math.fsum(weight*v_tar[term] for term, weight in v_src.items() if
+                    term in v_tar)
+    if not dot:
+        return 0.0
+    return min(1.0, dot/(_l2_norm(v_src)*_l2_norm(v_tar)))
 
 ###############################################################################
 
@@ -2125,6 +3063,563 @@ def dist(src, tar, method=sim_levenshtein):
     :rtype: float
     """
     if hasattr(method, '__call__'):
+        info = _METRICS.get(method)
+        if info is not None and info.kind == 'sim' and info.complement:
+            # the distance function is called directly, rather than taking
+            # the complement of its complement
+            return info.complement(src, tar)
         return 1 - method(src, tar)
     else:
         raise AttributeError('Unknown distance function: ' + str(method))
+
+
+class Profile(_unicode):
+    """A string, with the forms in which it is compared cached
+
+    A Profile may be passed to any of the similarity & distance functions of
+    this module in place of a string (it is a string). The forms of the
+    string that the functions compare (its q-grams or tokens, its q-grams in
+    order, its Editex normal form, and its bit-parallel match vectors) are
+    each computed the first time they are needed and then kept, so a string
+    that is compared by several functions, or to several strings, is
+    preprocessed only once.
+
+    The cached forms are shared, so they must not be modified.
+    """
+    __slots__ = ('_tokens', '_ordered_qgrams', '_editex_form', '_peq')
+
+    def __new__(cls, word=''):
+        """Profile constructor
+
+        :param str word: the string to profile
+        """
+        self = super(Profile, cls).__new__(cls, word)
+        self._tokens = {}
+        self._ordered_qgrams = {}
+        self._editex_form = None
+        self._peq = None
+        return self
+
+    def __reduce__(self):
+        """Return the string alone for pickling, since the cached forms are
+        quickly recomputed
+
+        :returns: the constructor & its arguments
+        :rtype: tuple
+        """
+        return Profile, (_unicode(self),)
+
+    def tokens(self, qval=2):
+        """Return the q-grams (or whitespace-delimited tokens) of the string
+
+        :param int qval: the length of each q-gram; 0 or None for
+            whitespace-delimited tokens
+        :returns: the q-grams (or tokens) of the string, as by _tokenize
+        :rtype: Counter
+        """
+        if qval not in self._tokens:
+            self._tokens[qval] = _tokenize(_unicode(self), qval)
+        return self._tokens[qval]
+
+    def ordered_qgrams(self, qval):
+        """Return the q-grams of the stripped string, in order
+
+        :param int qval: the length of each q-gram
+        :returns: the q-grams of the stripped string, as compared by
+            sim_jaro_winkler
+        :rtype: list
+        """
+        if qval not in self._ordered_qgrams:
+            self._ordered_qgrams[qval] = QGrams(_unicode(self).strip(),
+                                                qval).ordered_list
+        return self._ordered_qgrams[qval]
+
+    @property
+    def editex_form(self):
+        """The NFKD normalized, upper-cased form of the string, which Editex
+        compares
+
+        :returns: the normalized string
+        :rtype: str
+        """
+        if self._editex_form is None:
+            self._editex_form = _editex_normalize(_unicode(self))
+        return self._editex_form
+
+    @property
+    def bitparallel(self):
+        """The match bit-vectors of each character of the string
+
+        :returns: the bit-parallel profile, as by _bitparallel_profile
+        :rtype: dict
+        """
+        if self._peq is None:
+            self._peq = _bitparallel_profile(_unicode(self))
+        return self._peq
+
+
+def _tokenize(src, qval=2):
+    """Return the q-grams (or whitespace-delimited tokens) of a string
+
+    This is the multiset over which the q-gram-based similarity measures,
+    such as sim_tversky, operate.
+
+    :param str src: the string to tokenize
+    :param int qval: the length of each q-gram; 0 or None for non-q-gram
+        version
+    :returns: the q-grams (or tokens) of src
+    :rtype: Counter
+    """
+    if isinstance(src, Profile):
+        return src.tokens(qval)
+    if qval and qval > 0:
+        return QGrams(src, qval)
+    return Counter(src.strip().split())
+
+
+def _prepare_levenshtein(query, method, args):
+    """Return a function scoring candidates against query with a
+    Levenshtein-based method, using a precomputed bit-parallel profile
+
+    :param str query: the string that all candidates are compared to
+    :param function method: levenshtein, dist_levenshtein, or sim_levenshtein
+    :param tuple args: additional arguments to method
+    :returns: a function of one candidate, or None if the bit-parallel
+        algorithm does not apply to these arguments
+    :rtype: function
+    """
+    if len(args) > 2:
+        return None
+    mode = args[0] if args else 'lev'
+    ins_cost, del_cost, sub_cost, trans_cost = (args[1] if len(args) > 1 else
+                                                (1, 1, 1, 1))
+    if 'dam' in mode or not (ins_cost == del_cost == sub_cost == 1 and
+                             (mode != 'osa' or trans_cost == 1)):
+        return None
+
+    peq = _bitparallel_profile(query)
+    osa = mode == 'osa'
+
+    def _distance(cand):
+        """Return the Levenshtein distance of query & cand
+        """
+        if cand == query:
+            return 0
+        if not query or not cand:
+            return len(query) + len(cand)
+        return _levenshtein_bitparallel(query, cand, osa, peq=peq)
+
+    def _dist(cand):
+        """Return the normalized Levenshtein distance of query & cand
+        """
+        if cand == query:
+            return 0
+        return _distance(cand) / max(len(query), len(cand))
+
+    if method is levenshtein:
+        return _distance
+    elif method is dist_levenshtein:
+        return _dist
+    return lambda cand: 1 - _dist(cand)
+
+
+def _prepare_qgrams(query, method, args):
+    """Return a function scoring candidates against query with a q-gram-based
+    method, using the q-grams of query computed only once
+
+    :param str query: the string that all candidates are compared to
+    :param function method: a q-gram-based similarity or distance function,
+        such as sim_tversky
+    :param tuple args: additional arguments to method
+    :returns: a function of one candidate
+    :rtype: function
+    """
+    qval = args[0] if args else 2
+    q_query = _tokenize(query, qval)
+
+    def _score(cand):
+        """Return the score of query & cand
+        """
+        if cand != query and q_query:
+            q_cand = _tokenize(cand, qval)
+            if q_cand:
+                return method(q_query, q_cand, *args)
+        # the edge cases are left to the method itself
+        return method(query, cand, *args)
+
+    return _score
+
+
+def _prepare_editex(query, method, args):
+    """Return a function scoring candidates against query with an
+    Editex-based method, using the normalized form of query computed only once
+
+    :param str query: the string that all candidates are compared to
+    :param function method: editex, dist_editex, or sim_editex
+    :param tuple args: additional arguments to method
+    :returns: a function of one candidate, or None if unsupported arguments
+        are supplied
+    :rtype: function
+    """
+    if len(args) > 2:
+        return None
+    cost = args[0] if args else (0, 1, 2)
+    local = args[1] if len(args) > 1 else False
+    norm_query = _editex_normalize(query)
+
+    def _distance(cand):
+        """Return the Editex distance of query & cand
+        """
+        return _editex(norm_query, _editex_normalize(cand), cost, local)
+
+    def _dist(cand):
+        """Return the normalized Editex distance of query & cand
+        """
+        if cand == query:
+            return 0
+        return _distance(cand) / (max(len(query), len(cand)) * cost[2])
+
+    if method is editex:
+        return _distance
+    elif method is dist_editex:
+        return _dist
+    return lambda cand: 1 - _dist(cand)
+
+
+def _prepare_jaro_winkler(query, method, args):
+    """Return a function scoring candidates against query with a
+    Jaro-Winkler-based method, using the match bit-vectors of query computed
+    only once
+
+    Since the Jaro(-Winkler) similarity is symmetric, each candidate is
+    matched against the profile of the query.
+
+    :param str query: the string that all candidates are compared to
+    :param function method: sim_jaro_winkler or dist_jaro_winkler
+    :param tuple args: additional arguments to method
+    :returns: a function of one candidate, or None if unsupported arguments
+        are supplied
+    :rtype: function
+    """
+    if len(args) > 5:
+        return None
+    qval, mode, long_strings, boost_threshold, scaling_factor = (
+        tuple(args) + (1, 'winkler', False, 0.7, 0.1)[len(args):])
+    if mode == 'winkler' and not (0 <= boost_threshold <= 1 and
+                                  0 <= scaling_factor <= 0.25):
+        # leave raising the ValueError to the method itself
+        return None
+
+    q_query = _jaro_sequence(query, qval)
+    peq = _bitparallel_profile(q_query)
+
+    def _sim(cand):
+        """Return the Jaro(-Winkler) similarity of query & cand
+        """
+        if cand == query:
+            return 1.0
+        return _jaro_winkler(_jaro_sequence(cand, qval), q_query, mode,
+                             long_strings, boost_threshold, scaling_factor,
+                             peq)
+
+    if method is sim_jaro_winkler:
+        return _sim
+    return lambda cand: 1 - _sim(cand)
+
+
+def _prepare_compression(query, method, args):
+    """Return a function scoring candidates against query with an NCD-based
+    method, using a compressor primed with query
+
+    :param str query: the string that all candidates are compared to
+    :param function method: dist_compression or sim_compression
+    :param tuple args: additional arguments to method
+    :returns: a function of one candidate, or None if unsupported arguments
+        are supplied
+    :rtype: function
+    """
+    if len(args) > 2:
+        return None
+    compressor = args[0] if args else 'bz2'
+    probs = args[1] if len(args) > 1 else None
+    if compressor == 'arith':
+        if probs is None:
+            # the dictionary is trained on each pair of strings
+            return None
+        comp = Compressor('arith', probs)
+    else:
+        comp = _shared_compressor(compressor)
+    concat_length = comp.primed(query)
+
+    def _dist(cand):
+        """Return the NCD of query & cand
+        """
+        if cand == query:
+            return 0.0
+        return _ncd(comp.length(query), comp.length(cand),
+                    min(concat_length(cand),
+                        comp.concat_length(cand, query, False)))
+
+    if method is dist_compression:
+        return _dist
+    return lambda cand: 1 - _dist(cand)
+
+
+def _prepare_tfidf(query, method, args):
+    """Return a function scoring candidates against query with sim_tfidf,
+    using the TF-IDF vector of query & the document indexes computed only once
+
+    :param str query: the string that all candidates are compared to
+    :param function method: sim_tfidf
+    :param tuple args: additional arguments to method
+    :returns: a function of one candidate, or None if unsupported arguments
+        are supplied
+    :rtype: function
+    """
+    if len(args) > 3:
+        return None
+    qval = args[0] if args else 2
+    docs_src = args[1] if len(args) > 1 else None
+    docs_tar = args[2] if len(args) > 2 else None
+    if docs_src is not None and not isinstance(docs_src, TfidfIndex):
+        docs_src = TfidfIndex(docs_src, qval)
+    if docs_tar is None:
+        docs_tar = docs_src
+    elif not isinstance(docs_tar, TfidfIndex):
+        docs_tar = TfidfIndex(docs_tar, qval)
+    q_query = _tokenize(query, qval)
+    if docs_src is None:
+        v_query = {term: math.sqrt(count) for term, count in q_query.items()}
+    else:
+        v_query = docs_src.vector(q_query)
+
+    def _sim(cand):
+        """Return the TF-IDF similarity of query & cand
+        """
+        if cand == query:
+            return 1.0
+        q_cand = _tokenize(cand, qval)
+        if not q_query or not q_cand:
+            return 0.0
+        if docs_src is None:
+            return _sim_vectors(v_query, {term: math.sqrt(count) for
+                                          term, count in q_cand.items()})
+        return _sim_vectors(v_query, docs_tar.vector(q_cand))
+
+    return _sim
+
+
+_MANY_PREPARERS = {levenshtein: _prepare_levenshtein,
+                   dist_levenshtein: _prepare_levenshtein,
+                   sim_levenshtein: _prepare_levenshtein,
+                   sim_tversky: _prepare_qgrams, dist_tversky: _prepare_qgrams,
+                   sim_dice: _prepare_qgrams, dist_dice: _prepare_qgrams,
+                   sim_jaccard: _prepare_qgrams, dist_jaccard: _prepare_qgrams,
+                   sim_overlap: _prepare_qgrams, dist_overlap: _prepare_qgrams,
+                   sim_tanimoto: _prepare_qgrams, tanimoto: _prepare_qgrams,
+                   sim_cosine: _prepare_qgrams, dist_cosine: _prepare_qgrams,
+                   editex: _prepare_editex, dist_editex: _prepare_editex,
+                   sim_editex: _prepare_editex,
+                   sim_jaro_winkler: _prepare_jaro_winkler,
+                   dist_jaro_winkler: _prepare_jaro_winkler,
+                   dist_compression: _prepare_compression,
+                   sim_compression: _prepare_compression,
+                   sim_tfidf: _prepare_tfidf}
+
+
+def _batch_scorer(query, method, args=()):
+    """Return a function scoring candidates against query with method
+
+    :param str query: the string that all candidates are compared to
+    :param function method: a similarity or distance function
+    :param tuple args: additional arguments to method
+    :returns: a function of one candidate, which uses a kernel that
+        preprocesses query only once, if method has one
+    :rtype: function
+    """
+    score = None
+    if method in _MANY_PREPARERS and not isinstance(query, Counter):
+        score = _MANY_PREPARERS[method](query, method, args)
+    if score is None:
+        def score(cand):
+            """Return the score of query & cand
+            """
+            return method(query, cand, *args)
+    return score
+
+
+def sim_many(query, candidates, method=sim_levenshtein, *args):
+    """generalized one-to-many similarity
+
+    This calls a similarity (or distance) function on a query string and
+    each of a collection of candidate strings. For the Levenshtein, Editex,
+    Jaro-Winkler, compression, and q-gram-based (Tversky, Dice, Jaccard,
+    overlap, Tanimoto, & cosine) functions, the query is preprocessed
+    (profiled, normalized, compressed, or split into q-grams) only once,
+    rather than once per candidate. Any other function is
+    simply called for each candidate.
+
+    :param str query: the string that all candidates are compared to
+    :param list candidates: a collection of strings to compare to query
+    :param function method: specifies the similarity metric (Levenshtein by
+        default)
+    :param args: additional arguments to pass to method, after the two
+        strings
+    :returns: the values of method(query, candidate, \\*args), in the order of
+        candidates
+    :rtype: numpy.ndarray
+    """
+    if not hasattr(method, '__call__'):
+        raise AttributeError('Unknown similarity function: ' + str(method))
+
+    score = _batch_scorer(query, method, args)
+    candidates = list(candidates)
+    # pylint: disable=no-member
+    scores = numpy.empty(len(candidates), dtype=numpy.float)
+    # pylint: enable=no-member
+    for i, cand in enumerate(candidates):
+        scores[i] = score(cand)
+    return scores
+
+
+def dist_many(query, candidates, method=sim_levenshtein, *args):
+    """generalized one-to-many distance
+
+    This is the complement of sim_many, just as dist is the complement of
+    sim.
+
+    :param str query: the string that all candidates are compared to
+    :param list candidates: a collection of strings to compare to query
+    :param function method: specifies the similarity metric (Levenshtein by
+        default) -- Note that this takes a similarity metric function, not
+        a distance metric function.
+    :param args: additional arguments to pass to method, after the two
+        strings
+    :returns: 1 - method(query, candidate, \\*args), in the order of
+        candidates
+    :rtype: numpy.ndarray
+    """
+    if not hasattr(method, '__call__'):
+        raise AttributeError('Unknown distance function: ' + str(method))
+    return 1 - sim_many(query, candidates, method, *args)
+
+
+class MetricInfo(namedtuple('MetricInfo', ['kind', 'normalized', 'symmetric',
+                                           'triangle', 'integer',
+                                           'set_based', 'preprocess',
+                                           'complement', 'batch'])):
+    """The properties of a similarity or distance function
+
+    The fields are:
+
+        - kind -- 'sim' for a similarity (or score), 'dist' for a distance
+        - normalized -- True if its values are in the range [0, 1]
+        - symmetric -- True if method(src, tar) equals method(tar, src)
+        - triangle -- True if it (or, for a normalized similarity, its
+          complement) obeys the triangle inequality, i.e. is a true metric
+        - integer -- True if its values are integers
+        - set_based -- True if it compares the (multi)sets of q-grams,
+          tokens, or characters of strings, rather than the strings as
+          sequences
+        - preprocess -- the form in which it compares strings: 'qgrams' (a
+          Counter of q-grams, as by QGrams), 'normalized' (a case- &
+          Unicode-normalized string), or None (the strings themselves)
+        - complement -- the complementary distance (or similarity) function,
+          or None
+        - batch -- True if sim_many has a kernel for it that preprocesses the
+          query only once
+
+    These describe the function when it is called with its default
+    arguments.
+    """
+    __slots__ = ()
+
+
+_METRICS = {}
+
+
+def _register(method, kind, normalized=True, symmetric=True, triangle=False,
+              integer=False, set_based=False, preprocess=None,
+              complement=None):
+    """Add a similarity or distance function to the registry
+
+    :param function method: the function to register
+    :param str kind: 'sim' or 'dist'
+    :param normalized, symmetric, triangle, integer, set_based, preprocess,
+        complement: the properties of method, as described for MetricInfo
+    """
+    _METRICS[method] = MetricInfo(kind, normalized, symmetric, triangle,
+                                  integer, set_based, preprocess, complement,
+                                  method in _MANY_PREPARERS)
+
+
+def _register_pair(sim_method, dist_method, **props):
+    """Add a complementary similarity & distance pair to the registry
+
+    :param function sim_method: the similarity function
+    :param function dist_method: the distance function
+    :param props: the properties shared by the pair, as for _register
+    """
+    _register(sim_method, 'sim', complement=dist_method, **props)
+    _register(dist_method, 'dist', complement=sim_method, **props)
+
+
+_register(levenshtein, 'dist', normalized=False, triangle=True, integer=True)
+_register_pair(sim_levenshtein, dist_levenshtein)
+_register(damerau_levenshtein, 'dist', normalized=False, triangle=True,
+          integer=True)
+_register_pair(sim_damerau, dist_damerau)
+_register(hamming, 'dist', normalized=False, triangle=True, integer=True)
+_register_pair(sim_hamming, dist_hamming, triangle=True)
+_register_pair(sim_tversky, dist_tversky, triangle=True, set_based=True,
+               preprocess='qgrams')
+_register_pair(sim_dice, dist_dice, set_based=True, preprocess='qgrams')
+_register_pair(sim_jaccard, dist_jaccard, triangle=True, set_based=True,
+               preprocess='qgrams')
+_register_pair(sim_overlap, dist_overlap, set_based=True, preprocess='qgrams')
+_register(sim_tanimoto, 'sim', triangle=True, set_based=True,
+          preprocess='qgrams')
+_register(tanimoto, 'dist', normalized=False, set_based=True,
+          preprocess='qgrams')
+_register_pair(sim_cosine, dist_cosine, set_based=True, preprocess='qgrams')
+_register_pair(sim_strcmp95, dist_strcmp95)
+_register_pair(sim_jaro_winkler, dist_jaro_winkler)
+_register_pair(sim_lcsseq, dist_lcsseq, triangle=True)
+_register_pair(sim_lcsstr, dist_lcsstr, triangle=True)
+_register_pair(sim_ratcliff_obershelp, dist_ratcliff_obershelp,
+               symmetric=False)
+_register(mra_compare, 'sim', normalized=False, integer=True)
+_register_pair(sim_mra, dist_mra)
+_register_pair(sim_compression, dist_compression)
+_register_pair(sim_monge_elkan, dist_monge_elkan, symmetric=False,
+               preprocess='qgrams')
+_register_pair(sim_ident, dist_ident, triangle=True, integer=True)
+_register(sim_matrix, 'sim', normalized=False, integer=True)
+_register(needleman_wunsch, 'sim', normalized=False, integer=True)
+_register(smith_waterman, 'sim', normalized=False, integer=True)
+_register(gotoh, 'sim', normalized=False)
+_register_pair(sim_length, dist_length, triangle=True)
+_register_pair(sim_prefix, dist_prefix)
+_register_pair(sim_suffix, dist_suffix)
+_register_pair(sim_mlipns, dist_mlipns, integer=True)
+_register(bag, 'dist', normalized=False, integer=True, set_based=True)
+_register_pair(sim_bag, dist_bag, set_based=True)
+_register(editex, 'dist', normalized=False, integer=True,
+          preprocess='normalized')
+_register_pair(sim_editex, dist_editex, preprocess='normalized')
+_register(sim_tfidf, 'sim', set_based=True, preprocess='qgrams')
+
+
+def metric_info(method):
+    """Return the properties of a similarity or distance function
+
+    This allows higher-level code (such as the clustering and index modules)
+    to tell whether a function is symmetric, a true metric, integer-valued,
+    etc., and so to choose suitable data structures & shortcuts.
+
+    :param function method: a similarity or distance function
+    :returns: the properties of method, or None if it is not one of the
+        functions of this module
+    :rtype: MetricInfo
+    """
+    return _METRICS.get(method)
@@ -0,0 +1,1709 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2014-2015 by Christopher C. Little.
+# This file is part of Abydos.
+#
+# Abydos is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Abydos is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Abydos. If not, see <http://www.gnu.org/licenses/>.
+
+"""abydos.index
+
+The index module implements indexes for finding similar strings within a
+collection without comparing against every member, including:
+
+    - BK-tree (for integer-valued metrics, such as Levenshtein distance)
+    - VP-tree (for any metric, including real-valued metrics, such as
+      normalized LCSseq distance)
+    - q-gram inverted index (for q-gram-based similarity measures, such as
+      the Jaccard & Tversky indices)
+    - MinHash locality-sensitive hashing index (for approximate Jaccard
+      similarity)
+    - SimHash index (for approximate cosine similarity)
+    - nearest string matcher (for the top-k strings under any similarity
+      measure, with pluggable blocking)
+
+It also implements a similarity self-join, for finding all similar pairs
+within a collection.
+"""
+
+from __future__ import unicode_literals
+from __future__ import division
+import hashlib
+import heapq
+import math
+import pickle
+import struct
+import zlib
+from collections import defaultdict, Counter
+import numpy
+from .distance import levenshtein, sim_levenshtein, sim_damerau, \
+    sim_tversky, sim_dice, sim_jaccard, sim_tanimoto, sim_overlap, \
+    sim_cosine, sim_jaro_winkler, sim_lcsseq, sim_lcsstr, sim_length, \
+    sim_editex, metric_info, _tokenize, _editex_normalize, _batch_scorer
+from .qgram import QGrams
+from ._compat import _range
+
+
+class BKTree(object):
+    """A Burkhard-Keller tree
+
+    A BK-tree indexes a collection of strings by their distances from one
+    another under a metric with integer values, such as Levenshtein distance.
+    Cf. Burkhard, Walter A. and Robert M. Keller. 1973. "Some approaches to
+    best-match file searching." Communications of the ACM, 16(4). 230--236.
+
+    Each node's children are keyed by their distance from that node, so that,
+    by the triangle inequality, a search within distance r of a query q need
+    only descend into the children of a node n that are keyed by distances in
+    the range :math:`[d(q, n) - r, d(q, n) + r]`.
+
+    The tree is stored as flat lists of nodes, so that it may be pickled
+    (e.g. for shipping to worker processes) regardless of its depth, provided
+    that its metric can be pickled.
+    """
+    def __init__(self, words=None, metric=levenshtein, exact=True):
+        """BKTree initializer
+
+        :param list words: a collection of strings to add to the tree
+        :param function metric: a distance metric with non-negative integer
+            values that obeys the triangle inequality, such as
+            abydos.distance.levenshtein, .damerau_levenshtein, or .hamming
+            (Levenshtein by default)
+        :param bool exact: if False, metrics from abydos.distance that do not
+            obey the triangle inequality (such as editex or bag) are accepted,
+            in which case searches may miss some of the strings that they
+            would otherwise return
+        """
+        if not hasattr(metric, '__call__'):
+            raise ValueError('metric must be a function')
+        info = metric_info(metric)
+        if info is not None:
+            if info.kind != 'dist':
+                raise ValueError('metric must be a distance function')
+            if exact and not info.triangle:
+                raise ValueError(metric.__name__ + ' does not obey the ' +
+                                 'triangle inequality; set exact=False to ' +
+                                 'use it regardless')
+        self.metric = metric
+        self._words = []
+        self._children = []
+        if words is not None:
+            self.update(words)
+
+    def __len__(self):
+        """Return the number of strings in the tree
+
+        :returns: the number of strings in the tree
+        :rtype: int
+        """
+        return len(self._words)
+
+    def __iter__(self):
+        """Iterate over the strings in the tree, in the order they were added
+        """
+        return iter(self._words)
+
+    def __contains__(self, word):
+        """Return True if word is in the tree
+
+        :param str word: the string to look for
+        :returns: True if word is in the tree
+        :rtype: bool
+        """
+        return word in (match for _, match in self.search(word, 0))
+
+    def add(self, word):
+        """Add a string to the tree
+
+        :param str word: the string to add
+        :returns: True if word was added, False if it was already present
+        :rtype: bool
+        """
+        if not self._words:
+            self._words.append(word)
+            self._children.append({})
+            return True
+
+        node = 0
+        while True:
+            distance = self.metric(word, self._words[node])
+            if distance == 0 and word == self._words[node]:
+                return False
+            children = self._children[node]
+            if distance in children:
+                node = children[distance]
+            else:
+                children[distance] = len(self._words)
+                self._words.append(word)
+                self._children.append({})
+                return True
+
+    def update(self, words):
+        """Add each of a collection of strings to the tree
+
+        :param list words: the strings to add
+        """
+        for word in words:
+            self.add(word)
+
+    def search(self, query, max_dist):
+        """Return the strings within a distance of a query
+
+        :param str query: the string to search for
+        :param int max_dist: the maximum distance from query of the strings to
+            return
+        :returns: (distance, string) pairs, sorted by distance (ties are
+            broken in the order the strings were added)
+        :rtype: list
+        """
+        if not self._words:
+            return []
+
+        matches = []
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            distance = self.metric(query, self._words[node])
+            if distance <= max_dist:
+                matches.append((distance, node))
+            for child_dist, child in self._children[node].items():
+                if distance - max_dist <= child_dist <= distance + max_dist:
+                    stack.append(child)
+
+        return [(distance, self._words[node]) for distance, node in
+                sorted(matches)]
+
+    def nearest(self, query, k=1):
+        """Return the k strings nearest to a query
+
+        Nodes are visited best-first, in order of the lower bound on their
+        distance from the query implied by the triangle inequality, and the
+        search stops once that bound exceeds the distance of the k-th best
+        string found so far.
+
+        :param str query: the string to search for
+        :param int k: the number of strings to return
+        :returns: up to k (distance, string) pairs, sorted by distance (ties
+            are broken in the order the strings were added)
+        :rtype: list
+        """
+        if k < 1 or not self._words:
+            return []
+
+        best = []  # a max-heap of (-distance, -node) of the k best so far
+        queue = [(0, 0)]  # a min-heap of (lower bound, node)
+        while queue:
+            bound, node = heapq.heappop(queue)
+            if len(best) == k and bound > -best[0][0]:
+                break
+            distance = self.metric(query, self._words[node])
+            if len(best) < k:
+                heapq.heappush(best, (-distance, -node))
+            elif (distance, node) < (-best[0][0], -best[0][1]):
+                heapq.heapreplace(best, (-distance, -node))
+            for child_dist, child in self._children[node].items():
+                child_bound = max(bound, abs(distance - child_dist))
+                heapq.heappush(queue, (child_bound, child))
+
+        return [(-distance, self._words[-node]) for distance, node in
+                sorted(best, reverse=True)]
+
+
+# slack for floating-point rounding in the bounds implied by the triangle
+# inequality, so that strings exactly at the search radius are not pruned
+_BOUND_SLACK = 1e-12
+
+
+class VPTree(object):
+    """A vantage-point tree
+
+    A VP-tree indexes a collection of strings by their distances from one
+    another under any distance metric that obeys the triangle inequality,
+    including metrics with real values, such as abydos.distance.dist_jaccard
+    or .dist_lcsseq. Cf. Yianilos, Peter N. 1993. "Data structures and
+    algorithms for nearest neighbor search in general metric spaces."
+    Proceedings of the Fourth Annual ACM-SIAM Symposium on Discrete
+    Algorithms. 311--321.
+
+    Each node is a string (its vantage point) that divides the strings below
+    it into those within (inside) and beyond (outside) a radius of it. Each
+    node also records the least & greatest distance from its vantage point to
+    the strings of each of its subtrees, so that, by the triangle inequality,
+    a search within distance r of a query q need only descend into a subtree
+    whose distances from the vantage point v lie within
+    :math:`[d(q, v) - r, d(q, v) + r]`.
+
+    Optionally, the tree also keeps the distances from each string to a few
+    fixed pivot strings (multiple vantage points, after the MVP-tree of
+    Bozkaya, Tolga and Meral Ozsoyoglu. 1999. "Indexing large metric spaces
+    for similarity search queries." ACM Transactions on Database Systems,
+    24(3). 361--404), which bound the distance from a query to each node
+    before it is computed, so that many nodes are passed over without
+    computing their distance from the query at all.
+
+    The number of distance computations made by the most recent search or
+    nearest call is kept in the evaluations attribute.
+
+    The tree is stored as flat lists of nodes, so that it may be pickled (or
+    saved to disk with save and restored with load) regardless of its depth,
+    provided that its metric can be pickled.
+    """
+    def __init__(self, words=None, metric=levenshtein, pivots=0, exact=True):
+        """VPTree initializer
+
+        :param list words: a collection of strings to add to the tree
+        :param function metric: a distance metric that obeys the triangle
+            inequality, such as abydos.distance.levenshtein, .dist_jaccard,
+            .dist_lcsseq, or .dist_lcsstr (Levenshtein by default)
+        :param int pivots: the number of pivot strings (from among the first
+            strings added) whose distances from every string are kept
+        :param bool exact: if False, metrics from abydos.distance that do not
+            obey the triangle inequality (such as dist_jaro_winkler or
+            dist_editex) are accepted, in which case searches may miss some
+            of the strings that they would otherwise return
+        """
+        if not hasattr(metric, '__call__'):
+            raise ValueError('metric must be a function')
+        info = metric_info(metric)
+        if info is not None:
+            if info.kind != 'dist':
+                raise ValueError('metric must be a distance function')
+            if exact and not info.triangle:
+                raise ValueError(metric.__name__ + ' does not obey the ' +
+                                 'triangle inequality; set exact=False to ' +
+                                 'use it regardless')
+        self.metric = metric
+        self.num_pivots = pivots
+        self.evaluations = 0
+        self._words = []
+        self._children = []  # the inside & outside child of each node
+        self._radii = []
+        self._bounds = []  # the inside & outside subtree distance ranges
+        self._pivots = []
+        self._pivot_dists = []
+        if words is not None:
+            self.update(words)
+
+    def __len__(self):
+        """Return the number of strings in the tree
+
+        :returns: the number of strings in the tree
+        :rtype: int
+        """
+        return len(self._words)
+
+    def __iter__(self):
+        """Iterate over the strings in the tree, in the order they were added
+        """
+        return iter(self._words)
+
+    def __contains__(self, word):
+        """Return True if word is in the tree
+
+        :param str word: the string to look for
+        :returns: True if word is in the tree
+        :rtype: bool
+        """
+        return word in (match for _, match in self.search(word, 0))
+
+    def _new_node(self, word):
+        """Append a node (without linking it into the tree)
+
+        :param str word: the string of the node
+        :returns: the index of the node
+        :rtype: int
+        """
+        if len(self._pivots) < self.num_pivots:
+            self._pivots.append(word)
+            for i, dists in enumerate(self._pivot_dists):
+                dists.append(self.metric(self._words[i], word))
+        self._words.append(word)
+        self._children.append([None, None])
+        self._radii.append(None)
+        self._bounds.append([None, None])
+        self._pivot_dists.append([self.metric(word, pivot) for pivot in
+                                  self._pivots])
+        return len(self._words) - 1
+
+    def _extend_bounds(self, node, side, distance):
+        """Extend the distance range of a subtree of a node to a distance
+
+        :param int node: the index of the node
+        :param int side: 0 for the inside subtree, 1 for the outside subtree
+        :param float distance: a distance from the node's vantage point to a
+            string in the subtree
+        """
+        bounds = self._bounds[node][side]
+        if bounds is None:
+            self._bounds[node][side] = [distance, distance]
+        else:
+            bounds[0] = min(bounds[0], distance)
+            bounds[1] = max(bounds[1], distance)
+
+    def add(self, word):
+        """Add a string to the tree
+
+        :param str word: the string to add
+        :returns: True if word was added, False if it was already present
+        :rtype: bool
+        """
+        if not self._words:
+            self._new_node(word)
+            return True
+
+        node = 0
+        while True:
+            distance = self.metric(word, self._words[node])
+            if distance == 0 and word == self._words[node]:
+                return False
+            if self._radii[node] is None:
+                self._radii[node] = distance
+            side = 0 if distance <= self._radii[node] else 1
+            child = self._children[node][side]
+            if child is None:
+                # a duplicate would have followed the same path, & so have
+                # been found by now
+                self._extend_bounds(node, side, distance)
+                self._children[node][side] = self._new_node(word)
+                return True
+            self._extend_bounds(node, side, distance)
+            node = child
+
+    def update(self, words):
+        """Add each of a collection of strings to the tree
+
+        If the tree is empty, it is built top-down, with each node's radius
+        being the median distance from its vantage point to the strings below
+        it, so that the tree is balanced.
+
+        :param list words: the strings to add
+        """
+        if self._words:
+            for word in words:
+                self.add(word)
+            return
+
+        seen = set()
+        for word in words:
+            if word not in seen:
+                seen.add(word)
+                self._new_node(word)
+        if not self._words:
+            return
+
+        # each node is built from (node, the indices of the strings below it)
+        stack = [(0, _range(1, len(self._words)))]
+        while stack:
+            node, below = stack.pop()
+            if not below:
+                continue
+            vantage = self._words[node]
+            dists = [self.metric(self._words[i], vantage) for i in below]
+            radius = sorted(dists)[(len(dists) - 1) // 2]
+            self._radii[node] = radius
+            sides = ([], [])
+            for distance, i in sorted(zip(dists, below)):
+                side = 0 if distance <= radius else 1
+                sides[side].append(i)
+                self._extend_bounds(node, side, distance)
+            for side in (0, 1):
+                if sides[side]:
+                    # the farthest string makes the best vantage point
+                    child = sides[side].pop()
+                    self._children[node][side] = child
+                    stack.append((child, sides[side]))
+
+    def _pivot_range(self, node, query_dists):
+        """Return the bounds on the distance from the query to a node implied
+        by the pivots
+
+        :param int node: the index of the node
+        :param list query_dists: the distances from the query to the pivots
+        :returns: the lower & upper bounds
+        :rtype: tuple
+        """
+        lower, upper = 0, float('inf')
+        for query_dist, node_dist in zip(query_dists,
+                                         self._pivot_dists[node]):
+            lower = max(lower, abs(query_dist - node_dist))
+            upper = min(upper, query_dist + node_dist)
+        return lower, upper
+
+    def _visit(self, node, query, query_dists, max_dist):
+        """Return the distance from the query to a node, if it may be within
+        max_dist, & bounds on it
+
+        :param int node: the index of the node
+        :param str query: the string to search for
+        :param list query_dists: the distances from the query to the pivots
+        :param float max_dist: the greatest distance of interest
+        :returns: the distance (or None, if it was not computed) & the lower
+            & upper bounds on it
+        :rtype: tuple
+        """
+        lower, upper = self._pivot_range(node, query_dists)
+        if lower > max_dist + _BOUND_SLACK:
+            return None, lower, upper
+        self.evaluations += 1
+        distance = self.metric(query, self._words[node])
+        return distance, distance, distance
+
+    def _child_bounds(self, node, lower, upper):
+        """Return each child of a node with the lower bound on the distance
+        from the query to the strings in its subtree
+
+        :param int node: the index of the node
+        :param float lower, upper: the bounds on the distance from the query
+            to the node
+        :returns: (lower bound, child) pairs
+        :rtype: list
+        """
+        children = []
+        for child, bounds in zip(self._children[node], self._bounds[node]):
+            if child is not None:
+                children.append((max(0, bounds[0] - upper, lower - bounds[1]),
+                                 child))
+        return children
+
+    def _query_dists(self, query):
+        """Return the distances from a query to the pivots
+
+        :param str query: the string to search for
+        :returns: the distances
+        :rtype: list
+        """
+        self.evaluations = len(self._pivots)
+        return [self.metric(query, pivot) for pivot in self._pivots]
+
+    def search(self, query, max_dist):
+        """Return the strings within a distance of a query
+
+        :param str query: the string to search for
+        :param float max_dist: the maximum distance from query of the strings
+            to return
+        :returns: (distance, string) pairs, sorted by distance (ties are
+            broken in the order the strings were added)
+        :rtype: list
+        """
+        self.evaluations = 0
+        if not self._words:
+            return []
+
+        query_dists = self._query_dists(query)
+        matches = []
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            distance, lower, upper = self._visit(node, query, query_dists,
+                                                 max_dist)
+            if distance is not None and distance <= max_dist:
+                matches.append((distance, node))
+            for bound, child in self._child_bounds(node, lower, upper):
+                if bound <= max_dist + _BOUND_SLACK:
+                    stack.append(child)
+
+        return [(distance, self._words[node]) for distance, node in
+                sorted(matches)]
+
+    def nearest(self, query, k=1):
+        """Return the k strings nearest to a query
+
+        Nodes are visited best-first, in order of the lower bound on their
+        distance from the query implied by the triangle inequality, and the
+        search stops once that bound exceeds the distance of the k-th best
+        string found so far.
+
+        :param str query: the string to search for
+        :param int k: the number of strings to return
+        :returns: up to k (distance, string) pairs, sorted by distance (ties
+            are broken in the order the strings were added)
+        :rtype: list
+        """
+        self.evaluations = 0
+        if k < 1 or not self._words:
+            return []
+
+        query_dists = self._query_dists(query)
+        best = []  # a max-heap of (-distance, -node) of the k best so far
+        queue = [(0, 0)]  # a min-heap of (lower bound, node)
+        while queue:
+            bound, node = heapq.heappop(queue)
+            kth = -best[0][0] if len(best) == k else float('inf')
+            if bound > kth + _BOUND_SLACK:
+                break
+            distance, lower, upper = self._visit(node, query, query_dists,
+                                                 kth)
+            if distance is not None:
+                if len(best) < k:
+                    heapq.heappush(best, (-distance, -node))
+                elif (distance, node) < (-best[0][0], -best[0][1]):
+                    heapq.heapreplace(best, (-distance, -node))
+            for child_bound, child in self._child_bounds(node, lower, upper):
+                heapq.heappush(queue, (max(bound, child_bound), child))
+
+        return [(-distance, self._words[-node]) for distance, node in
+                sorted(best, reverse=True)]
+
+    def save(self, filename):
+        """Save the tree to a file
+
+        :param str filename: the path of the file to write
+        """
+        with open(filename, 'wb') as tree_file:
+            pickle.dump(self, tree_file, pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, filename):
+        """Load a tree saved to a file by save
+
+        :param str filename: the path of the file to read
+        :returns: the tree
+        :rtype: VPTree
+        """
+        with open(filename, 'rb') as tree_file:
+            tree = pickle.load(tree_file)
+        if not isinstance(tree, cls):
+            raise ValueError(filename + ' does not contain a ' +
+                             cls.__name__)
+        return tree
+
+
+_SET_METRICS = frozenset([sim_tversky, sim_dice, sim_jaccard, sim_tanimoto,
+                          sim_overlap, sim_cosine])
+
+
+def _min_overlap(metric, size_src, size_tar, threshold, alpha=1, beta=1):
+    """Return the minimum q-gram overlap needed to reach a similarity
+
+    :param function metric: a q-gram-based similarity function: sim_tversky,
+        sim_dice, sim_jaccard, sim_tanimoto, sim_overlap, or sim_cosine
+    :param int size_src, size_tar: the number of q-grams in the src & tar
+        multisets
+    :param float threshold: the similarity to reach (greater than 0)
+    :param float alpha, beta: the Tversky index parameters (for sim_tversky)
+    :returns: the minimum size of the multiset intersection of src & tar for
+        their similarity to reach threshold
+    :rtype: float
+    """
+    if metric is sim_dice:
+        alpha = beta = 0.5
+    elif metric is sim_overlap:
+        return max(1, threshold * min(size_src, size_tar))
+    elif metric is sim_cosine:
+        return max(1, threshold * math.sqrt(size_src * size_tar))
+    elif metric is not sim_tversky:
+        alpha = beta = 1  # sim_jaccard & sim_tanimoto
+    # sim_tversky: o / (o + alpha*(|X|-o) + beta*(|Y|-o)) >= threshold
+    denominator = 1 - threshold + threshold * (alpha + beta)
+    if denominator <= 0:
+        return 1
+    return max(1, threshold * (alpha * size_src + beta * size_tar) /
+               denominator)
+
+
+class QGramIndex(object):
+    """A q-gram inverted index
+
+    A q-gram index maps each q-gram to the strings in a collection that
+    contain it (its posting list), so that the strings that may be similar to
+    a query under a q-gram-based similarity measure (sim_tversky, sim_dice,
+    sim_jaccard, sim_tanimoto, sim_overlap, or sim_cosine) can be found
+    without comparing the query to every string.
+
+    Similarity searches follow the filtering strategy of Chaudhuri, Surajit,
+    Venkatesh Ganti, and Raghav Kaushik. 2006. "A primitive operator for
+    similarity joins in data cleaning." Proceedings of the 22nd International
+    Conference on Data Engineering. 5--16, with multiset overlaps:
+
+        - length filtering: a string with too many or too few q-grams can
+          never share enough of them with the query
+        - prefix filtering: a string that shares enough q-grams with the query
+          must share at least one of the query's rarest q-grams, so only the
+          posting lists of those are read
+        - count filtering: the q-gram overlap of each remaining candidate is
+          checked before the similarity itself is computed
+    """
+    def __init__(self, words=None, qval=2, start_stop='$#'):
+        """QGramIndex initializer
+
+        :param list words: a collection of strings to add to the index
+        :param int qval: the length of each q-gram; 0 or None to index
+            whitespace-delimited tokens instead (by default 2)
+        :param str start_stop: the start & stop symbol(s) to concatenate on
+            either end of each string, as defined in abydos.qgram.QGrams
+        """
+        self.qval = qval
+        self.start_stop = start_stop
+        self._words = []
+        self._qgrams = []
+        self._sizes = []
+        self._postings = defaultdict(list)
+        self._size_counts = Counter()
+        if words is not None:
+            self.update(words)
+
+    def __len__(self):
+        """Return the number of strings in the index
+
+        :returns: the number of strings in the index
+        :rtype: int
+        """
+        return len(self._words)
+
+    def __iter__(self):
+        """Iterate over the strings in the index, in the order they were added
+        """
+        return iter(self._words)
+
+    def __getitem__(self, index):
+        """Return the string with the given index
+
+        :param int index: the index of a string, in the order strings were
+            added
+        :returns: the string
+        :rtype: str
+        """
+        return self._words[index]
+
+    def qgrams(self, word):
+        """Return the q-grams of a string, as they are indexed
+
+        :param str word: the string
+        :returns: the q-grams of word (or its tokens, if qval is 0 or None)
+        :rtype: Counter
+        """
+        if self.qval and self.qval > 0:
+            return Counter(QGrams(word, self.qval, self.start_stop))
+        return Counter(word.strip().split())
+
+    def add(self, word):
+        """Add a string to the index
+
+        :param str word: the string to add
+        :returns: the index of the string
+        :rtype: int
+        """
+        index = len(self._words)
+        q_word = self.qgrams(word)
+        self._words.append(word)
+        self._qgrams.append(q_word)
+        self._sizes.append(sum(q_word.values()))
+        self._size_counts[self._sizes[-1]] += 1
+        for qgram in q_word:
+            self._postings[qgram].append(index)
+        return index
+
+    def update(self, words):
+        """Add each of a collection of strings to the index
+
+        :param list words: the strings to add
+        """
+        for word in words:
+            self.add(word)
+
+    def candidates(self, query, threshold, metric=sim_jaccard, *args):
+        """Return the strings that pass the length, prefix, & count filters
+
+        Every string whose similarity to query reaches threshold is among
+        the candidates, but not every candidate need reach it.
+
+        :param str query: the string to search for
+        :param float threshold: the minimum similarity (greater than 0)
+        :param function metric: a q-gram-based similarity function:
+            sim_tversky, sim_dice, sim_jaccard (default), sim_tanimoto,
+            sim_overlap, or sim_cosine
+        :param args: additional arguments to metric, after qval (alpha & beta,
+            for sim_tversky)
+        :returns: the indices of the candidate strings, in ascending order
+        :rtype: list
+        """
+        if metric not in _SET_METRICS:
+            raise ValueError('Unsupported metric; metric must be a ' +
+                             'q-gram-based similarity function.')
+        if len(args) > 2:
+            raise ValueError('Unsupported arguments; the symmetric (biased) ' +
+                             'Tversky index is not supported.')
+        if threshold <= 0:
+            raise ValueError('threshold must be greater than 0')
+
+        q_query = self.qgrams(query)
+        size_query = sum(q_query.values())
+        if size_query == 0:
+            # the metrics score two empty multisets as identical
+            return [i for i in _range(len(self._words))
+                    if self._sizes[i] == 0]
+
+        def _required(size):
+            """Return the overlap needed with a string with size q-grams
+            """
+            return _min_overlap(metric, size_query, size, threshold,
+                                *args) - 1e-9
+
+        # length filter
+        sizes = frozenset(size for size in self._size_counts
+                          if _required(size) <= min(size_query, size))
+        if not sizes:
+            return []
+        min_required = int(math.ceil(min(_required(size) for size in sizes)))
+
+        # prefix filter: order the query's q-grams from rarest to most common
+        # & read only the posting lists of the first
+        # size_query - min_required + 1 of them (counting repeated q-grams)
+        prefix_len = size_query - min_required + 1
+        candidates = set()
+        for qgram in sorted(q_query, key=lambda qgram:
+                            (len(self._postings.get(qgram, ())), qgram)):
+            candidates.update(self._postings.get(qgram, ()))
+            prefix_len -= q_query[qgram]
+            if prefix_len <= 0:
+                break
+
+        # length & count filters
+        matches = []
+        for i in sorted(candidates):
+            size = self._sizes[i]
+            if size in sizes:
+                q_word = self._qgrams[i]
+                overlap = sum(min(count, q_word[qgram]) for qgram, count in
+                              q_query.items() if qgram in q_word)
+                if overlap >= _required(size):
+                    matches.append(i)
+        return matches
+
+    def search(self, query, threshold, metric=sim_jaccard, *args):
+        """Return the strings whose similarity to a query reaches a threshold
+
+        :param str query: the string to search for
+        :param float threshold: the minimum similarity (greater than 0)
+        :param function metric: a q-gram-based similarity function:
+            sim_tversky, sim_dice, sim_jaccard (default), sim_tanimoto,
+            sim_overlap, or sim_cosine
+        :param args: additional arguments to metric, after qval (alpha & beta,
+            for sim_tversky)
+        :returns: (similarity, string) pairs, sorted by descending similarity
+            (ties are broken in the order the strings were added)
+        :rtype: list
+        """
+        q_query = self.qgrams(query)
+        matches = []
+        for i in self.candidates(query, threshold, metric, *args):
+            score = metric(q_query, self._qgrams[i], self.qval, *args)
+            if score >= threshold:
+                matches.append((-score, i))
+        return [(-score, self._words[i]) for score, i in sorted(matches)]
+
+
+def similarity_join(collection, metric=sim_jaccard, threshold=0.5, *args):
+    """Find all pairs of similar strings within a collection
+
+    This is a similarity self-join for the symmetric q-gram-based similarity
+    measures (sim_dice, sim_jaccard, sim_tanimoto, sim_overlap, sim_cosine,
+    and sim_tversky with alpha = beta), following the PPJoin algorithm of
+    Xiao, Chuan, Wei Wang, Xuemin Lin, and Jeffrey Xu Yu. 2008. "Efficient
+    similarity joins for near duplicate detection." Proceedings of the 17th
+    International Conference on World Wide Web. 131--140.
+
+    Each occurrence of a q-gram is treated as a distinct token, so that token
+    set overlaps are the q-gram multiset overlaps the measures use, and each
+    string's tokens are ordered from globally rarest to most common. Strings
+    are processed from fewest to most tokens; only the prefix of each that
+    could hold an overlap large enough to reach threshold is indexed & probed
+    (prefix filtering), strings with too few tokens are skipped (length
+    filtering), and pairs whose first shared tokens lie too far into either
+    string to leave room for the needed overlap are pruned (positional
+    filtering). The remaining pairs are scored with metric itself.
+
+    :param list collection: a collection of strings
+    :param function metric: a symmetric q-gram-based similarity function
+        (sim_jaccard by default)
+    :param float threshold: the minimum similarity (greater than 0)
+    :param args: additional arguments to pass to metric, after the two
+        strings (qval, then alpha & beta, for sim_tversky)
+    :returns: (i, j, similarity) triples for each pair of strings in
+        collection with i < j and metric(collection[i], collection[j],
+        \\*args) >= threshold, in no particular order
+    :rtype: generator
+    """
+    if metric not in _SET_METRICS:
+        raise ValueError('Unsupported metric; metric must be a ' +
+                         'q-gram-based similarity function.')
+    if threshold <= 0:
+        raise ValueError('threshold must be greater than 0')
+    qval = args[0] if args else 2
+    alpha = beta = 1
+    if metric is sim_tversky:
+        if len(args) > 3 and args[3] is not None:
+            raise ValueError('Unsupported arguments; the symmetric ' +
+                             '(biased) Tversky index is not supported.')
+        alpha, beta = (tuple(args[1:3]) + (1, 1)[len(args[1:3]):])
+        if alpha != beta:
+            raise ValueError('Unsupported arguments; alpha and beta must ' +
+                             'be equal for the join to be symmetric.')
+    elif len(args) > 1:
+        raise ValueError('Unsupported arguments; metric takes only qval.')
+
+    collection = list(collection)
+    profiles = [_tokenize(word, qval) for word in collection]
+
+    # rank each token (a q-gram & its occurrence number) from rarest to most
+    # common
+    frequency = Counter()
+    for profile in profiles:
+        for qgram, count in profile.items():
+            for occurrence in _range(count):
+                frequency[(qgram, occurrence)] += 1
+    ranks = dict((token, rank) for rank, token in enumerate(
+        sorted(frequency, key=lambda token: (frequency[token], token))))
+    records = [sorted(ranks[(qgram, occurrence)] for qgram, count in
+                      profile.items() for occurrence in _range(count))
+               for profile in profiles]
+
+    # strings without q-grams are only similar to identical strings
+    empty = defaultdict(list)
+    for i, tokens in enumerate(records):
+        if not tokens:
+            empty[collection[i]].append(i)
+    for same in empty.values():
+        for pos, i in enumerate(same):
+            for j in same[pos+1:]:
+                yield (i, j, 1.0)
+
+    postings = defaultdict(list)
+    for src in sorted(_range(len(records)),
+                      key=lambda i: (len(records[i]), i)):
+        tokens = records[src]
+        size_src = len(tokens)
+        if not size_src:
+            continue
+
+        def _required(size):
+            """Return the overlap needed with a string with size tokens
+            """
+            return int(math.ceil(_min_overlap(metric, size_src, size,
+                                              threshold, alpha, beta) -
+                                 1e-9))
+
+        # the shortest string that passes the length filter
+        min_size = next((size for size in _range(1, size_src+1) if
+                         _required(size) <= size), size_src+1)
+
+        overlaps = {}
+        for pos_src in _range(size_src - _required(min_size) + 1):
+            for tar, pos_tar in postings[tokens[pos_src]]:
+                size_tar = len(records[tar])
+                overlap = overlaps.get(tar, 0)
+                if size_tar < min_size or overlap is None:
+                    continue
+                # positional filter: this token & those after it in both
+                # strings bound the overlap
+                if (overlap + min(size_src - pos_src, size_tar - pos_tar) <
+                        _required(size_tar)):
+                    overlaps[tar] = None
+                else:
+                    overlaps[tar] = overlap + 1
+
+        for pos_src in _range(size_src - _required(size_src) + 1):
+            postings[tokens[pos_src]].append((src, pos_src))
+
+        for tar, overlap in overlaps.items():
+            if overlap:
+                i, j = min(src, tar), max(src, tar)
+                score = metric(profiles[i], profiles[j], *args)
+                if score >= threshold:
+                    yield (i, j, score)
+
+
+# the largest prime less than 2**32, so that hashes fit in a numpy.uint32
+_MINHASH_PRIME = 4294967291
+
+
+class MinHash(object):
+    """MinHash signatures
+
+    A MinHash signature summarizes a string's q-gram (or token) multiset as
+    the minimum value of each of a number of random hash functions over it.
+    The fraction of positions at which two signatures agree is an unbiased
+    estimate of the Jaccard similarity of the multisets, as in Broder, Andrei
+    Z. 1997. "On the resemblance and containment of documents." Proceedings
+    of Compression and Complexity of SEQUENCES 1997. 21--29.
+
+    Each occurrence of a q-gram is hashed as a distinct token, so that
+    signatures estimate sim_jaccard, which compares q-gram multisets.
+    """
+    def __init__(self, num_perm=128, qval=2, seed=0):
+        """MinHash initializer
+
+        :param int num_perm: the number of hash functions (the length of each
+            signature)
+        :param int qval: the length of each q-gram; 0 or None to use
+            whitespace-delimited tokens instead (by default 2)
+        :param int seed: the seed for the random hash functions; signatures
+            are comparable only if made with the same num_perm & seed
+        """
+        if num_perm < 1:
+            raise ValueError('num_perm must be at least 1')
+        self.num_perm = num_perm
+        self.qval = qval
+        self.seed = seed
+        random = numpy.random.RandomState(seed)
+        # pylint: disable=no-member
+        self._mult = random.randint(1, _MINHASH_PRIME, num_perm,
+                                    dtype=numpy.int64).astype(numpy.uint64)
+        self._add = random.randint(0, _MINHASH_PRIME, num_perm,
+                                   dtype=numpy.int64).astype(numpy.uint64)
+        # pylint: enable=no-member
+
+    def signature(self, src):
+        """Return the MinHash signature of a string
+
+        :param str src: the string (or a QGrams/Counter object)
+        :returns: the signature, of length num_perm
+        :rtype: numpy.ndarray (of numpy.uint32)
+        """
+        if not isinstance(src, Counter):
+            src = _tokenize(src, self.qval)
+        # pylint: disable=no-member
+        tokens = numpy.array([zlib.crc32(('%s\x00%d' % (token, occurrence))
+                                         .encode('utf-8')) & 0xFFFFFFFF
+                              for token, count in src.items()
+                              for occurrence in _range(count)],
+                             dtype=numpy.uint64) % _MINHASH_PRIME
+        if len(tokens):
+            # a*x + b < 2**64 for a, b, x < p < 2**32
+            sig = ((self._mult[:, None] * tokens[None, :] +
+                    self._add[:, None]) % _MINHASH_PRIME).min(axis=1)
+        else:
+            sig = numpy.full(self.num_perm, _MINHASH_PRIME)
+        sig = sig.astype(numpy.uint32)
+        # pylint: enable=no-member
+        return sig
+
+    def signatures(self, collection):
+        """Return the MinHash signatures of a collection of strings
+
+        :param list collection: the strings
+        :returns: one signature per row, in the order of collection
+        :rtype: numpy.ndarray (of numpy.uint32)
+        """
+        collection = list(collection)
+        # pylint: disable=no-member
+        sigs = numpy.empty((len(collection), self.num_perm),
+                           dtype=numpy.uint32)
+        # pylint: enable=no-member
+        for i, src in enumerate(collection):
+            sigs[i] = self.signature(src)
+        return sigs
+
+
+def sim_minhash(src, tar):
+    """Return the Jaccard similarity estimated from MinHash signatures
+
+    :param numpy.ndarray src, tar: MinHash signatures, or arrays of them (one
+        per row), made by the same MinHash object; rows of src & tar are
+        compared pairwise (or broadcast, if one is a single signature)
+    :returns: the estimated Jaccard similarity of each pair
+    :rtype: float or numpy.ndarray
+    """
+    src = numpy.asarray(src)
+    tar = numpy.asarray(tar)
+    if src.shape[-1] != tar.shape[-1]:
+        raise ValueError('Signatures must be of equal length.')
+    return (src == tar).mean(axis=-1)
+
+
+class MinHashLSH(object):
+    """A MinHash locality-sensitive hashing index
+
+    Each signature is divided into bands of rows, and strings whose
+    signatures are identical in any band are candidate matches. With b bands
+    of r rows, two strings with Jaccard similarity s become candidates with
+    probability 1 - (1 - s**r)**b, an S-curve whose steepest point is near
+    (1/b)**(1/r). Cf. Leskovec, Jure, Anand Rajaraman, and Jeffrey D. Ullman.
+    2014. Mining of Massive Datasets. 2nd ed. Cambridge: Cambridge University
+    Press. Ch. 3.
+    """
+    def __init__(self, words=None, threshold=0.5, num_perm=128, qval=2,
+                 bands=None, seed=0):
+        """MinHashLSH initializer
+
+        :param list words: a collection of strings to add to the index
+        :param float threshold: the Jaccard similarity around which strings
+            become likely candidate matches; used to choose the number of
+            bands, if bands is not specified
+        :param int num_perm: the length of each MinHash signature
+        :param int qval: the length of each q-gram; 0 or None to use
+            whitespace-delimited tokens instead (by default 2)
+        :param int bands: the number of bands to divide signatures into
+        :param int seed: the seed for the MinHash hash functions
+        """
+        self.minhash = MinHash(num_perm, qval, seed)
+        if bands is None:
+            bands = min(_range(1, num_perm+1), key=lambda bands: abs(
+                (1/bands)**(1/(num_perm//bands)) - threshold))
+        if not 1 <= bands <= num_perm:
+            raise ValueError('bands must be between 1 and num_perm')
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._words = []
+        self._signatures = []
+        self._tables = [defaultdict(list) for _ in _range(bands)]
+        if words is not None:
+            self.update(words)
+
+    def __len__(self):
+        """Return the number of strings in the index
+
+        :returns: the number of strings in the index
+        :rtype: int
+        """
+        return len(self._words)
+
+    def __iter__(self):
+        """Iterate over the strings in the index, in the order they were added
+        """
+        return iter(self._words)
+
+    def __getitem__(self, index):
+        """Return the string with the given index
+
+        :param int index: the index of a string, in the order strings were
+            added
+        :returns: the string
+        :rtype: str
+        """
+        return self._words[index]
+
+    def _band_keys(self, sig):
+        """Return the hash table key of each band of a signature
+        """
+        return [sig[band*self.rows:(band+1)*self.rows].tobytes()
+                for band in _range(self.bands)]
+
+    def add(self, word):
+        """Add a string to the index
+
+        :param str word: the string to add
+        :returns: the index of the string
+        :rtype: int
+        """
+        index = len(self._words)
+        sig = self.minhash.signature(word)
+        self._words.append(word)
+        self._signatures.append(sig)
+        for table, key in zip(self._tables, self._band_keys(sig)):
+            table[key].append(index)
+        return index
+
+    def update(self, words):
+        """Add each of a collection of strings to the index
+
+        :param list words: the strings to add
+        """
+        for word in words:
+            self.add(word)
+
+    def signature(self, index):
+        """Return the MinHash signature of an indexed string
+
+        :param int index: the index of a string, in the order strings were
+            added
+        :returns: the signature
+        :rtype: numpy.ndarray (of numpy.uint32)
+        """
+        return self._signatures[index]
+
+    def candidates(self, query):
+        """Return the strings that share a band with a query
+
+        :param str query: the string to search for
+        :returns: the indices of the candidate strings, in ascending order
+        :rtype: list
+        """
+        matches = set()
+        for table, key in zip(self._tables,
+                              self._band_keys(self.minhash.signature(query))):
+            matches.update(table.get(key, ()))
+        return sorted(matches)
+
+    def search(self, query, threshold=0.0):
+        """Return candidate strings whose estimated similarity reaches a
+        threshold
+
+        :param str query: the string to search for
+        :param float threshold: the minimum estimated Jaccard similarity
+        :returns: (estimated similarity, string) pairs, sorted by descending
+            similarity (ties are broken in the order the strings were added)
+        :rtype: list
+        """
+        candidates = self.candidates(query)
+        if not candidates:
+            return []
+        estimates = sim_minhash(numpy.array([self._signatures[i] for i in
+                                             candidates]),
+                                self.minhash.signature(query))
+        return [(float(estimates[pos]), self._words[candidates[pos]])
+                for pos in sorted(_range(len(candidates)),
+                                  key=lambda pos: (-estimates[pos], pos))
+                if estimates[pos] >= threshold]
+
+
+def simhash(src, qval=2):
+    """Return the 64-bit SimHash fingerprint of a string
+
+    SimHash (Charikar, Moses S. 2002. "Similarity estimation techniques from
+    rounding algorithms." Proceedings of the 34th Annual ACM Symposium on
+    Theory of Computing. 380--388.) sums a 64-bit hash of each q-gram (or
+    token), weighted by its count, as a vector of +1 & -1 bits; the
+    fingerprint has a 1 wherever the sum is positive. The fraction of bits at
+    which two fingerprints differ approximates the angle between the q-gram
+    count vectors, so fingerprints within a small Hamming distance have a
+    high cosine similarity (sim_cosine).
+
+    :param str src: the string (or a QGrams/Counter object)
+    :param int qval: the length of each q-gram; 0 or None to use
+        whitespace-delimited tokens instead (by default 2)
+    :returns: the fingerprint
+    :rtype: int
+    """
+    if not isinstance(src, Counter):
+        src = _tokenize(src, qval)
+    if not src:
+        return 0
+    # pylint: disable=no-member
+    hashes = numpy.array([struct.unpack(str('>Q'), hashlib.md5(
+        token.encode('utf-8')).digest()[:8])[0] for token in src],
+                         dtype=numpy.uint64)
+    bits = ((hashes[:, None] >> numpy.arange(64, dtype=numpy.uint64)) &
+            numpy.uint64(1)).astype(numpy.int64)
+    # pylint: enable=no-member
+    weights = numpy.array(list(src.values()))
+    totals = weights.dot(2*bits - 1)
+    fingerprint = 0
+    for bit in numpy.nonzero(totals > 0)[0]:
+        fingerprint |= 1 << int(bit)
+    return fingerprint
+
+
+def _popcount(num):
+    """Return the number of 1 bits in a non-negative int
+    """
+    return bin(num).count('1')
+
+
+class SimHashIndex(object):
+    """A SimHash fingerprint index
+
+    This finds the strings whose 64-bit SimHash fingerprints lie within a
+    Hamming distance (radius) of a query's, following Manku, Gurmeet Singh,
+    Arvind Jain, and Anish Das Sarma. 2007. "Detecting near-duplicates for
+    web crawling." Proceedings of the 16th International Conference on World
+    Wide Web. 141--150. The fingerprint is divided into more blocks than the
+    radius, so two fingerprints within the radius must agree on at least one
+    whole block; each block keys its own table (equivalent to a table of
+    fingerprints permuted to lead with that block), and only strings found
+    in one of the query's blocks are compared bit-by-bit.
+
+    Since SimHash only approximates cosine similarity, search re-ranks the
+    strings within the radius by their exact sim_cosine.
+    """
+    def __init__(self, words=None, qval=2, radius=3, blocks=None):
+        """SimHashIndex initializer
+
+        :param list words: a collection of strings to add to the index
+        :param int qval: the length of each q-gram; 0 or None to use
+            whitespace-delimited tokens instead (by default 2)
+        :param int radius: the maximum Hamming distance between fingerprints
+            that searches should find (by default 3)
+        :param int blocks: the number of blocks (and tables) to divide
+            fingerprints into; greater than radius (by default, radius+1)
+        """
+        if blocks is None:
+            blocks = radius + 1
+        if not 0 <= radius < blocks <= 64:
+            raise ValueError('blocks must be greater than radius & no ' +
+                             'greater than 64')
+        self.qval = qval
+        self.radius = radius
+        self._words = []
+        self._fingerprints = []
+        # (shift, mask) of each block
+        self._blocks = []
+        shift = 0
+        for block in _range(blocks):
+            width = 64 // blocks + (block < 64 % blocks)
+            self._blocks.append((shift, (1 << width) - 1))
+            shift += width
+        self._tables = [defaultdict(list) for _ in _range(blocks)]
+        if words is not None:
+            self.update(words)
+
+    def __len__(self):
+        """Return the number of strings in the index
+
+        :returns: the number of strings in the index
+        :rtype: int
+        """
+        return len(self._words)
+
+    def __iter__(self):
+        """Iterate over the strings in the index, in the order they were added
+        """
+        return iter(self._words)
+
+    def __getitem__(self, index):
+        """Return the string with the given index
+
+        :param int index: the index of a string, in the order strings were
+            added
+        :returns: the string
+        :rtype: str
+        """
+        return self._words[index]
+
+    def fingerprint(self, index):
+        """Return the SimHash fingerprint of an indexed string
+
+        :param int index: the index of a string, in the order strings were
+            added
+        :returns: the fingerprint
+        :rtype: int
+        """
+        return self._fingerprints[index]
+
+    def add(self, word):
+        """Add a string to the index
+
+        :param str word: the string to add
+        :returns: the index of the string
+        :rtype: int
+        """
+        index = len(self._words)
+        fingerprint = simhash(word, self.qval)
+        self._words.append(word)
+        self._fingerprints.append(fingerprint)
+        for table, (shift, mask) in zip(self._tables, self._blocks):
+            table[(fingerprint >> shift) & mask].append(index)
+        return index
+
+    def update(self, words):
+        """Add each of a collection of strings to the index
+
+        :param list words: the strings to add
+        """
+        for word in words:
+            self.add(word)
+
+    def candidates(self, query, radius=None):
+        """Return the strings whose fingerprints are near a query's
+
+        :param str query: the string to search for
+        :param int radius: the maximum Hamming distance between fingerprints;
+            no greater than the index's radius (by default, the index's
+            radius)
+        :returns: (Hamming distance, index) pairs of the strings within the
+            radius, sorted by distance (ties are broken in the order the
+            strings were added)
+        :rtype: list
+        """
+        if radius is None:
+            radius = self.radius
+        elif radius > self.radius:
+            raise ValueError('radius must be no greater than the index\'s ' +
+                             'radius')
+        fingerprint = simhash(query, self.qval)
+        found = set()
+        for table, (shift, mask) in zip(self._tables, self._blocks):
+            found.update(table.get((fingerprint >> shift) & mask, ()))
+        return sorted(
+            (distance, i) for distance, i in
+            ((_popcount(fingerprint ^ self._fingerprints[i]), i)
+             for i in found) if distance <= radius)
+
+    def search(self, query, threshold=0.0, radius=None):
+        """Return the strings near a query, re-ranked by cosine similarity
+
+        :param str query: the string to search for
+        :param float threshold: the minimum cosine similarity
+        :param int radius: the maximum Hamming distance between fingerprints;
+            no greater than the index's radius (by default, the index's
+            radius)
+        :returns: (similarity, string) pairs, sorted by descending
+            sim_cosine similarity (ties are broken in the order the strings
+            were added)
+        :rtype: list
+        """
+        matches = []
+        for _, i in self.candidates(query, radius):
+            score = sim_cosine(query, self._words[i], self.qval)
+            if score >= threshold:
+                matches.append((-score, i))
+        return [(-score, self._words[i]) for score, i in sorted(matches)]
+
+
+def _ratio_bound(size_src, size_tar):
+    """Return the ratio of the lesser to the greater of two sizes
+
+    :param int size_src, size_tar: the sizes
+    :returns: the ratio (1 if both are 0)
+    :rtype: float
+    """
+    if size_src == size_tar:
+        return 1.0
+    return min(size_src, size_tar) / max(size_src, size_tar)
+
+
+def _jaro_winkler_bound(len_src, len_tar):
+    """Return the greatest Jaro-Winkler similarity of strings of two lengths
+
+    With m matching characters, the Jaro similarity is at most
+    :math:`\\frac{1}{3}(\\frac{m}{|src|} + \\frac{m}{|tar|} + 1)`, where
+    m is at most the lesser length, and the Winkler boost adds at most
+    :math:`0.4(1 - sim_{Jaro})`.
+
+    :param int len_src, len_tar: the lengths of the stripped strings
+    :returns: the bound
+    :rtype: float
+    """
+    if not len_src or not len_tar:
+        return 1.0
+    matches = min(len_src, len_tar)
+    sim = (matches/len_src + matches/len_tar + 1) / 3
+    if sim > 0.7:
+        sim += 0.4 * (1 - sim)
+    return sim
+
+
+def _editex_bound(lens_src, lens_tar):
+    """Return the greatest Editex similarity of strings of two lengths
+
+    Only the first character of each run of equal characters of a normalized
+    string costs at least 1 to delete (or insert); the rest are free, as are
+    leading spaces, since Editex takes each string to be preceded by a space.
+    So at least as many run-starting characters must be deleted from one
+    string as it has runs beyond the length of the other, and since no edit
+    costing 1 changes the number of runs by more than 2, the distance is also
+    at least half the difference in the numbers of runs.
+
+    :param tuple lens_src, lens_tar: the lengths of the strings, & the lengths
+        & numbers of runs of their normalized forms
+    :returns: the bound
+    :rtype: float
+    """
+    normalizer = 2 * max(lens_src[0], lens_tar[0])
+    if not normalizer:
+        return 1.0
+    distance = max((abs(lens_src[2] - lens_tar[2]) + 1) // 2,
+                   lens_src[2] - lens_tar[1], lens_tar[2] - lens_src[1])
+    return 1 - distance / normalizer
+
+
+def _dice_bound(size_src, size_tar):
+    """Return the greatest Dice similarity of multisets of two sizes
+
+    :param int size_src, size_tar: the sizes
+    :returns: the bound
+    :rtype: float
+    """
+    if not size_src or not size_tar:
+        return 1.0
+    return 2 * min(size_src, size_tar) / (size_src + size_tar)
+
+
+def _cosine_bound(size_src, size_tar):
+    """Return the greatest cosine similarity of multisets of two sizes
+
+    :param int size_src, size_tar: the sizes
+    :returns: the bound
+    :rtype: float
+    """
+    return math.sqrt(_ratio_bound(size_src, size_tar))
+
+
+def _stripped_length(word):
+    """Return the length of a string, less surrounding whitespace
+
+    :param str word: the string
+    :returns: the length of the stripped string (as compared by Jaro-Winkler)
+    :rtype: int
+    """
+    return len(word.strip())
+
+
+def _editex_lengths(word):
+    """Return the length of a string, & the length & number of runs of equal
+    characters (other than leading spaces) of its normalized form
+
+    :param str word: the string
+    :returns: the length of word, & the length & number of runs of the form of
+        word compared by Editex
+    :rtype: tuple
+    """
+    norm = _editex_normalize(word)
+    runs = sum(1 for i in _range(len(norm)) if
+               norm[i] != (norm[i-1] if i else ' '))
+    return len(word), len(norm), runs
+
+
+def _qgram_count(word):
+    """Return the number of bigrams of a string
+
+    :param str word: the string
+    :returns: the number of bigrams (as compared by default by the q-gram-based
+        similarity measures)
+    :rtype: int
+    """
+    return sum(_tokenize(word, 2).values())
+
+
+# for each similarity function (with its default arguments), a feature of a
+# string & a function of the features of two strings that bounds their
+# similarity from above
+_SIM_BOUNDS = {
+    sim_levenshtein: (len, _ratio_bound),
+    sim_damerau: (len, _ratio_bound),
+    sim_lcsseq: (len, _ratio_bound),
+    sim_lcsstr: (len, _ratio_bound),
+    sim_length: (len, _ratio_bound),
+    sim_jaro_winkler: (_stripped_length, _jaro_winkler_bound),
+    sim_editex: (_editex_lengths, _editex_bound),
+    sim_jaccard: (_qgram_count, _ratio_bound),
+    sim_tanimoto: (_qgram_count, _ratio_bound),
+    sim_tversky: (_qgram_count, _ratio_bound),
+    sim_dice: (_qgram_count, _dice_bound),
+    sim_cosine: (_qgram_count, _cosine_bound)
+}
+
+
+class NearestMatcher(object):
+    """A top-k nearest string matcher
+
+    A NearestMatcher finds the strings in a collection that are most similar
+    to a query under any similarity function, such as
+    abydos.distance.sim_jaro_winkler, in two stages:
+
+        - blocking: the candidates are the strings that share a key (such as
+          a phonetic code from abydos.phonetic) or a q-gram with the query,
+          and whose lengths are within a window of the query's length
+        - re-ranking: the candidates are scored with the similarity function,
+          keeping the k best in a bounded heap
+
+    For the similarity functions of abydos.distance whose values are bounded
+    by the lengths of the strings (such as Levenshtein, Jaro-Winkler,
+    Editex, and LCS similarity) or the sizes of their q-gram multisets (such
+    as the Jaccard & Dice indices), the candidates are grouped into blocks of
+    equal lengths (or sizes) & re-ranked in descending order of the bound on
+    their similarity, so that the search stops once no remaining block can
+    beat the k-th best score found so far.
+
+    The index is built once; queries do not modify it, so that a matcher may
+    be reused (or pickled & shipped to worker processes) for any number of
+    queries.
+    """
+    def __init__(self, words=None, metric=sim_jaro_winkler, keys=None,
+                 qval=None, max_length_diff=None, args=()):
+        """NearestMatcher initializer
+
+        :param list words: a collection of strings to add to the matcher
+        :param function metric: a similarity function (Jaro-Winkler by
+            default)
+        :param list keys: functions, such as abydos.phonetic.double_metaphone,
+            giving the blocking key (or a tuple of keys) of a string; a string
+            is a candidate if it shares a key with the query
+        :param int qval: the length of the q-grams to block on; a string is a
+            candidate if it shares a q-gram with the query. By default, this
+            is the q-gram length of metric, if it is a q-gram-based similarity
+            measure, and None (no q-gram blocking) otherwise
+        :param int max_length_diff: the greatest difference in length from
+            the query of a candidate, or None for no limit
+        :param tuple args: additional arguments to metric
+        """
+        if not hasattr(metric, '__call__'):
+            raise ValueError('metric must be a function')
+        info = metric_info(metric)
+        if info is not None and info.kind != 'sim':
+            raise ValueError('metric must be a similarity function')
+        if ((qval is None and info is not None and info.set_based and
+             info.preprocess == 'qgrams')):
+            # sharing no q-gram with the query, such strings score 0
+            qval = args[0] if args else 2
+        self.metric = metric
+        self.keys = list(keys) if keys else []
+        self.qval = qval
+        self.max_length_diff = max_length_diff
+        self.args = tuple(args)
+        self.evaluations = 0
+        if not self.args and metric in _SIM_BOUNDS:
+            self._feature, self._bound = _SIM_BOUNDS[metric]
+        else:
+            self._feature = self._bound = None
+        self._words = []
+        self._lengths = []
+        self._features = []
+        self._blocks = defaultdict(list)  # the strings of each length/feature
+        self._key_postings = [defaultdict(list) for _ in self.keys]
+        self._postings = defaultdict(list)
+        if words is not None:
+            self.update(words)
+
+    def __len__(self):
+        """Return the number of strings in the matcher
+
+        :returns: the number of strings in the matcher
+        :rtype: int
+        """
+        return len(self._words)
+
+    def __iter__(self):
+        """Iterate over the strings in the matcher, in the order they were
+        added
+        """
+        return iter(self._words)
+
+    def __getitem__(self, index):
+        """Return the string with the given index
+
+        :param int index: the index of a string, in the order strings were
+            added
+        :returns: the string
+        :rtype: str
+        """
+        return self._words[index]
+
+    def _block_keys(self, key, word):
+        """Return the blocking keys of a string
+
+        :param function key: a key function
+        :param str word: the string
+        :returns: the non-empty keys of word
+        :rtype: set
+        """
+        values = key(word)
+        if not isinstance(values, (tuple, list)):
+            values = (values,)
+        return set(value for value in values if value)
+
+    def _qgrams(self, word):
+        """Return the distinct q-grams of a string to block on
+
+        :param str word: the string
+        :returns: the q-grams (or tokens, if qval is 0) of word, or None
+            (which blocks together the strings with no q-grams, such as '')
+        :rtype: set
+        """
+        return set(_tokenize(word, self.qval)) or set([None])
+
+    def add(self, word):
+        """Add a string to the matcher
+
+        :param str word: the string to add
+        :returns: the index of the string
+        :rtype: int
+        """
+        index = len(self._words)
+        feature = self._feature(word) if self._feature else None
+        self._words.append(word)
+        self._lengths.append(len(word))
+        self._features.append(feature)
+        self._blocks[len(word), feature].append(index)
+        for key, postings in zip(self.keys, self._key_postings):
+            for value in self._block_keys(key, word):
+                postings[value].append(index)
+        if self.qval is not None:
+            for qgram in self._qgrams(word):
+                self._postings[qgram].append(index)
+        return index
+
+    def update(self, words):
+        """Add each of a collection of strings to the matcher
+
+        :param list words: the strings to add
+        """
+        for word in words:
+            self.add(word)
+
+    def candidates(self, query):
+        """Return the strings in the blocks of a query
+
+        :param str query: the string to search for
+        :returns: the indices of the candidates, grouped into blocks of equal
+            length (& feature)
+        :rtype: dict
+        """
+        if not self.keys and self.qval is None:
+            blocks = self._blocks
+        else:
+            matches = set()
+            for key, postings in zip(self.keys, self._key_postings):
+                for value in self._block_keys(key, query):
+                    matches.update(postings.get(value, ()))
+            if self.qval is not None:
+                for qgram in self._qgrams(query):
+                    matches.update(self._postings.get(qgram, ()))
+            blocks = defaultdict(list)
+            for i in sorted(matches):
+                blocks[self._lengths[i], self._features[i]].append(i)
+
+        if self.max_length_diff is None:
+            return dict(blocks)
+        length = len(query)
+        return {block: members for block, members in blocks.items() if
+                abs(block[0] - length) <= self.max_length_diff}
+
+    def nearest(self, query, k=1):
+        """Return the k strings most similar to a query
+
+        :param str query: the string to search for
+        :param int k: the number of strings to return
+        :returns: up to k (similarity, string) pairs, sorted by descending
+            similarity (ties are broken in the order the strings were added)
+        :rtype: list
+        """
+        self.evaluations = 0
+        if k < 1:
+            return []
+
+        blocks = self.candidates(query)
+        if self._bound is not None:
+            feature = self._feature(query)
+            order = sorted(((self._bound(feature, block[1]), block) for block
+                            in blocks), reverse=True)
+        else:
+            order = [(1.0, block) for block in blocks]
+
+        score = _batch_scorer(query, self.metric, self.args)
+        best = []  # a min-heap of (similarity, -index) of the k best so far
+        for bound, block in order:
+            if len(best) == k and bound + _BOUND_SLACK < best[0][0]:
+                break
+            for i in blocks[block]:
+                self.evaluations += 1
+                entry = (score(self._words[i]), -i)
+                if len(best) < k:
+                    heapq.heappush(best, entry)
+                elif entry > best[0]:
+                    heapq.heapreplace(best, entry)
+
+        return [(sim, self._words[-i]) for sim, i in
+                sorted(best, reverse=True)]
+
+    def nearest_many(self, queries, k=1):
+        """Return the k strings most similar to each of a collection of
+        queries
+
+        :param list queries: the strings to search for
+        :param int k: the number of strings to return for each query
+        :returns: for each query, the result of nearest, in turn
+        :rtype: generator
+        """
+        for query in queries:
+            yield self.nearest(query, k)
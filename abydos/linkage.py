@@ -0,0 +1,721 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2014-2015 by Christopher C. Little.
+# This file is part of Abydos.
+#
+# Abydos is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Abydos is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Abydos. If not, see <http://www.gnu.org/licenses/>.
+
+"""abydos.linkage
+
+The linkage module implements record linkage tools, including:
+
+    - a blocking engine, for generating the candidate pairs of records to
+      compare when linking two collections of records (or deduplicating one),
+      using string fingerprints (such as those of abydos.clustering) or
+      phonetic codes (such as those of abydos.phonetic) as blocking keys
+    - a comparison plan, for comparing several fields of candidate pairs of
+      records, each with its own similarity measure, as a comparison matrix
+    - a Fellegi-Sunter model, whose match & non-match probabilities are
+      estimated from comparison matrices by EM
+"""
+
+from __future__ import unicode_literals
+from __future__ import division
+import math
+import os
+import pickle
+import tempfile
+import zlib
+from collections import Counter
+from itertools import combinations, product
+import numpy
+from ._compat import _unicode, _range
+from .clustering import fingerprint
+from .distance import Profile, metric_info, _batch_scorer
+from .stats import ConfusionTable
+
+
+def _key_hash(key):
+    """Return a hash of a blocking key that is stable across processes
+
+    :param tuple key: the blocking key, as (key function index, value)
+    :returns: the hash
+    :rtype: int
+    """
+    return zlib.crc32(('{}:{}'.format(key[0], _unicode(key[1])))
+                      .encode('utf-8')) & 0xffffffff
+
+
+class BlockingEngine(object):
+    """A record-linkage blocking engine
+
+    Comparing every record of one collection to every record of another is
+    quadratic, so record linkage only compares candidate pairs: the pairs of
+    records that share a blocking key, such as the
+    abydos.clustering.fingerprint or abydos.phonetic.soundex code of a name.
+
+    Keys are computed for the records of both collections in a single
+    streaming pass, and the (key, record) entries are hash-partitioned by key;
+    if more than max_entries of them are held in memory, the partitions are
+    spilled to temporary files. Each partition is then read back in turn, to
+    form the blocks of records sharing each of its keys. A pair of records
+    that shares several keys is emitted only once, from the block of the
+    first of them (in sorted order), so that no set of emitted pairs need be
+    kept.
+
+    Alternatively, with a window, the sorted neighbourhood method pairs the
+    records whose keys are within window places of one another, when the
+    records are sorted by each key, after Hernández, Mauricio A. and Salvatore
+    J. Stolfo. 1995. "The merge/purge problem for large databases."
+    Proceedings of the 1995 ACM SIGMOD International Conference on Management
+    of Data. 127--138.
+    """
+    def __init__(self, keys=(fingerprint,), max_block_size=None, window=None,
+                 partitions=64, max_entries=1000000, temp_dir=None):
+        """BlockingEngine initializer
+
+        :param list keys: the blocking key functions, such as
+            abydos.clustering.fingerprint, .qgram_fingerprint,
+            .phonetic_fingerprint, .skeleton_key, .omission_key, or the
+            functions of abydos.phonetic. Each is a function of a record, or
+            a (field, function) pair, to apply the function to record[field].
+            A function may return several keys (as a tuple or list); empty
+            keys are ignored.
+        :param int max_block_size: the greatest number of records in a block
+            (from both collections); larger blocks, whose keys are too common
+            to be informative, are skipped. None (the default) for no limit
+        :param int window: the window size of the sorted neighbourhood method,
+            or None (the default) to block on equal keys
+        :param int partitions: the number of hash partitions of the entries
+        :param int max_entries: the greatest number of entries to hold in
+            memory before spilling the partitions to disk
+        :param str temp_dir: the directory in which to create the temporary
+            files of spilled partitions (by default, the system's)
+        """
+        if window is not None and window < 2:
+            raise ValueError('window must be at least 2')
+        if partitions < 1:
+            raise ValueError('partitions must be at least 1')
+        self.keys = [key if isinstance(key, tuple) else (None, key) for key in
+                     keys]
+        for _, key in self.keys:
+            if not hasattr(key, '__call__'):
+                raise ValueError('keys must be functions')
+        self.max_block_size = max_block_size
+        self.window = window
+        self.partitions = partitions
+        self.max_entries = max_entries
+        self.temp_dir = temp_dir
+        self.skipped_blocks = 0
+
+    def block_keys(self, record):
+        """Return the blocking keys of a record
+
+        :param record: the record (a string, or a sequence or mapping of
+            fields)
+        :returns: the distinct keys of record, as (key function index, value)
+            pairs, in sorted order
+        :rtype: list
+        """
+        keys = set()
+        for i, (field, key) in enumerate(self.keys):
+            values = key(record if field is None else record[field])
+            if not isinstance(values, (tuple, list)):
+                values = (values,)
+            for value in values:
+                if value:
+                    keys.add((i, value))
+        return sorted(keys)
+
+    def pairs(self, left, right=None):
+        """Generate the candidate pairs of records
+
+        :param list left: the records of the first collection (any iterable,
+            which is read only once)
+        :param list right: the records of the second collection, or None to
+            deduplicate left (i.e. to pair the records of left with one
+            another)
+        :returns: the distinct candidate pairs, as (index in left, index in
+            right) pairs (or (i, j) pairs of indices in left, with i < j)
+        :rtype: generator
+        """
+        if self.window is not None:
+            return self._neighbourhood_pairs(left, right)
+        return self._block_pairs(left, right)
+
+    def _spill(self, partitions, files):
+        """Append the in-memory entries of each partition to its file
+
+        :param list partitions: the in-memory entries of each partition
+        :param list files: the temporary file name of each partition (or
+            None, for a partition not yet spilled), which are filled in
+        """
+        for part, entries in enumerate(partitions):
+            if not entries:
+                continue
+            if files[part] is None:
+                temp_fd, files[part] = tempfile.mkstemp(suffix='.blk',
+                                                        dir=self.temp_dir)
+                os.close(temp_fd)
+            with open(files[part], 'ab') as part_file:
+                pickle.dump(entries, part_file, pickle.HIGHEST_PROTOCOL)
+            partitions[part] = []
+
+    @staticmethod
+    def _load(filename):
+        """Return the entries spilled to a partition file
+
+        :param str filename: the file name (or None)
+        :returns: the entries, in the order they were spilled
+        :rtype: list
+        """
+        entries = []
+        if filename is None:
+            return entries
+        with open(filename, 'rb') as part_file:
+            while True:
+                try:
+                    entries.extend(pickle.load(part_file))
+                except EOFError:
+                    break
+        return entries
+
+    def _block_pairs(self, left, right):
+        """Generate the candidate pairs of records sharing a blocking key
+
+        :param list left: the records of the first collection
+        :param list right: the records of the second collection, or None
+        :returns: the distinct candidate pairs
+        :rtype: generator
+        """
+        linking = right is not None
+        sizes = Counter()
+        partitions = [[] for _ in _range(self.partitions)]
+        files = [None] * self.partitions
+        try:
+            in_memory = 0
+            for side, records in enumerate((left, right) if linking else
+                                           (left,)):
+                for index, record in enumerate(records):
+                    keys = tuple(self.block_keys(record))
+                    for key in keys:
+                        sizes[key] += 1
+                        partitions[_key_hash(key) % self.partitions].append(
+                            (key, side, index, keys))
+                    in_memory += len(keys)
+                    if in_memory > self.max_entries:
+                        self._spill(partitions, files)
+                        in_memory = 0
+
+            if self.max_block_size is None:
+                oversize = frozenset()
+            else:
+                oversize = frozenset(key for key, size in sizes.items() if
+                                     size > self.max_block_size)
+            self.skipped_blocks = len(oversize)
+            del sizes
+
+            for part in _range(self.partitions):
+                entries = self._load(files[part]) + partitions[part]
+                partitions[part] = None
+                blocks = {}
+                for key, side, index, keys in entries:
+                    if key not in oversize:
+                        blocks.setdefault(key, ([], []))[side].append(
+                            (index, keys))
+                del entries
+
+                for key in sorted(blocks):
+                    members = blocks[key]
+                    if linking:
+                        block_pairs = product(members[0], members[1])
+                    else:
+                        block_pairs = combinations(members[0], 2)
+                    for (src, src_keys), (tar, tar_keys) in block_pairs:
+                        # emit each pair from its first shared key only
+                        for shared in src_keys:
+                            if shared in tar_keys and shared not in oversize:
+                                break
+                        if shared == key:
+                            yield src, tar
+        finally:
+            for filename in files:
+                if filename is not None:
+                    os.remove(filename)
+
+    def _neighbourhood_pairs(self, left, right):
+        """Generate the candidate pairs of records within a window of one
+        another, sorted by key
+
+        Unlike blocking on equal keys, this keeps every key (& the emitted
+        pairs) in memory.
+
+        :param list left: the records of the first collection
+        :param list right: the records of the second collection, or None
+        :returns: the distinct candidate pairs
+        :rtype: generator
+        """
+        linking = right is not None
+        runs = [[] for _ in self.keys]
+        for side, records in enumerate((left, right) if linking else (left,)):
+            for index, record in enumerate(records):
+                for i, value in self.block_keys(record):
+                    runs[i].append((value, side, index))
+
+        seen = set()
+        for run in runs:
+            run.sort()
+            for pos, (_, side, index) in enumerate(run):
+                for _, other_side, other in run[pos+1:pos+self.window]:
+                    if linking:
+                        if side == other_side:
+                            continue
+                        pair = ((index, other) if side == 0 else
+                                (other, index))
+                    elif index == other:
+                        continue
+                    else:
+                        pair = (min(index, other), max(index, other))
+                    if pair not in seen:
+                        seen.add(pair)
+                        yield pair
+
+
+class ComparisonPlan(object):
+    """A compiled plan for comparing the fields of pairs of records
+
+    A plan maps each of several fields of a record (e.g. surname, given name,
+    & city) to a similarity function (e.g. abydos.distance.sim_jaro_winkler,
+    .sim_editex, & .sim_dice), and compares a batch of candidate pairs of
+    records (such as those of BlockingEngine.pairs) field by field, giving
+    a comparison matrix with a row for each pair and a column for each field,
+    for Fellegi-Sunter or classifier scoring.
+
+    Each field is compared for all pairs before the next field, so that:
+
+        - the distinct values of each field are preprocessed (as Profile
+          objects, which cache their q-grams, normal forms, etc.) only once,
+          and kept in a per-field cache across batches
+        - the pairs sharing a value of the first record are scored with a
+          kernel that preprocesses that value only once (as by sim_many), and
+          repeated pairs of values are scored only once
+        - the pairs that an earlier field has made unmatchable (by a
+          similarity below that field's minimum, or by a weighted sum of
+          similarities that cannot reach the plan's threshold, even if the
+          remaining fields are identical) are not compared on the remaining
+          fields, which are instead given the similarity 0 (disagreement),
+          so that they are not mistaken for missing values (NaN) by
+          FellegiSunter
+    """
+    def __init__(self, fields, weights=None, min_sims=None, threshold=None,
+                 cache_size=2**16, pruned=0.0):
+        """ComparisonPlan initializer
+
+        :param list fields: the fields to compare, in order of evaluation, as
+            (field, metric) or (field, metric, args) tuples (or a dict mapping
+            fields to metrics, to be evaluated in sorted order), where metric
+            is a similarity function normalized to [0, 1], args are additional
+            arguments to it, & field is the key of a value in each record
+        :param list weights: the non-negative weight of each field in the
+            weighted sum of similarities (by default 1 each)
+        :param list min_sims: the least similarity of each field for a pair
+            to be matchable (or None, for no limit on a field)
+        :param float threshold: the least weighted sum of similarities for a
+            pair to be matchable (or None, for no limit)
+        :param int cache_size: the greatest number of values to cache per
+            field (the cache of a field is cleared once it is full)
+        :param float pruned: the similarity given to the fields of a pair that
+            are not compared because an earlier field made it unmatchable (0,
+            i.e. disagreement, by default)
+        """
+        if isinstance(fields, dict):
+            fields = sorted(fields.items())
+        self.fields = []
+        for spec in fields:
+            field, metric = spec[:2]
+            args = tuple(spec[2]) if len(spec) > 2 else ()
+            if not hasattr(metric, '__call__'):
+                raise ValueError('metrics must be functions')
+            info = metric_info(metric)
+            if info is not None and (info.kind != 'sim' or
+                                     not info.normalized):
+                raise ValueError(metric.__name__ + ' is not a similarity ' +
+                                 'function normalized to [0, 1]')
+            self.fields.append((field, metric, args))
+        self.weights = (list(weights) if weights is not None else
+                        [1] * len(self.fields))
+        self.min_sims = (list(min_sims) if min_sims is not None else
+                         [None] * len(self.fields))
+        if (len(self.weights) != len(self.fields) or
+                len(self.min_sims) != len(self.fields)):
+            raise ValueError('there must be a weight & a min_sim for each ' +
+                             'field')
+        if any(weight < 0 for weight in self.weights):
+            raise ValueError('weights must be non-negative')
+        self.threshold = threshold
+        self.cache_size = cache_size
+        self.pruned = pruned
+        self._caches = [{} for _ in self.fields]
+        self.matchable = None
+
+    def _profile(self, col, value):
+        """Return the Profile of a value of a field, from its cache
+
+        :param int col: the index of the field
+        :param str value: the value
+        :returns: the Profile of value
+        :rtype: Profile
+        """
+        cache = self._caches[col]
+        try:
+            return cache[value]
+        except KeyError:
+            pass
+        if len(cache) >= self.cache_size:
+            cache.clear()
+        cache[value] = profile = Profile(value)
+        return profile
+
+    def compare(self, left, right, pairs):
+        """Return the comparison matrix of pairs of records
+
+        After each call, the matchable attribute holds a boolean array,
+        marking the pairs that no field made unmatchable.
+
+        :param list left: the first collection of records, each a sequence or
+            mapping of fields
+        :param list right: the second collection of records (or None, if
+            pairs are of records of left)
+        :param list pairs: the pairs of records to compare, as (index in left,
+            index in right) pairs
+        :returns: the similarity of each field (column) of each pair (row);
+            NaN if either value is None, or pruned if the pair was made
+            unmatchable by an earlier field
+        :rtype: numpy.ndarray
+        """
+        if right is None:
+            right = left
+        # pylint: disable=no-member
+        pairs = numpy.array(list(pairs), dtype=numpy.int64).reshape(-1, 2)
+        matrix = numpy.full((len(pairs), len(self.fields)), numpy.nan)
+        alive = numpy.ones(len(pairs), dtype=numpy.bool_)
+        partial = numpy.zeros(len(pairs))
+        remaining = sum(self.weights)
+
+        for col, (field, metric, args) in enumerate(self.fields):
+            matrix[~alive, col] = self.pruned
+            rows = numpy.flatnonzero(alive)
+            groups = {}
+            for row in rows:
+                src = left[pairs[row, 0]][field]
+                if src is not None:
+                    groups.setdefault(src, []).append(row)
+            for src, group in groups.items():
+                score = _batch_scorer(self._profile(col, src), metric, args)
+                scores = {}
+                for row in group:
+                    tar = right[pairs[row, 1]][field]
+                    if tar is None:
+                        continue
+                    if tar not in scores:
+                        scores[tar] = score(self._profile(col, tar))
+                    matrix[row, col] = scores[tar]
+
+            column = matrix[rows, col]
+            if self.min_sims[col] is not None:
+                alive[rows[column < self.min_sims[col]]] = False
+            partial[rows] += self.weights[col] * numpy.nan_to_num(column)
+            remaining -= self.weights[col]
+            if self.threshold is not None:
+                alive &= partial + remaining >= self.threshold
+        # pylint: enable=no-member
+
+        self.matchable = alive
+        return matrix
+
+    def score(self, matrix):
+        """Return the weighted sum of similarities of each row of a comparison
+        matrix
+
+        :param numpy.ndarray matrix: a comparison matrix, as returned by
+            compare
+        :returns: the weighted sum of the similarities of each pair (NaN
+            similarities count as 0)
+        :rtype: numpy.ndarray
+        """
+        # pylint: disable=no-member
+        return numpy.dot(numpy.nan_to_num(matrix),
+                         numpy.array(self.weights, dtype=numpy.float64))
+        # pylint: enable=no-member
+
+
+class FellegiSunter(object):
+    """A Fellegi-Sunter record linkage model, fitted by EM
+
+    The Fellegi-Sunter model of Fellegi, Ivan P. and Alan B. Sunter. 1969. "A
+    theory for record linkage." Journal of the American Statistical
+    Association, 64(328). 1183--1210, treats each candidate pair of records as
+    either a match or a non-match, & the agreement levels of its fields as
+    independent given that class. Each field's similarity (a column of a
+    comparison matrix, such as that of ComparisonPlan.compare) is binned into
+    agreement levels, whose probabilities among matches (m) & non-matches (u),
+    & the proportion of matches, are estimated without labels by the
+    expectation-maximization (EM) algorithm of Winkler, William E. 1988.
+    "Using the EM algorithm for weight computation in the Fellegi-Sunter
+    model of record linkage." Proceedings of the Section on Survey Research
+    Methods, American Statistical Association. 667--671.
+
+    Since the pairs sharing a pattern of agreement levels are
+    indistinguishable to the model, EM operates on the counts of the
+    distinct patterns. These counts are the only statistics it needs, so
+    partial_fit accumulates them over mini-batches of comparison matrices
+    (e.g. for data that does not fit in memory), and fit then gives the same
+    estimates as if the matrices had been fitted at once.
+
+    NaN similarities (missing values) are ignored, contributing equally to
+    the likelihood of a match & of a non-match.
+    """
+    def __init__(self, bins=(0.5, 0.75, 0.9), prior=0.1, max_iter=100,
+                 tol=1e-6):
+        """FellegiSunter initializer
+
+        :param list bins: the thresholds of the agreement levels: a similarity
+            below bins[0] is at level 0, one below bins[1] is at level 1, etc.
+            Either a list of thresholds, for every field, or a list of lists
+            of thresholds, one for each field
+        :param float prior: the initial estimate of the proportion of pairs
+            that are matches
+        :param int max_iter: the greatest number of EM iterations
+        :param float tol: the convergence tolerance: EM stops once no
+            probability changes by more than this
+        """
+        if not 0 < prior < 1:
+            raise ValueError('prior must be in the interval (0, 1)')
+        self.bins = bins
+        self.prior = prior
+        self.max_iter = max_iter
+        self.tol = tol
+        self.m = None
+        self.u = None
+        self.iterations = 0
+        self._patterns = {}
+
+    def _thresholds(self, num_fields):
+        """Return the thresholds of the agreement levels of each field
+
+        :param int num_fields: the number of fields
+        :returns: the thresholds of each field
+        :rtype: list
+        """
+        if self.bins and isinstance(self.bins[0], (tuple, list)):
+            if len(self.bins) != num_fields:
+                raise ValueError('there must be thresholds for each field')
+            return [list(thresholds) for thresholds in self.bins]
+        return [list(self.bins)] * num_fields
+
+    def levels(self, matrix):
+        """Return the agreement levels of a comparison matrix
+
+        :param numpy.ndarray matrix: a comparison matrix, with a row for each
+            pair & a column for each field
+        :returns: the agreement level of each field of each pair (-1 for NaN)
+        :rtype: numpy.ndarray
+        """
+        # pylint: disable=no-member
+        matrix = numpy.asarray(matrix, dtype=numpy.float64)
+        if matrix.ndim != 2:
+            raise ValueError('matrix must be 2-dimensional')
+        if self.m is not None and matrix.shape[1] != len(self.m):
+            raise ValueError('matrix must have a column for each field')
+        levels = numpy.empty(matrix.shape, dtype=numpy.int8)
+        for col, thresholds in enumerate(self._thresholds(matrix.shape[1])):
+            column = matrix[:, col]
+            levels[:, col] = numpy.digitize(column, thresholds)
+            levels[numpy.isnan(column), col] = -1
+        # pylint: enable=no-member
+        return levels
+
+    def partial_fit(self, matrix):
+        """Accumulate the agreement patterns of a batch of pairs
+
+        :param numpy.ndarray matrix: a comparison matrix
+        :returns: self
+        :rtype: FellegiSunter
+        """
+        levels = self.levels(matrix)
+        if len(levels):
+            # pylint: disable=no-member
+            patterns, counts = numpy.unique(levels, axis=0,
+                                            return_counts=True)
+            # pylint: enable=no-member
+            for pattern, count in zip(patterns.tolist(), counts.tolist()):
+                pattern = tuple(pattern)
+                self._patterns[pattern] = (self._patterns.get(pattern, 0) +
+                                           count)
+        return self
+
+    def _log_likelihoods(self, levels):
+        """Return the log-likelihoods of agreement patterns among matches &
+        non-matches
+
+        :param numpy.ndarray levels: the agreement levels of each pair
+        :returns: the log-likelihood of each pattern among matches & among
+            non-matches
+        :rtype: tuple
+        """
+        # pylint: disable=no-member
+        log_m = numpy.zeros(len(levels))
+        log_u = numpy.zeros(len(levels))
+        for col in _range(levels.shape[1]):
+            column = levels[:, col]
+            present = column >= 0
+            index = column.clip(0)
+            log_m += numpy.where(present, numpy.log(self.m[col])[index], 0)
+            log_u += numpy.where(present, numpy.log(self.u[col])[index], 0)
+        # pylint: enable=no-member
+        return log_m, log_u
+
+    def _posterior(self, levels):
+        """Return the probabilities that pairs with agreement patterns are
+        matches
+
+        :param numpy.ndarray levels: the agreement levels of each pair
+        :returns: the probability of a match of each pair
+        :rtype: numpy.ndarray
+        """
+        log_m, log_u = self._log_likelihoods(levels)
+        # pylint: disable=no-member
+        log_odds = (math.log(self.prior) - math.log(1 - self.prior) + log_m -
+                    log_u)
+        return 1 / (1 + numpy.exp(-numpy.clip(log_odds, -500, 500)))
+        # pylint: enable=no-member
+
+    def fit(self, matrix=None):
+        """Estimate the model's probabilities by EM
+
+        :param numpy.ndarray matrix: a comparison matrix, or None to fit the
+            patterns accumulated by partial_fit (if a matrix is supplied,
+            any accumulated patterns are discarded)
+        :returns: self
+        :rtype: FellegiSunter
+        """
+        if matrix is not None:
+            self._patterns = {}
+            self.partial_fit(matrix)
+        if not self._patterns:
+            raise ValueError('there are no pairs to fit')
+
+        # pylint: disable=no-member
+        levels = numpy.array(list(self._patterns), dtype=numpy.int8)
+        counts = numpy.array(list(self._patterns.values()),
+                             dtype=numpy.float64)
+        num_levels = [len(thresholds) + 1 for thresholds in
+                      self._thresholds(levels.shape[1])]
+        if self.m is None or len(self.m) != len(num_levels):
+            # begin with agreement more likely among matches
+            self.m = [numpy.arange(1, num + 1, dtype=numpy.float64) ** 2 for
+                      num in num_levels]
+            self.u = [weights[::-1].copy() for weights in self.m]
+            self.m = [weights / weights.sum() for weights in self.m]
+            self.u = [weights / weights.sum() for weights in self.u]
+
+        # a little smoothing keeps every level possible in either class
+        smoothing = 1e-6
+        for self.iterations in _range(1, self.max_iter + 1):
+            posterior = self._posterior(levels)
+            match_counts = counts * posterior
+            nonmatch_counts = counts - match_counts
+            prior = min(max(match_counts.sum() / counts.sum(), smoothing),
+                        1 - smoothing)
+            change = abs(prior - self.prior)
+            self.prior = prior
+            for col, num in enumerate(num_levels):
+                column = levels[:, col]
+                for probs, weights in ((self.m, match_counts),
+                                       (self.u, nonmatch_counts)):
+                    totals = numpy.bincount(column[column >= 0],
+                                            weights[column >= 0],
+                                            minlength=num) + smoothing
+                    totals /= totals.sum()
+                    change = max(change, numpy.abs(totals - probs[col]).max())
+                    probs[col] = totals
+            if change <= self.tol:
+                break
+        # pylint: enable=no-member
+        return self
+
+    def _check_fitted(self):
+        """Raise a ValueError if the model has not been fitted
+        """
+        if self.m is None:
+            raise ValueError('the model has not been fitted')
+
+    def match_weights(self, matrix):
+        """Return the Fellegi-Sunter match weight of each pair
+
+        The match weight of a pair is the sum, over its fields, of the log2
+        ratio of the probability of its agreement level among matches to that
+        among non-matches.
+
+        :param numpy.ndarray matrix: a comparison matrix
+        :returns: the match weight of each pair
+        :rtype: numpy.ndarray
+        """
+        self._check_fitted()
+        log_m, log_u = self._log_likelihoods(self.levels(matrix))
+        return (log_m - log_u) / math.log(2)
+
+    def match_probability(self, matrix):
+        """Return the probability that each pair is a match
+
+        :param numpy.ndarray matrix: a comparison matrix
+        :returns: the posterior probability of a match of each pair
+        :rtype: numpy.ndarray
+        """
+        self._check_fitted()
+        return self._posterior(self.levels(matrix))
+
+    def predict(self, matrix, threshold=0.5):
+        """Return whether each pair is classified as a match
+
+        :param numpy.ndarray matrix: a comparison matrix
+        :param float threshold: the least probability of a match for a pair
+            to be classified as a match
+        :returns: True for each pair classified as a match
+        :rtype: numpy.ndarray
+        """
+        return self.match_probability(matrix) >= threshold
+
+    def evaluate(self, matrix, labels, threshold=0.5):
+        """Return the confusion table of the model's classification of
+        labelled pairs
+
+        :param numpy.ndarray matrix: a comparison matrix
+        :param list labels: True for each pair that is a match
+        :param float threshold: the least probability of a match for a pair
+            to be classified as a match
+        :returns: the confusion table, from whose methods (precision, recall,
+            f1_score, etc.) the classification's statistics are available
+        :rtype: ConfusionTable
+        """
+        predicted = self.predict(matrix, threshold)
+        # pylint: disable=no-member
+        labels = numpy.asarray(labels, dtype=numpy.bool_)
+        if labels.shape != predicted.shape:
+            raise ValueError('there must be a label for each pair')
+        return ConfusionTable(int((predicted & labels).sum()),
+                              int((~predicted & ~labels).sum()),
+                              int((predicted & ~labels).sum()),
+                              int((~predicted & labels).sum()))
+        # pylint: enable=no-member
@@ -25,9 +25,15 @@ from __future__ import unicode_literals
 from abydos._compat import _range
 import unittest
 from abydos.clustering import fingerprint, qgram_fingerprint, \
-    phonetic_fingerprint, skeleton_key, omission_key, mean_pairwise_similarity
+    phonetic_fingerprint, skeleton_key, omission_key, \
+    mean_pairwise_similarity, pairwise_matrix
+from abydos.distance import sim_levenshtein, sim_jaro_winkler, sim_tversky, \
+    sim_monge_elkan
 import abydos.stats as stats
 import abydos.phonetic as phonetic
+import numpy
+import os
+import tempfile
 
 NIALL = ('Niall', 'Neal', 'Neil', 'Njall', 'Njáll', 'Nigel', 'Neel', 'Nele',
          'Nigelli', 'Nel', 'Kneale', 'Uí Néill', 'O\'Neill', 'MacNeil',
@@ -192,6 +198,85 @@ class MPSTestCases(unittest.TestCase):
         self.assertAlmostEqual(mean_pairwise_similarity(NIALL),
                                mean_pairwise_similarity(set(NIALL)))
 
+        self.assertEqual(mean_pairwise_similarity(NIALL, n_jobs=2),
+                         mean_pairwise_similarity(NIALL))
+        self.assertEqual(mean_pairwise_similarity(NIALL, symmetric=True,
+                                                  n_jobs=2),
+                         mean_pairwise_similarity(NIALL, symmetric=True))
+
+
+def _asym_tversky(src, tar):
+    """an asymmetric similarity metric, defined at the module level so that it
+    can be pickled
+    """
+    return sim_tversky(src, tar, 2, 0.2, 0.8)
+
+
+class PairwiseMatrixTestCases(unittest.TestCase):
+    """test cases for abydos.clustering.pairwise_matrix
+    """
+    def test_pairwise_matrix(self):
+        """test abydos.clustering.pairwise_matrix
+        """
+        num = len(NIALL)
+        condensed = pairwise_matrix(NIALL)
+        self.assertEqual(condensed.shape, (num*(num-1)//2,))
+        k = 0
+        for i in _range(num):
+            for j in _range(i+1, num):
+                self.assertEqual(condensed[k],
+                                 sim_levenshtein(NIALL[i], NIALL[j]))
+                k += 1
+
+        square = pairwise_matrix(NIALL, _asym_tversky, symmetric=False)
+        self.assertEqual(square.shape, (num, num))
+        for i in _range(num):
+            for j in _range(num):
+                self.assertEqual(square[i, j],
+                                 _asym_tversky(NIALL[i], NIALL[j]))
+
+        # tiling & parallelism must not change the results
+        for tile_size in (1, 3, 100):
+            self.assertTrue(numpy.array_equal(
+                pairwise_matrix(NIALL, tile_size=tile_size), condensed))
+            self.assertTrue(numpy.array_equal(
+                pairwise_matrix(NIALL, _asym_tversky, False, n_jobs=2,
+                                tile_size=tile_size), square))
+        self.assertTrue(numpy.array_equal(
+            pairwise_matrix(NIALL, sim_jaro_winkler, n_jobs=2, tile_size=4),
+            pairwise_matrix(NIALL, sim_jaro_winkler)))
+        self.assertTrue(numpy.array_equal(pairwise_matrix(NIALL, n_jobs=0),
+                                          condensed))
+
+        # a full matrix of a metric registered as symmetric is mirrored, and
+        # one with a batch kernel is computed with it, row by row
+        for metric in (sim_levenshtein, sim_jaro_winkler, sim_monge_elkan):
+            expected = [[metric(src, tar) for tar in NIALL] for src in NIALL]
+            for n_jobs in (1, 2):
+                self.assertEqual(pairwise_matrix(NIALL, metric, False, n_jobs,
+                                                 tile_size=5).tolist(),
+                                 expected)
+
+        # memmap-backed matrices
+        temp_dir = tempfile.mkdtemp()
+        for n_jobs in (1, 2):
+            filename = os.path.join(temp_dir, 'niall%d.dat' % n_jobs)
+            matrix = pairwise_matrix(NIALL, n_jobs=n_jobs, filename=filename,
+                                     tile_size=5)
+            self.assertIsInstance(matrix, numpy.memmap)
+            self.assertTrue(numpy.array_equal(matrix, condensed))
+            del matrix
+            os.remove(filename)
+        os.rmdir(temp_dir)
+
+        self.assertEqual(pairwise_matrix(' '.join(NIALL_1WORD)).tolist(),
+                         pairwise_matrix(NIALL_1WORD).tolist())
+        self.assertEqual(pairwise_matrix(['a']).shape, (0,))
+        self.assertEqual(pairwise_matrix([], symmetric=False).shape, (0, 0))
+        self.assertRaises(ValueError, pairwise_matrix, 0)
+        self.assertRaises(ValueError, pairwise_matrix, NIALL, 'imaginary')
+        self.assertRaises(ValueError, pairwise_matrix, NIALL, tile_size=0)
+
 
 if __name__ == '__main__':
     unittest.main()
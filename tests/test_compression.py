@@ -22,10 +22,12 @@ This module contains unit tests for abydos.compression
 """
 
 from __future__ import unicode_literals
+from __future__ import division
 import unittest
 from abydos.util import Rational
 from abydos.compression import ac_train, ac_encode, ac_decode, \
-    bwt_encode, bwt_decode, rle_encode, rle_decode
+    bwt_encode, bwt_decode, rle_encode, rle_decode, Compressor
+import codecs
 
 
 class ArithmeticCoderTestCases(unittest.TestCase):
@@ -187,5 +189,88 @@ class RLETestCases(unittest.TestCase):
         self.assertEqual(rle_decode(rle_encode('Schifffahrt')), 'Schifffahrt')
 
 
+class CompressorTestCases(unittest.TestCase):
+    """test cases for abydos.compression.Compressor
+    """
+    words = ('', 'a', 'banana', 'WWWWWWWWWWWWBWWWWWWWWWWWWBBBWWWWWWW',
+             'Schifffahrt', 'Njáll')
+
+    def test_compressor_length(self):
+        """test abydos.compression.Compressor.length
+        """
+        probs = ac_train(''.join(self.words))
+        for word in self.words:
+            self.assertEqual(Compressor('rle').length(word),
+                             len(rle_encode(word, False)))
+            self.assertEqual(Compressor('bwtrle').length(word),
+                             len(rle_encode(word)))
+            self.assertEqual(Compressor('arith', probs).length(word),
+                             ac_encode(word, probs)[1])
+            self.assertEqual(Compressor('bz2').length(word),
+                             len(codecs.encode(word.encode('utf-8'),
+                                               'bz2_codec')[15:]))
+            self.assertEqual(Compressor('zlib').length(word),
+                             len(codecs.encode(word.encode('utf-8'),
+                                               'zlib_codec')[2:]))
+        # unknown compressors are taken to be zlib, as in dist_compression
+        self.assertEqual(Compressor('bzip2').compressor, 'zlib')
+        self.assertRaises(ValueError, Compressor, 'arith')
+
+    def test_compressor_cache(self):
+        """test abydos.compression.Compressor's cache
+        """
+        comp = Compressor('rle', cache_size=2)
+        self.assertEqual(comp.length('aaab'), 3)
+        self.assertEqual(comp.length('bbbbbbbbbb'), 3)
+        self.assertEqual(list(comp._cache), ['aaab', 'bbbbbbbbbb'])
+        # a cache hit makes its string the most recently used
+        self.assertEqual(comp.length('aaab'), 3)
+        self.assertEqual(list(comp._cache), ['bbbbbbbbbb', 'aaab'])
+        # so the least recently used string is evicted
+        self.assertEqual(comp.length('ab'), 2)
+        self.assertEqual(list(comp._cache), ['aaab', 'ab'])
+
+        comp = Compressor('rle', cache_size=0)
+        self.assertEqual(comp.length('aaab'), 3)
+        self.assertEqual(len(comp._cache), 0)
+
+    def test_compressor_ncd(self):
+        """test abydos.compression.Compressor.ncd
+        """
+        comp = Compressor('rle')
+        self.assertEqual(comp.ncd('abc', 'abc'), 0)
+        self.assertEqual(comp.ncd('abc', 'def'), 1)
+        self.assertEqual(comp.ncd('aaa', 'bbaaa'), 0.5)
+        # 'aabbbb' compresses to 'aa4b' & 'bbbaab' to '3baab'
+        self.assertEqual(comp.concat_length('aab', 'bbb'), 4)
+        self.assertEqual(comp.concat_length('aab', 'bbb', False), 4)
+        self.assertEqual(comp.concat_length('bbb', 'aab'), 4)
+        self.assertEqual(comp.concat_length('bbb', 'aab', False), 5)
+        self.assertAlmostEqual(comp.ncd('aab', 'bbb'), 2/3)
+        self.assertEqual(comp.ncd('bbb', 'aab', False), 1)
+
+    def test_compressor_primed(self):
+        """test abydos.compression.Compressor.primed & .ncd_many
+        """
+        for compressor in ('zlib', 'bz2', 'rle'):
+            comp = Compressor(compressor)
+            for src in self.words:
+                concat_length = comp.primed(src)
+                for tar in self.words:
+                    self.assertEqual(concat_length(tar),
+                                     comp.concat_length(src, tar, False))
+                for both_orders in (True, False):
+                    self.assertEqual(list(comp.ncd_many(src, self.words,
+                                                        both_orders)),
+                                     [comp.ncd(src, tar, both_orders)
+                                      for tar in self.words])
+
+        # a long reference string, primed once
+        comp = Compressor('zlib')
+        src = ' '.join(self.words) * 100
+        self.assertEqual(list(comp.ncd_many(src, self.words, False)),
+                         [comp.ncd(src, tar, False) for tar in self.words])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -24,7 +24,7 @@ This module contains unit tests for abydos.distance
 from __future__ import unicode_literals
 from __future__ import division
 import unittest
-from abydos._compat import _range
+from abydos._compat import _range, _unicode
 from abydos.distance import levenshtein, dist_levenshtein, sim_levenshtein, \
     damerau_levenshtein, dist_damerau, sim_damerau, hamming, dist_hamming, \
     sim_hamming, sim_tversky, dist_tversky, sim_dice, dist_dice, sim_jaccard, \
@@ -37,10 +37,15 @@ from abydos.distance import levenshtein, dist_levenshtein, sim_levenshtein, \
     needleman_wunsch,  smith_waterman, gotoh, sim_length, dist_length, \
     sim_prefix, dist_prefix, sim_suffix, dist_suffix, sim_mlipns, \
     dist_mlipns, bag, sim_bag, dist_bag, editex, sim_editex, dist_editex, \
-    sim, dist
+    sim, dist, sim_many, dist_many, ncd_matrix, metric_info, MetricInfo, \
+    sim_tfidf, TfidfIndex, Profile
+import abydos.distance
 from abydos.compression import ac_train
+from abydos.corpus import Corpus
 from abydos.qgram import QGrams
 import math
+import pickle
+import random
 from difflib import SequenceMatcher
 import os
 
@@ -93,6 +98,17 @@ class LevenshteinTestCases(unittest.TestCase):
         self.assertEqual(levenshtein('CA', 'ABC', 'dam'), 2)
         self.assertEqual(levenshtein('CA', 'ABC', 'osa'), 3)
 
+        # test bit-parallel (unit cost) against Wagner-Fischer (scaled cost)
+        for mode in ('lev', 'osa'):
+            for src in NIALL:
+                for tar in NIALL:
+                    self.assertEqual(2*levenshtein(src, tar, mode),
+                                     levenshtein(src, tar, mode,
+                                                 cost=(2, 2, 2, 2)))
+        self.assertEqual(levenshtein('ab'*40, 'ba'*40, 'osa'), 2)
+        self.assertEqual(levenshtein('ab'*40, 'ba'*40, 'lev'), 2)
+        self.assertEqual(levenshtein('abcdef'*20, 'abdcef'*20, 'osa'), 20)
+
         # test cost of insert
         self.assertEqual(levenshtein('', 'b', 'lev', cost=(5, 7, 10, 10)), 5)
         self.assertEqual(levenshtein('', 'b', 'osa', cost=(5, 7, 10, 10)), 5)
@@ -144,6 +160,36 @@ class LevenshteinTestCases(unittest.TestCase):
         self.assertRaises(ValueError, levenshtein, 'ab', 'ba', 'dam',
                           cost=(10, 10, 10, 5))
 
+    def test_levenshtein_max_distance(self):
+        """test abydos.distance.levenshtein (with max_distance)
+        """
+        self.assertEqual(levenshtein('', '', max_distance=0), 0)
+        self.assertEqual(levenshtein('abc', '', max_distance=2), 3)
+        self.assertEqual(levenshtein('', 'abc', max_distance=3), 3)
+        self.assertEqual(levenshtein('sturgeon', 'urgently', max_distance=6),
+                         6)
+        self.assertEqual(levenshtein('sturgeon', 'urgently', max_distance=5),
+                         6)
+        self.assertEqual(levenshtein('sturgeon', 'urgently', max_distance=2),
+                         3)
+        self.assertEqual(levenshtein('abcdefghij', 'klmnopqrst',
+                                     max_distance=1), 2)
+        self.assertEqual(levenshtein('CA', 'ABC', 'osa', max_distance=1), 2)
+        self.assertEqual(levenshtein('CA', 'ABC', 'dam', max_distance=2), 2)
+        self.assertEqual(levenshtein('CA', 'ABC', 'dam', max_distance=1), 2)
+
+        # the banded Wagner-Fischer matrix must agree with the full one
+        for mode in ('lev', 'osa', 'dam'):
+            for cost in ((1, 1, 1, 1), (2, 2, 2, 2), (1, 2, 3, 2),
+                         (5, 7, 10, 10)):
+                for src in NIALL:
+                    for tar in NIALL:
+                        full = levenshtein(src, tar, mode, cost)
+                        for max_distance in (0, 2, 5, 10):
+                            self.assertEqual(levenshtein(src, tar, mode, cost,
+                                                         max_distance),
+                                             min(full, max_distance+1))
+
     def test_dist_levenshtein(self):
         """test abydos.distance.dist_levenshtein
         """
@@ -159,6 +205,15 @@ class LevenshteinTestCases(unittest.TestCase):
         self.assertAlmostEqual(dist_levenshtein('abbc', 'ac'), 1/2)
         self.assertAlmostEqual(dist_levenshtein('abbc', 'abc'), 1/4)
 
+        self.assertEqual(dist_levenshtein('', 'a', max_distance=0.5), 1)
+        self.assertAlmostEqual(dist_levenshtein('abc', 'ac',
+                                                max_distance=0.5), 1/3)
+        self.assertEqual(dist_levenshtein('abbc', 'ac', max_distance=0.4), 1)
+        self.assertAlmostEqual(dist_levenshtein('abbc', 'abc', 'lev',
+                                                (2, 2, 2, 2), 0.25), 1/4)
+        self.assertEqual(dist_levenshtein('abbc', 'acd', 'lev',
+                                          (2, 2, 2, 2), 0.25), 1)
+
     def test_sim_levenshtein(self):
         """test abydos.distance.sim_levenshtein
         """
@@ -199,6 +254,18 @@ class LevenshteinTestCases(unittest.TestCase):
         self.assertRaises(ValueError, damerau_levenshtein, 'ab', 'ba',
                           cost=(10, 10, 10, 5))
 
+        self.assertEqual(damerau_levenshtein('', 'abc', max_distance=2), 3)
+        self.assertEqual(damerau_levenshtein('CA', 'ABC', max_distance=2), 2)
+        self.assertEqual(damerau_levenshtein('CA', 'ABC', max_distance=1), 2)
+        self.assertEqual(damerau_levenshtein('abcdefghij', 'klmnopqrst',
+                                             max_distance=3), 4)
+        self.assertEqual(damerau_levenshtein('abcdefghij', 'bacdefhgij',
+                                             max_distance=2), 2)
+        self.assertEqual(damerau_levenshtein('xxxxab', 'bxxxxa',
+                                             max_distance=2), 2)
+        self.assertEqual(damerau_levenshtein('xxxxab', 'bxxxxa',
+                                             max_distance=1), 2)
+
     def test_dist_damerau(self):
         """test abydos.distance.dist_damerau
         """
@@ -890,6 +957,25 @@ class JaroWinklerTestCases(unittest.TestCase):
 
         self.assertAlmostEqual(dist_jaro_winkler('ABCD', 'EFGH'), 1.0)
 
+    def test_jaro_long(self):
+        """test abydos.distance.sim_jaro_winkler & .sim_strcmp95 on strings
+        longer than a machine word
+        """
+        # match positions are tracked in bit-vectors, so check that strings
+        # of more than 64 characters, with a wide search window, are handled
+        src = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ' * 4
+        tar = src[:30] + src[31:60] + 'XX' + src[60:]
+        self.assertAlmostEqual(sim_jaro_winkler(src, tar, mode='jaro'),
+                               0.88688579)
+        self.assertAlmostEqual(sim_jaro_winkler(src, tar), 0.93213148)
+        self.assertAlmostEqual(sim_jaro_winkler(src, tar, long_strings=True),
+                               0.96489559)
+        self.assertAlmostEqual(sim_jaro_winkler(src, tar, 2, mode='jaro'),
+                               0.88966228)
+        self.assertAlmostEqual(sim_strcmp95(src, tar), 0.93213148)
+        self.assertEqual(sim_jaro_winkler(src, tar),
+                         sim_jaro_winkler(tar, src))
+
 
 class LcsseqTestCases(unittest.TestCase):
     """test cases for abydos.distance.lcsseq, .sim_lcsseq, & .dist_lcsseq
@@ -1002,10 +1088,70 @@ class LcsseqTestCases(unittest.TestCase):
         self.assertAlmostEqual(dist_lcsseq('cc', 'bbbbcccccc'), 8/10)
         self.assertAlmostEqual(dist_lcsseq('ccc', 'bcbb'), 3/4)
 
+    def test_lcsseq_long(self):
+        """test abydos.distance.lcsseq & .sim_lcsseq (long strings)
+        """
+        rand = random.Random(0)
+        min_cells = abydos.distance._HIRSCHBERG_MIN_CELLS
+        try:
+            for len_src, len_tar, alphabet in ((5, 7, 'AB'), (40, 33, 'ABC'),
+                                               (200, 150, 'ACGT'),
+                                               (17, 300, 'ACGT'),
+                                               (300, 16, 'abcdefgh')):
+                src = ''.join(rand.choice(alphabet) for _ in _range(len_src))
+                tar = ''.join(rand.choice(alphabet) for _ in _range(len_tar))
+                abydos.distance._HIRSCHBERG_MIN_CELLS = float('inf')
+                expected = lcsseq(src, tar)
+                abydos.distance._HIRSCHBERG_MIN_CELLS = 0
+                self.assertEqual(lcsseq(src, tar), expected)
+                self.assertEqual(sim_lcsseq(src, tar),
+                                 len(expected) / max(len_src, len_tar))
+                self.assertEqual(sim_lcsseq(tar, src), sim_lcsseq(src, tar))
+        finally:
+            abydos.distance._HIRSCHBERG_MIN_CELLS = min_cells
+
+        # very long strings take the linear memory path by default
+        src = ''.join(rand.choice('ACGT') for _ in _range(2000))
+        self.assertEqual(lcsseq(src, src), src)
+        self.assertEqual(lcsseq(src, src[::2]), src[::2])
+        self.assertEqual(sim_lcsseq(src, src[1::2]), 0.5)
+
 
 class LcsstrTestCases(unittest.TestCase):
     """test cases for abydos.distance.lcsstr, .sim_lcsstr, & .dist_lcsstr
     """
+    def test_lcsstr_long(self):
+        """test abydos.distance.lcsstr (random & long strings)
+        """
+        def _lcsstr_dp(src, tar):
+            """Return the longest common substring, by dynamic programming
+            """
+            lengths = [[0] * (len(tar)+1) for _ in _range(len(src)+1)]
+            longest, i_longest = 0, 0
+            for i in _range(1, len(src)+1):
+                for j in _range(1, len(tar)+1):
+                    if src[i-1] == tar[j-1]:
+                        lengths[i][j] = lengths[i-1][j-1] + 1
+                        if lengths[i][j] > longest:
+                            longest = lengths[i][j]
+                            i_longest = i
+            return src[i_longest - longest:i_longest]
+
+        rand = random.Random(0)
+        for len_src, len_tar, alphabet in ((5, 7, 'A'), (10, 10, 'AB'),
+                                           (40, 33, 'ABC'),
+                                           (200, 150, 'ACGT'),
+                                           (17, 300, 'abcdefgh')):
+            for _ in _range(10):
+                src = ''.join(rand.choice(alphabet) for _ in _range(len_src))
+                tar = ''.join(rand.choice(alphabet) for _ in _range(len_tar))
+                self.assertEqual(lcsstr(src, tar), _lcsstr_dp(src, tar))
+                self.assertEqual(lcsstr(tar, src), _lcsstr_dp(tar, src))
+
+        src = ''.join(rand.choice('ACGT') for _ in _range(10000))
+        self.assertEqual(lcsstr(src, src[2500:7500]), src[2500:7500])
+        self.assertEqual(lcsstr(src[::-1]+src, src), src)
+
     def test_lcsstr(self):
         """test abydos.distance.lcsstr
         """
@@ -1178,6 +1324,17 @@ class RatcliffObershelpTestCases(unittest.TestCase):
                                        SequenceMatcher(None, word1,
                                                        word2).ratio())
 
+        # paragraph-length text
+        rand = random.Random(0)
+        with open(TESTDIR+'/corpora/variantNames.csv') as cav_testset:
+            words = cav_testset.read().split()
+        for _ in _range(5):
+            text1 = ' '.join(rand.choice(words) for _ in _range(60))
+            text2 = ' '.join(rand.choice(words) for _ in _range(60))
+            self.assertAlmostEqual(sim_ratcliff_obershelp(text1, text2),
+                                   SequenceMatcher(None, text1, text2,
+                                                   False).ratio())
+
     def test_dist_ratcliff_obershelp(self):
         """test abydos.distance.dist_ratcliff_obershelp
         """
@@ -1271,7 +1428,8 @@ class MraTestCases(unittest.TestCase):
 
 
 class CompressionTestCases(unittest.TestCase):
-    """test cases for abydos.distance.dist_compression & .sim_compression
+    """test cases for abydos.distance.dist_compression, .sim_compression, &
+    .ncd_matrix
     """
     arith_dict = ac_train(' '.join(NIALL))
 
@@ -1415,6 +1573,35 @@ class CompressionTestCases(unittest.TestCase):
         self.assertAlmostEqual(sim_compression('bananas', 'bananen', 'bwtrle'),
                                0.5)
 
+    def test_ncd_matrix(self):
+        """test abydos.distance.ncd_matrix
+        """
+        self.assertEqual(ncd_matrix([]).shape, (0, 0))
+        self.assertEqual(ncd_matrix(['Niall']).tolist(), [[0]])
+
+        for compressor in ('bz2', 'lzma', 'zlib', 'rle', 'bwtrle'):
+            matrix = ncd_matrix(NIALL, compressor)
+            self.assertEqual(matrix.shape, (len(NIALL), len(NIALL)))
+            for i, src in enumerate(NIALL):
+                for j, tar in enumerate(NIALL):
+                    self.assertEqual(matrix[i, j],
+                                     dist_compression(src, tar, compressor))
+
+        matrix = ncd_matrix(NIALL, 'arith', self.arith_dict)
+        self.assertEqual(matrix[0, 1],
+                         dist_compression('Niall', 'Neal', 'arith',
+                                          self.arith_dict))
+        # lacking a dictionary, one is trained on the whole collection
+        self.assertEqual(ncd_matrix(NIALL, 'arith').tolist(),
+                         ncd_matrix(NIALL, 'arith',
+                                    ac_train(''.join(NIALL))).tolist())
+
+        # with both_orders=False, only collection[i] + collection[j], i < j,
+        # is compressed
+        matrix = ncd_matrix(NIALL, 'rle', both_orders=False)
+        self.assertTrue((matrix >= ncd_matrix(NIALL, 'rle')).all())
+        self.assertTrue((matrix == matrix.T).all())
+
 
 class MongeElkanTestCases(unittest.TestCase):
     """test cases for abydos.distance.sim_monge_elkan & .dist_monge_elkan
@@ -1602,6 +1789,8 @@ class GotohTestCases(unittest.TestCase):
         """test abydos.distance.needleman_wunsch_affine
         """
         self.assertEqual(gotoh('', ''), 0)
+        self.assertEqual(gotoh('', 'AGCT', 2, 1), -5)
+        self.assertEqual(gotoh('AGCT', '', 2, 1), -5)
 
         # https://en.wikipedia.org/wiki/Needleman–Wunsch_algorithm
         self.assertEqual(gotoh('GATTACA', 'GCATGCU', 1, 1, _sim_nw), 0)
@@ -1912,6 +2101,26 @@ class EditexTestCases(unittest.TestCase):
         self.assertEqual(editex('neal', 'nihl'), 3)
         self.assertEqual(editex('nihl', 'neal'), 3)
 
+        # test max_distance
+        self.assertEqual(editex('nelson', '', max_distance=12), 12)
+        self.assertEqual(editex('nelson', '', max_distance=5), 6)
+        self.assertEqual(editex('nelson', 'neilsen', max_distance=2), 2)
+        self.assertEqual(editex('nelson', 'neilsen', max_distance=1), 2)
+        self.assertEqual(editex('nelson', 'neilsen', local=True,
+                                max_distance=2), 2)
+        self.assertEqual(editex('nelson', 'neilsen', local=True,
+                                max_distance=0), 1)
+        self.assertEqual(editex('niall', 'nihal', max_distance=0), 1)
+        self.assertEqual(editex('nelson', 'nelsonssons', max_distance=3), 4)
+        for src in NIALL:
+            for tar in NIALL:
+                for local in (False, True):
+                    full = editex(src, tar, local=local)
+                    for max_distance in (0, 2, 5, 10):
+                        self.assertEqual(editex(src, tar, local=local,
+                                                max_distance=max_distance),
+                                         min(full, max_distance+1))
+
     def test_editex_local(self):
         """test abydos.distance.editex (local variant)
         """
@@ -1929,6 +2138,30 @@ class EditexTestCases(unittest.TestCase):
         self.assertEqual(editex('neal', 'nihl', local=True), 3)
         self.assertEqual(editex('nihl', 'neal', local=True), 3)
 
+    def test_editex_costs(self):
+        """test abydos.distance.editex (precomputed costs & normalization)
+        """
+        self.assertEqual(editex('Schwarzenegger', 'Shwartzeneger'), 3)
+        self.assertEqual(editex('Schwarzenegger', 'Shwartzeneger',
+                                (1, 2, 3)), 18)
+        self.assertEqual(editex('Schwarzenegger', 'Shwartzeneger',
+                                local=True), 3)
+        self.assertEqual(editex('Straße', 'STRASSE'), 0)
+        self.assertEqual(editex('Ångström', 'angstrom'), 4)
+
+        # the cache of normalized forms is bounded
+        cache_size = abydos.distance._EDITEX_NORMALIZE_CACHE_SIZE
+        try:
+            abydos.distance._EDITEX_NORMALIZE_CACHE_SIZE = 4
+            abydos.distance._EDITEX_NORMALIZE_CACHE.clear()
+            for src in NIALL:
+                for tar in NIALL:
+                    self.assertEqual(editex(src, tar), editex(tar, src))
+                    self.assertLessEqual(
+                        len(abydos.distance._EDITEX_NORMALIZE_CACHE), 4)
+        finally:
+            abydos.distance._EDITEX_NORMALIZE_CACHE_SIZE = cache_size
+
     def test_sim_editex(self):
         """test abydos.distance.sim_editex
         """
@@ -1954,6 +2187,164 @@ class EditexTestCases(unittest.TestCase):
         self.assertEqual(dist_editex('niall', 'neal'), 0.1)
 
 
+class TfidfTestCases(unittest.TestCase):
+    """test cases for abydos.distance.sim_tfidf & .TfidfIndex
+    """
+    def test_sim_tfidf(self):
+        """test abydos.distance.sim_tfidf
+        """
+        self.assertEqual(sim_tfidf('', ''), 1)
+        self.assertEqual(sim_tfidf('Niall', ''), 0)
+        self.assertEqual(sim_tfidf('', 'Niall'), 0)
+        self.assertEqual(sim_tfidf('Niall', 'Niall'), 1)
+        self.assertEqual(sim_tfidf('abc', 'xyz'), 0)
+        # with no documents, every IDF is 1
+        self.assertAlmostEqual(sim_tfidf('Niall', 'Neil'), 2/math.sqrt(30))
+        self.assertAlmostEqual(sim_tfidf('a a b', 'a', 0),
+                               math.sqrt(2)/math.sqrt(3))
+        self.assertAlmostEqual(sim_tfidf(QGrams('Niall'), QGrams('Neil')),
+                               sim_tfidf('Niall', 'Neil'))
+
+        # terms occurring in every document (& none) carry no weight
+        self.assertEqual(sim_tfidf('Neil', 'Neal', 2, ['Ned', 'Nell']), 1)
+        self.assertEqual(sim_tfidf('Neil', 'Neal', 2, ['Ned', 'Ned']), 0)
+        self.assertEqual(sim_tfidf('a b', 'a c', 0, ['a b', 'a d']), 0)
+        idf = math.log(3/2)
+        self.assertAlmostEqual(sim_tfidf('a b', 'a c', 0, 'a d b'),
+                               idf*idf/(idf*math.sqrt(2*idf*idf)))
+        index = TfidfIndex(NIALL)
+        self.assertEqual(sim_tfidf('Niall', 'Neil', 2, index),
+                         sim_tfidf('Niall', 'Neil', 2, NIALL))
+        self.assertEqual(sim_tfidf('Niall', 'Neil', 2, index, index),
+                         sim_tfidf('Niall', 'Neil', 2, index))
+        self.assertNotEqual(sim_tfidf('Niall', 'Neil', 2, index, ['Nil']),
+                            sim_tfidf('Niall', 'Neil', 2, index))
+
+        # identical strings are similar, whatever the corpora
+        self.assertEqual(sim_tfidf('Niall', 'Niall', 2, index), 1)
+        self.assertEqual(index.nearest('Niall'), [(1.0, 'Niall')])
+        self.assertEqual(sim_tfidf('Niall', 'Niall', 2, ['Niall', 'Niall']),
+                         1)
+        self.assertEqual(sim_tfidf('Niall', 'Niall', 2, ['Ned']), 1)
+        self.assertEqual(sim_tfidf('', '', 2, index), 1)
+        self.assertEqual(sim_tfidf('Niall', 'Niall', 2, index,
+                                   ['Nial', 'Noel']), 1)
+        self.assertEqual(sim_many('Niall', ['Niall', 'Nial'], sim_tfidf, 2,
+                                  ['Ned'], ['Nial', 'Noel']).tolist(),
+                         [1.0, sim_tfidf('Niall', 'Nial', 2, ['Ned'],
+                                         ['Nial', 'Noel'])])
+        for src in NIALL:
+            for tar in NIALL:
+                self.assertEqual(sim_tfidf(src, tar, 2, index),
+                                 sim_tfidf(tar, src, 2, index))
+                self.assertGreaterEqual(sim_tfidf(src, tar, 2, index), 0)
+                self.assertLessEqual(sim_tfidf(src, tar, 2, index), 1)
+
+    def test_tfidf_index(self):
+        """test abydos.distance.TfidfIndex
+        """
+        index = TfidfIndex()
+        self.assertEqual(len(index), 0)
+        self.assertEqual(index.nearest('Niall'), [])
+        self.assertEqual(index.idf('$N'), 0)
+        self.assertEqual(index.add('Niall'), 0)
+        index.update(['Neal', 'Neil'])
+        self.assertEqual(list(index), ['Niall', 'Neal', 'Neil'])
+        self.assertEqual(index[1], 'Neal')
+        self.assertEqual(index.idf('$N'), 0)
+        self.assertAlmostEqual(index.idf('Ne'), math.log(3/2))
+        self.assertAlmostEqual(index.idf('ia'), math.log(3))
+        self.assertEqual(index.idf('zz'), 0)
+        self.assertEqual(index.vector('$N'), {})
+        index.add('Nigel')
+        self.assertAlmostEqual(index.idf('Ne'), math.log(4/2))
+
+        corpus = Corpus('a b c\nd\n\na e\n\nb c')
+        index = TfidfIndex(corpus, 0)
+        self.assertEqual(list(index), ['a b c d', 'a e', 'b c'])
+        self.assertAlmostEqual(index.idf('a'), math.log(3/2))
+        self.assertAlmostEqual(index.idf('d'), math.log(3))
+        self.assertEqual(list(TfidfIndex('a b', 0)), ['a', 'b'])
+
+        index = TfidfIndex(NIALL)
+        self.assertEqual(index.nearest('Niall', 0), [])
+        self.assertEqual(index.nearest('xyz', 3), [])
+        for query in NIALL + ('Nil', 'Noel'):
+            expected = sorted((-sim_tfidf(query, word, 2, index), i) for
+                              i, word in enumerate(NIALL))
+            expected = [(-score, NIALL[i]) for score, i in expected if
+                        score < 0]
+            for k in (1, 3, len(NIALL)):
+                nearest = index.nearest(query, k)
+                self.assertEqual([word for _, word in nearest],
+                                 [word for _, word in expected[:k]])
+                for (score, _), (exp_score, _) in zip(nearest, expected):
+                    self.assertAlmostEqual(score, exp_score)
+            search = index.search(query, 0.25)
+            self.assertEqual([word for _, word in search],
+                             [word for score, word in expected if
+                              score >= 0.25])
+        self.assertEqual(index.nearest('Niall')[0][1], 'Niall')
+        self.assertAlmostEqual(index.nearest('Niall')[0][0], 1)
+
+
+class AntidiagonalTestCases(unittest.TestCase):
+    """test cases for the anti-diagonal dynamic programming of
+    abydos.distance.levenshtein, .lcsseq, .needleman_wunsch, .smith_waterman,
+    & .gotoh on long strings
+    """
+    def _assert_identical(self, func, *args):
+        """assert that func returns the same with & without anti-diagonals
+        """
+        min_length = abydos.distance._ANTIDIAGONAL_MIN_LENGTH
+        try:
+            abydos.distance._ANTIDIAGONAL_MIN_LENGTH = float('inf')
+            expected = func(*args)
+            abydos.distance._ANTIDIAGONAL_MIN_LENGTH = 1
+            self.assertEqual(func(*args), expected)
+        finally:
+            abydos.distance._ANTIDIAGONAL_MIN_LENGTH = min_length
+
+    def test_antidiagonal(self):
+        """test abydos.distance anti-diagonal dynamic programming
+        """
+        rand = random.Random(0)
+        pairs = [('GATTACA', 'GCATGCU'), ('AGACTAGTTAC', 'CGAGACGT'),
+                 ('Niall', 'Niall Noígíallach'), ('', 'AGCT'), ('A', 'A')]
+        pairs += [(''.join(rand.choice('ACGT') for _ in _range(len_src)),
+                   ''.join(rand.choice('ACGT') for _ in _range(len_tar)))
+                  for len_src, len_tar in ((60, 60), (50, 80), (90, 49))]
+        for src, tar in pairs:
+            for cost in ((1, 1, 2, 1), (2, 3, 1, 1), (0.5, 1.5, 0.7, 0.3)):
+                self._assert_identical(levenshtein, src, tar, 'lev', cost)
+                self._assert_identical(levenshtein, src, tar, 'osa', cost)
+            self._assert_identical(lcsseq, src, tar)
+            for gap_cost, sim_func in ((1, sim_ident), (5, _sim_nw),
+                                       (0.4, _sim_wikipedia)):
+                if sim_func is _sim_wikipedia and set(src+tar) - set('ACGT'):
+                    continue
+                self._assert_identical(needleman_wunsch, src, tar, gap_cost,
+                                       sim_func)
+                self._assert_identical(smith_waterman, src, tar, gap_cost,
+                                       sim_func)
+                self._assert_identical(gotoh, src, tar, gap_cost, 0.1,
+                                       sim_func)
+
+        # long strings take the anti-diagonal path by default
+        src, tar = pairs[-2]
+        self.assertEqual(levenshtein(src, tar, cost=(2, 2, 2, 2)),
+                         2*levenshtein(src, tar))
+        self.assertEqual(len(lcsseq(src, tar)),
+                         (len(src) + len(tar) -
+                          levenshtein(src, tar, cost=(1, 1, 2, 1))) // 2)
+
+        # the alignment scores need only linear memory
+        src = ''.join(rand.choice('ACGT') for _ in _range(5000))
+        self.assertEqual(needleman_wunsch(src, src), 5000)
+        self.assertEqual(smith_waterman(src, src), 5000)
+        self.assertEqual(gotoh(src, src), 5000)
+
+
 class SimDistTestCases(unittest.TestCase):
     """test cases for abydos.distance.sim & .dist
     """
@@ -1972,5 +2363,210 @@ class SimDistTestCases(unittest.TestCase):
         self.assertRaises(AttributeError, dist, 'abc', 'abc', 0)
 
 
+class MetricInfoTestCases(unittest.TestCase):
+    """test cases for abydos.distance.metric_info
+    """
+    def test_metric_info(self):
+        """test abydos.distance.metric_info
+        """
+        self.assertIsNone(metric_info(len))
+        self.assertIsNone(metric_info(sim))
+
+        # every similarity & distance function is registered
+        for name in dir(abydos.distance):
+            if ((name.startswith('sim_') or name.startswith('dist_')) and
+                    name not in ('sim_many', 'dist_many')):
+                self.assertIsInstance(
+                    metric_info(getattr(abydos.distance, name)), MetricInfo)
+
+        info = metric_info(sim_jaccard)
+        self.assertEqual(info.kind, 'sim')
+        self.assertTrue(info.symmetric and info.triangle and info.set_based)
+        self.assertEqual(info.preprocess, 'qgrams')
+        self.assertIs(info.complement, dist_jaccard)
+        self.assertIs(metric_info(dist_jaccard).complement, sim_jaccard)
+        self.assertTrue(info.batch)
+        self.assertFalse(metric_info(sim_monge_elkan).symmetric)
+        self.assertFalse(metric_info(sim_monge_elkan).batch)
+        self.assertEqual(metric_info(sim_monge_elkan).preprocess, 'qgrams')
+        self.assertFalse(metric_info(sim_monge_elkan).set_based)
+        self.assertTrue(metric_info(levenshtein).integer)
+        self.assertFalse(metric_info(levenshtein).normalized)
+        self.assertEqual(metric_info(editex).preprocess, 'normalized')
+
+    def test_metric_info_properties(self):
+        """test abydos.distance.metric_info's properties against the functions
+        """
+        # (Njáll is omitted, since its NFKD normal form, which Editex
+        # compares, is longer than the word itself)
+        words = tuple(word for word in NIALL[:10] if word != 'Njáll') + ('',)
+        for method, info in abydos.distance._METRICS.items():
+            if method in (sim_cosine, dist_cosine, sim_overlap,
+                          dist_overlap):
+                # these fail on empty strings
+                continue
+            values = {(src, tar): method(src, tar) for src in words
+                      for tar in words}
+            if info.symmetric:
+                for src, tar in values:
+                    self.assertEqual(values[src, tar], values[tar, src])
+            if info.integer:
+                for value in values.values():
+                    self.assertEqual(value, int(value))
+            if info.normalized:
+                for value in values.values():
+                    self.assertTrue(0 <= value <= 1)
+            if info.complement is not None:
+                for (src, tar), value in values.items():
+                    self.assertAlmostEqual(value,
+                                           1 - info.complement(src, tar))
+            if info.triangle:
+                dist_of = ((lambda src, tar: 1 - values[src, tar])
+                           if info.kind == 'sim' else
+                           (lambda src, tar: values[src, tar]))
+                for src in words:
+                    for mid in words:
+                        for tar in words:
+                            self.assertLessEqual(
+                                dist_of(src, tar),
+                                dist_of(src, mid) + dist_of(mid, tar) + 1e-9)
+
+    def test_dist_complement(self):
+        """test abydos.distance.dist's use of registered complements
+        """
+        for src in NIALL:
+            for tar in NIALL:
+                self.assertEqual(dist(src, tar), dist_levenshtein(src, tar))
+                self.assertEqual(dist(src, tar, sim_jaro_winkler),
+                                 dist_jaro_winkler(src, tar))
+                self.assertAlmostEqual(dist(src, tar, sim_tanimoto),
+                                       1 - sim_tanimoto(src, tar))
+
+
+class ProfileTestCases(unittest.TestCase):
+    """test cases for abydos.distance.Profile
+    """
+    def test_profile(self):
+        """test abydos.distance.Profile
+        """
+        niall = Profile('Niall')
+        self.assertEqual(niall, 'Niall')
+        self.assertEqual(hash(niall), hash('Niall'))
+        self.assertEqual(niall.tokens(), QGrams('Niall'))
+        self.assertIs(niall.tokens(), niall.tokens(2))
+        self.assertEqual(niall.tokens(3), QGrams('Niall', 3))
+        self.assertEqual(Profile(' Niall Noígíallach ').tokens(0),
+                         {'Niall': 1, 'Noígíallach': 1})
+        self.assertEqual(niall.ordered_qgrams(2),
+                         QGrams('Niall', 2).ordered_list)
+        self.assertEqual(Profile('Njáll').editex_form, 'NJA\u0301LL')
+        self.assertEqual(niall.bitparallel,
+                         {'N': 1, 'i': 2, 'a': 4, 'l': 24})
+
+        # cached forms are not pickled, but recomputed
+        self.assertEqual(pickle.loads(pickle.dumps(niall)).tokens(),
+                         niall.tokens())
+        self.assertIsInstance(pickle.loads(pickle.dumps(niall)), Profile)
+
+    def test_profile_metrics(self):
+        """test abydos.distance functions on Profiles in place of strings
+        """
+        profiles = [Profile(word) for word in NIALL + ('',)]
+        for method in abydos.distance._METRICS:
+            if method in (sim_cosine, dist_cosine, sim_overlap,
+                          dist_overlap):
+                # these fail on empty strings
+                continue
+            for src in profiles[::3]:
+                for tar in profiles:
+                    expected = method(_unicode(src), _unicode(tar))
+                    # twice, so that the second call uses the cached forms
+                    self.assertEqual(method(src, tar), expected)
+                    self.assertEqual(method(src, tar), expected)
+                    self.assertEqual(method(src, _unicode(tar)), expected)
+        for query in profiles:
+            for method in (sim_jaro_winkler, sim_jaccard, sim_editex,
+                           sim_levenshtein):
+                self.assertEqual(list(sim_many(query, profiles, method)),
+                                 [method(_unicode(query), _unicode(cand))
+                                  for cand in profiles])
+
+
+class SimDistManyTestCases(unittest.TestCase):
+    """test cases for abydos.distance.sim_many & .dist_many
+    """
+    _candidates = NIALL + ('',)
+
+    def _assert_many(self, method, *args):
+        """assert that sim_many agrees with method for each query/candidate
+        """
+        for query in self._candidates:
+            scores = sim_many(query, self._candidates, method, *args)
+            self.assertEqual(len(scores), len(self._candidates))
+            for i, cand in enumerate(self._candidates):
+                self.assertAlmostEqual(scores[i], method(query, cand, *args))
+
+    def test_sim_many(self):
+        """test abydos.distance.sim_many
+        """
+        self.assertEqual(len(sim_many('Niall', [])), 0)
+        self.assertEqual(list(sim_many('Niall', ['Niall', 'Nigel'])),
+                         [1, sim_levenshtein('Niall', 'Nigel')])
+        self.assertEqual(list(sim_many('Niall', iter(['Niall', 'Nigel']))),
+                         [1, sim_levenshtein('Niall', 'Nigel')])
+        self.assertRaises(AttributeError, sim_many, 'abc', ['abc'], 0)
+
+        for method in (levenshtein, dist_levenshtein, sim_levenshtein):
+            self._assert_many(method)
+            self._assert_many(method, 'osa')
+            self._assert_many(method, 'dam')
+            self._assert_many(method, 'lev', (1, 2, 3, 4))
+        for method in (sim_tversky, dist_tversky, sim_dice, dist_dice,
+                       sim_jaccard, dist_jaccard, sim_tanimoto, sim_cosine,
+                       dist_cosine):
+            self._assert_many(method)
+            self._assert_many(method, 1)
+            self._assert_many(method, 0)
+        self._assert_many(sim_tversky, 3, 0.25, 0.75)
+        self._assert_many(sim_tversky, 2, 0.5, 1, 1)
+        for method in (editex, dist_editex, sim_editex):
+            self._assert_many(method)
+            self._assert_many(method, (1, 2, 3), True)
+        for method in (sim_jaro_winkler, dist_jaro_winkler):
+            self._assert_many(method)
+            self._assert_many(method, 2)
+            self._assert_many(method, 1, 'jaro')
+            self._assert_many(method, 1, 'winkler', True, 0.5, 0.25)
+        self.assertRaises(ValueError, sim_many, 'abc', ['abcd'],
+                          sim_jaro_winkler, 1, 'winkler', False, 2)
+        for method in (sim_compression, dist_compression):
+            self._assert_many(method)
+            self._assert_many(method, 'zlib')
+            self._assert_many(method, 'rle')
+            self._assert_many(method, 'arith')
+            self._assert_many(method, 'arith', ac_train(' '.join(NIALL)))
+        self._assert_many(sim_tfidf)
+        self._assert_many(sim_tfidf, 0)
+        self._assert_many(sim_tfidf, 2, NIALL)
+        self._assert_many(sim_tfidf, 2, TfidfIndex(NIALL), ['Nil', 'Noel'])
+        self._assert_many(sim_ident)
+
+        self.assertEqual(list(sim_many(QGrams('Niall'), [QGrams('Niall'),
+                                                         QGrams('Neal')],
+                                       sim_dice)),
+                         [1, sim_dice('Niall', 'Neal')])
+
+    def test_dist_many(self):
+        """test abydos.distance.dist_many
+        """
+        self.assertEqual(list(dist_many('Niall', ['Niall', 'Nigel'])),
+                         [0, dist_levenshtein('Niall', 'Nigel')])
+        for query in NIALL:
+            scores = dist_many(query, NIALL, sim_jaccard)
+            for i, cand in enumerate(NIALL):
+                self.assertAlmostEqual(scores[i], dist_jaccard(query, cand))
+        self.assertRaises(AttributeError, dist_many, 'abc', ['abc'], 0)
+
+
 if __name__ == '__main__':
     unittest.main()
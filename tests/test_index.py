@@ -0,0 +1,681 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2014-2015 by Christopher C. Little.
+# This file is part of Abydos.
+#
+# Abydos is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Abydos is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Abydos. If not, see <http://www.gnu.org/licenses/>.
+
+"""abydos.tests.test_index
+
+This module contains unit tests for abydos.index
+"""
+
+from __future__ import unicode_literals
+from __future__ import division
+import unittest
+from abydos.index import BKTree, VPTree, QGramIndex, similarity_join, \
+    MinHash, MinHashLSH, sim_minhash, simhash, SimHashIndex, NearestMatcher
+from abydos.distance import levenshtein, damerau_levenshtein, hamming, \
+    editex, bag, sim_tversky, sim_dice, sim_jaccard, sim_tanimoto, \
+    sim_overlap, sim_cosine, dist_jaccard, dist_lcsseq, dist_jaro_winkler, \
+    sim_jaro_winkler, sim_editex, sim_levenshtein, sim_lcsseq, sim_mra, \
+    sim_monge_elkan
+from abydos.phonetic import double_metaphone, soundex
+from abydos.qgram import QGrams
+import codecs
+import pickle
+import random
+import os
+import tempfile
+import numpy
+
+TESTDIR = os.path.dirname(__file__)
+
+NIALL = ('Niall', 'Neal', 'Neil', 'Njall', 'Njáll', 'Nigel', 'Neel', 'Nele',
+         'Nigelli', 'Nel', 'Kneale', 'Uí Néill', 'O\'Neill', 'MacNeil',
+         'MacNele', 'Niall Noígíallach')
+
+with codecs.open(TESTDIR+'/corpora/wikipediaCommonMisspellings.csv',
+                 encoding='utf-8') as _missp:
+    MISSPELLINGS = [line.strip().split(',') for line in _missp
+                    if line.strip()][1:]
+CORRECT = sorted(set(correct for _, correct in MISSPELLINGS))
+
+
+def _brute_search(words, query, max_dist, metric):
+    """search words for query by brute force, breaking ties by position
+    """
+    return [(dist, word) for dist, _, word in
+            sorted((metric(query, word), i, word) for i, word in
+                   enumerate(words) if metric(query, word) <= max_dist)]
+
+
+class BKTreeTestCases(unittest.TestCase):
+    """test cases for abydos.index.BKTree
+    """
+    def test_bktree_add(self):
+        """test abydos.index.BKTree.add & .update
+        """
+        tree = BKTree()
+        self.assertEqual(len(tree), 0)
+        self.assertTrue(tree.add('Niall'))
+        self.assertFalse(tree.add('Niall'))
+        self.assertTrue(tree.add('Neal'))
+        self.assertEqual(len(tree), 2)
+        tree.update(NIALL)
+        self.assertEqual(len(tree), len(NIALL))
+        self.assertEqual(sorted(tree), sorted(NIALL))
+        self.assertTrue('Nigel' in tree)
+        self.assertFalse('Nigella' in tree)
+
+        # anagrams are 0 distance apart by bag distance, but distinct strings
+        tree = BKTree(['abc', 'bca', 'cab', 'abc'], bag, exact=False)
+        self.assertEqual(len(tree), 3)
+        self.assertTrue('cab' in tree)
+        self.assertFalse('acb' in tree)
+
+        self.assertRaises(ValueError, BKTree, NIALL, 'imaginary')
+        # metrics that do not obey the triangle inequality are refused
+        self.assertRaises(ValueError, BKTree, NIALL, bag)
+        self.assertRaises(ValueError, BKTree, NIALL, editex)
+        self.assertRaises(ValueError, BKTree, NIALL, sim_levenshtein)
+
+    def test_bktree_search(self):
+        """test abydos.index.BKTree.search
+        """
+        self.assertEqual(BKTree().search('Niall', 2), [])
+
+        tree = BKTree(NIALL)
+        self.assertEqual(tree.search('Niall', 0), [(0, 'Niall')])
+        self.assertEqual(tree.search('Nial', 1), [(1, 'Niall'), (1, 'Neal')])
+
+        # random strings over a small alphabet
+        rng = random.Random(5)
+        words = [''.join(rng.choice('abcd') for _ in
+                         range(rng.randint(0, 6))) for _ in range(200)]
+        queries = [''.join(rng.choice('abcde') for _ in
+                           range(rng.randint(0, 7))) for _ in range(30)]
+        for metric in (levenshtein, damerau_levenshtein):
+            tree = BKTree(words, metric)
+            for query in queries:
+                for max_dist in (0, 1, 2, 4):
+                    self.assertEqual(tree.search(query, max_dist),
+                                     _brute_search(list(tree), query,
+                                                   max_dist, metric))
+        fixed = sorted(set(word.ljust(6, 'e') for word in words))
+        tree = BKTree(fixed, hamming)
+        for query in queries:
+            query = query[:6].ljust(6, 'e')
+            for max_dist in (0, 1, 2, 4):
+                self.assertEqual(tree.search(query, max_dist),
+                                 _brute_search(fixed, query, max_dist,
+                                               hamming))
+
+        four_letters = [word for word in NIALL if len(word) == 4]
+        tree = BKTree(four_letters, hamming)
+        self.assertEqual(tree.search('Neel', 1),
+                         [(0, 'Neel'), (1, 'Neal'), (1, 'Neil')])
+
+        tree = BKTree(CORRECT)
+        for error, _ in MISSPELLINGS[::50]:
+            self.assertEqual(tree.search(error, 2),
+                             _brute_search(CORRECT, error, 2, levenshtein))
+
+    def test_bktree_nearest(self):
+        """test abydos.index.BKTree.nearest
+        """
+        self.assertEqual(BKTree().nearest('Niall'), [])
+        tree = BKTree(NIALL)
+        self.assertEqual(tree.nearest('Niall', 0), [])
+        self.assertEqual(tree.nearest('Niall'), [(0, 'Niall')])
+        self.assertEqual(tree.nearest('Nial', 2), [(1, 'Niall'), (1, 'Neal')])
+        self.assertEqual(len(tree.nearest('Nial', 100)), len(NIALL))
+
+        # ties are broken in order of addition
+        for query in NIALL + ('Nail', 'MacNiall', ''):
+            ranked = sorted((levenshtein(query, word), i, word)
+                            for i, word in enumerate(NIALL))
+            for k in (1, 3, 5):
+                self.assertEqual(tree.nearest(query, k),
+                                 [(dist, word) for dist, _, word in
+                                  ranked[:k]])
+
+        tree = BKTree(CORRECT)
+        for error, _ in MISSPELLINGS[::250]:
+            nearest = tree.nearest(error, 3)
+            self.assertEqual([dist for dist, _ in nearest],
+                             sorted(levenshtein(error, word)
+                                    for word in CORRECT)[:3])
+
+    def test_bktree_pickle(self):
+        """test pickling abydos.index.BKTree
+        """
+        tree = BKTree(CORRECT)
+        clone = pickle.loads(pickle.dumps(tree))
+        self.assertEqual(len(clone), len(tree))
+        self.assertEqual(list(clone), list(tree))
+        for error, _ in MISSPELLINGS[::200]:
+            self.assertEqual(clone.search(error, 2), tree.search(error, 2))
+            self.assertEqual(clone.nearest(error, 2), tree.nearest(error, 2))
+
+
+class VPTreeTestCases(unittest.TestCase):
+    """test cases for abydos.index.VPTree
+    """
+    def test_vptree_add(self):
+        """test abydos.index.VPTree.add & .update
+        """
+        self.assertRaises(ValueError, VPTree, NIALL, 'levenshtein')
+        self.assertRaises(ValueError, VPTree, NIALL, sim_jaccard)
+        self.assertRaises(ValueError, VPTree, NIALL, dist_jaro_winkler)
+        self.assertEqual(len(VPTree(NIALL, dist_jaro_winkler, exact=False)),
+                         len(NIALL))
+
+        tree = VPTree()
+        self.assertEqual(len(tree), 0)
+        self.assertTrue(tree.add('Niall'))
+        self.assertFalse(tree.add('Niall'))
+        self.assertTrue(tree.add('Neal'))
+        self.assertEqual(len(tree), 2)
+        tree.update(NIALL)
+        self.assertEqual(len(tree), len(NIALL))
+        self.assertEqual(sorted(tree), sorted(NIALL))
+        self.assertTrue('Nigel' in tree)
+        self.assertFalse('Nigella' in tree)
+
+        tree = VPTree(NIALL + NIALL[::2], dist_lcsseq, pivots=3)
+        self.assertEqual(list(tree), list(NIALL))
+        self.assertFalse(tree.add('Nigel'))
+        self.assertTrue(tree.add('Nigella'))
+        self.assertEqual(len(tree), len(NIALL) + 1)
+
+    def test_vptree_search(self):
+        """test abydos.index.VPTree.search
+        """
+        self.assertEqual(VPTree().search('Niall', 2), [])
+
+        tree = VPTree(NIALL)
+        self.assertEqual(tree.search('Niall', 0), [(0, 'Niall')])
+        self.assertEqual(tree.search('Nial', 1), [(1, 'Niall'), (1, 'Neal')])
+        for metric, radii in ((levenshtein, (0, 1, 2, 4)),
+                              (dist_lcsseq, (0, 0.2, 0.5, 1)),
+                              (dist_jaccard, (0, 0.5, 0.75))):
+            for pivots in (0, 3):
+                tree = VPTree(NIALL, metric, pivots)
+                grown = VPTree(NIALL[:1], metric, pivots)
+                grown.update(NIALL)
+                for query in NIALL + ('Nail', 'MacNiall', ''):
+                    for max_dist in radii:
+                        expected = _brute_search(NIALL, query, max_dist,
+                                                 metric)
+                        self.assertEqual(tree.search(query, max_dist),
+                                         expected)
+                        self.assertEqual(grown.search(query, max_dist),
+                                         expected)
+
+        for pivots in (0, 8):
+            tree = VPTree(CORRECT, dist_lcsseq, pivots)
+            for error, _ in MISSPELLINGS[::100]:
+                self.assertEqual(tree.search(error, 0.25),
+                                 _brute_search(CORRECT, error, 0.25,
+                                               dist_lcsseq))
+                self.assertLess(tree.evaluations, len(CORRECT))
+
+    def test_vptree_nearest(self):
+        """test abydos.index.VPTree.nearest
+        """
+        self.assertEqual(VPTree().nearest('Niall'), [])
+        tree = VPTree(NIALL)
+        self.assertEqual(tree.nearest('Niall', 0), [])
+        self.assertEqual(tree.nearest('Niall'), [(0, 'Niall')])
+        self.assertEqual(tree.nearest('Nial', 2), [(1, 'Niall'), (1, 'Neal')])
+        self.assertEqual(len(tree.nearest('Nial', 100)), len(NIALL))
+
+        # ties are broken in order of addition
+        for metric in (levenshtein, dist_lcsseq, dist_jaccard):
+            tree = VPTree(NIALL, metric, 2)
+            for query in NIALL + ('Nail', 'MacNiall', ''):
+                ranked = sorted((metric(query, word), i, word)
+                                for i, word in enumerate(NIALL))
+                for k in (1, 3, 5):
+                    self.assertEqual(tree.nearest(query, k),
+                                     [(dist, word) for dist, _, word in
+                                      ranked[:k]])
+
+        tree = VPTree(CORRECT, levenshtein, 8)
+        for error, _ in MISSPELLINGS[::250]:
+            nearest = tree.nearest(error, 3)
+            self.assertEqual([dist for dist, _ in nearest],
+                             sorted(levenshtein(error, word)
+                                    for word in CORRECT)[:3])
+            self.assertLess(tree.evaluations, len(CORRECT))
+
+    def test_vptree_save(self):
+        """test pickling, saving, & loading abydos.index.VPTree
+        """
+        tree = VPTree(CORRECT[::4], dist_lcsseq, 4)
+        clone = pickle.loads(pickle.dumps(tree))
+        self.assertEqual(list(clone), list(tree))
+
+        temp_fd, temp_file = tempfile.mkstemp(suffix='.pkl')
+        os.close(temp_fd)
+        try:
+            tree.save(temp_file)
+            loaded = VPTree.load(temp_file)
+            self.assertEqual(list(loaded), list(tree))
+            for error, _ in MISSPELLINGS[::200]:
+                for copy in (clone, loaded):
+                    self.assertEqual(copy.search(error, 0.3),
+                                     tree.search(error, 0.3))
+                    self.assertEqual(copy.nearest(error, 2),
+                                     tree.nearest(error, 2))
+
+            with open(temp_file, 'wb') as other:
+                pickle.dump(BKTree(NIALL), other)
+            self.assertRaises(ValueError, VPTree.load, temp_file)
+        finally:
+            os.remove(temp_file)
+
+
+class QGramIndexTestCases(unittest.TestCase):
+    """test cases for abydos.index.QGramIndex
+    """
+    def _brute_search(self, words, query, threshold, index, metric, *args):
+        """search words for query by brute force, as index.search would
+        """
+        q_query = index.qgrams(query)
+        scores = [(metric(q_query, index.qgrams(word), index.qval, *args),
+                   i, word) for i, word in enumerate(words)]
+        return [(score, word) for score, _, word in
+                sorted(scores, key=lambda score: (-score[0], score[1]))
+                if score >= threshold]
+
+    def test_qgramindex_add(self):
+        """test abydos.index.QGramIndex.add & .update
+        """
+        index = QGramIndex()
+        self.assertEqual(len(index), 0)
+        self.assertEqual(index.add('Niall'), 0)
+        self.assertEqual(index.add('Niall'), 1)
+        index.update(NIALL)
+        self.assertEqual(len(index), len(NIALL)+2)
+        self.assertEqual(list(index), ['Niall', 'Niall'] + list(NIALL))
+        self.assertEqual(index[3], 'Neal')
+        self.assertEqual(index.qgrams('Niall'), QGrams('Niall'))
+        self.assertEqual(QGramIndex(qval=3, start_stop='').qgrams('Niall'),
+                         QGrams('Niall', 3, ''))
+        self.assertEqual(QGramIndex(qval=0).qgrams('Niall Noígíallach'),
+                         {'Niall': 1, 'Noígíallach': 1})
+
+        index = QGramIndex(NIALL)
+        self.assertRaises(ValueError, index.search, 'Niall', 0.5, levenshtein)
+        self.assertRaises(ValueError, index.search, 'Niall', 0.5, sim_tversky,
+                          1, 1, 0.5)
+        self.assertRaises(ValueError, index.search, 'Niall', 0)
+
+    def test_qgramindex_search(self):
+        """test abydos.index.QGramIndex.search & .candidates
+        """
+        self.assertEqual(QGramIndex().search('Niall', 0.5), [])
+
+        index = QGramIndex(NIALL)
+        self.assertEqual(index.search('Niall', 1.0), [(1.0, 'Niall')])
+        self.assertEqual(index.search('Nial', 0.6),
+                         [(sim_jaccard('Nial', 'Niall'), 'Niall')])
+        self.assertEqual(index.search('Niall', 0.4, sim_dice),
+                         [(sim_dice('Niall', word), word) for word in
+                          ('Niall', 'Njall', 'Neal', 'Njáll', 'Nigel',
+                           'Nigelli', 'Niall Noígíallach', 'Nel')])
+
+        words = NIALL + ('', 'N', 'Nn', 'Niall')
+        for qval, start_stop in ((2, '$#'), (1, ''), (3, '$#'), (3, ''),
+                                 (0, '')):
+            index = QGramIndex(words, qval, start_stop)
+            for metric, args in ((sim_jaccard, ()), (sim_tanimoto, ()),
+                                 (sim_dice, ()), (sim_cosine, ()),
+                                 (sim_overlap, ()), (sim_tversky, (1, 1)),
+                                 (sim_tversky, (0.25, 2)),
+                                 (sim_tversky, (2, 0))):
+                for query in words + ('Nail', 'MacNiall', 'Neill N'):
+                    for threshold in (0.1, 0.3, 0.5, 0.8, 1.0):
+                        self.assertEqual(
+                            index.search(query, threshold, metric, *args),
+                            self._brute_search(words, query, threshold,
+                                               index, metric, *args))
+
+        index = QGramIndex(CORRECT)
+        for error, _ in MISSPELLINGS[::50]:
+            for metric in (sim_jaccard, sim_cosine):
+                candidates = index.candidates(error, 0.7, metric)
+                self.assertTrue(len(candidates) < len(CORRECT) // 10)
+                self.assertEqual(index.search(error, 0.7, metric),
+                                 self._brute_search(CORRECT, error, 0.7, index,
+                                                    metric))
+
+    def test_qgramindex_pickle(self):
+        """test pickling abydos.index.QGramIndex
+        """
+        index = QGramIndex(CORRECT)
+        clone = pickle.loads(pickle.dumps(index))
+        self.assertEqual(list(clone), list(index))
+        for error, _ in MISSPELLINGS[::200]:
+            self.assertEqual(clone.search(error, 0.5),
+                             index.search(error, 0.5))
+
+
+class SimilarityJoinTestCases(unittest.TestCase):
+    """test cases for abydos.index.similarity_join
+    """
+    def _brute_join(self, words, metric, threshold, *args):
+        """join words with themselves by brute force
+        """
+        return sorted((i, j, metric(words[i], words[j], *args))
+                      for i in range(len(words))
+                      for j in range(i+1, len(words))
+                      if metric(words[i], words[j], *args) >= threshold)
+
+    def test_similarity_join(self):
+        """test abydos.index.similarity_join
+        """
+        self.assertEqual(list(similarity_join([])), [])
+        self.assertEqual(list(similarity_join(NIALL, sim_jaccard, 1.0)), [])
+        self.assertEqual(sorted(similarity_join(NIALL, sim_dice, 0.7)),
+                         [(5, 8, sim_dice('Nigel', 'Nigelli')),
+                          (6, 9, sim_dice('Neel', 'Nel'))])
+
+        words = NIALL + ('', 'Niall', '', 'Neil Neal', 'Neal  Neil')
+        for metric, args in ((sim_jaccard, ()), (sim_tanimoto, (3,)),
+                             (sim_dice, (1,)), (sim_cosine, ()),
+                             (sim_overlap, (2,)), (sim_tversky, (2, 1, 1)),
+                             (sim_tversky, (2, 0.3, 0.3)),
+                             (sim_tversky, (0, 2, 2)), (sim_jaccard, (0,))):
+            for threshold in (0.1, 0.3, 0.5, 0.8, 1.0):
+                self.assertEqual(sorted(similarity_join(words, metric,
+                                                        threshold, *args)),
+                                 self._brute_join(words, metric, threshold,
+                                                  *args))
+
+        errors = [error for error, _ in MISSPELLINGS[::10]]
+        for metric in (sim_jaccard, sim_cosine):
+            self.assertEqual(sorted(similarity_join(errors, metric, 0.7)),
+                             self._brute_join(errors, metric, 0.7))
+
+        self.assertRaises(ValueError, list,
+                          similarity_join(NIALL, levenshtein, 0.5))
+        self.assertRaises(ValueError, list,
+                          similarity_join(NIALL, sim_jaccard, 0))
+        self.assertRaises(ValueError, list,
+                          similarity_join(NIALL, sim_jaccard, 0.5, 2, 1))
+        self.assertRaises(ValueError, list,
+                          similarity_join(NIALL, sim_tversky, 0.5, 2, 1, 2))
+        self.assertRaises(ValueError, list,
+                          similarity_join(NIALL, sim_tversky, 0.5, 2, 1, 1,
+                                          0.5))
+
+
+class MinHashTestCases(unittest.TestCase):
+    """test cases for abydos.index.MinHash, .sim_minhash, & .MinHashLSH
+    """
+    def test_minhash(self):
+        """test abydos.index.MinHash & .sim_minhash
+        """
+        minhash = MinHash(256)
+        sig = minhash.signature('Niall')
+        self.assertEqual(sig.shape, (256,))
+        self.assertEqual(sig.dtype, numpy.uint32)
+        self.assertTrue((sig == MinHash(256).signature('Niall')).all())
+        self.assertTrue((sig == minhash.signature(QGrams('Niall'))).all())
+        self.assertFalse((sig == MinHash(256, seed=1)
+                          .signature('Niall')).all())
+        self.assertEqual(sim_minhash(sig, sig), 1.0)
+        self.assertEqual(sim_minhash(minhash.signature(''),
+                                     minhash.signature('')), 1.0)
+        self.assertEqual(sim_minhash(minhash.signature(''), sig), 0.0)
+        self.assertRaises(ValueError, sim_minhash, sig, sig[:10])
+        self.assertRaises(ValueError, MinHash, 0)
+
+        sigs = minhash.signatures(NIALL)
+        self.assertEqual(sigs.shape, (len(NIALL), 256))
+        estimates = sim_minhash(sigs, sig)
+        for i, word in enumerate(NIALL):
+            self.assertTrue((sigs[i] == minhash.signature(word)).all())
+            self.assertAlmostEqual(estimates[i], sim_jaccard('Niall', word),
+                                   delta=0.15)
+        self.assertTrue((sim_minhash(sigs, sigs) == 1.0).all())
+
+        # repeated q-grams are distinct, as in sim_jaccard's multisets
+        self.assertAlmostEqual(sim_minhash(minhash.signature('aaaa'),
+                                           minhash.signature('aaa')),
+                               sim_jaccard('aaaa', 'aaa'), delta=0.15)
+
+        minhash = MinHash(64, 0)
+        self.assertAlmostEqual(
+            sim_minhash(minhash.signature('Niall Neil Neal Nigel'),
+                        minhash.signature('Niall Neil Neel Nigel')),
+            sim_jaccard('Niall Neil Neal Nigel', 'Niall Neil Neel Nigel', 0),
+            delta=0.2)
+
+    def test_minhashlsh(self):
+        """test abydos.index.MinHashLSH
+        """
+        self.assertEqual(MinHashLSH().search('Niall'), [])
+        lsh = MinHashLSH(NIALL, bands=32)
+        self.assertEqual(len(lsh), len(NIALL))
+        self.assertEqual(list(lsh), list(NIALL))
+        self.assertEqual(lsh[1], 'Neal')
+        self.assertEqual((lsh.bands, lsh.rows), (32, 4))
+        self.assertTrue((lsh.signature(1) ==
+                         lsh.minhash.signature('Neal')).all())
+        self.assertEqual(lsh.search('Niall')[0], (1.0, 'Niall'))
+        self.assertEqual(lsh.candidates('Niall')[0], 0)
+        self.assertRaises(ValueError, MinHashLSH, bands=129)
+
+        lsh = MinHashLSH(CORRECT, threshold=0.6)
+        self.assertTrue(lsh.bands * lsh.rows <= 128)
+        for error, correct in MISSPELLINGS[::50]:
+            candidates = lsh.candidates(error)
+            self.assertTrue(len(candidates) < len(CORRECT) // 10)
+            if sim_jaccard(error, correct) >= 0.8:
+                self.assertTrue(CORRECT.index(correct) in candidates)
+            for estimate, _ in lsh.search(error, 0.5):
+                self.assertTrue(estimate >= 0.5)
+
+        clone = pickle.loads(pickle.dumps(lsh))
+        for error, _ in MISSPELLINGS[::200]:
+            self.assertEqual(clone.search(error), lsh.search(error))
+
+
+class SimHashTestCases(unittest.TestCase):
+    """test cases for abydos.index.simhash & .SimHashIndex
+    """
+    def test_simhash(self):
+        """test abydos.index.simhash
+        """
+        self.assertEqual(simhash(''), 0)
+        self.assertEqual(simhash('Niall', 100), 0)
+        for word in NIALL:
+            self.assertTrue(0 <= simhash(word) < 2**64)
+            self.assertEqual(simhash(word), simhash(QGrams(word)))
+        self.assertNotEqual(simhash('Niall'), simhash('Niall', 3))
+        self.assertEqual(simhash('Niall Neil', 0), simhash('Neil  Niall', 0))
+
+        # near-duplicates have nearer fingerprints than unrelated strings
+        self.assertTrue(bin(simhash('accommodate') ^
+                            simhash('acommodate')).count('1') <
+                        bin(simhash('accommodate') ^
+                            simhash('Niall')).count('1'))
+
+    def test_simhashindex(self):
+        """test abydos.index.SimHashIndex
+        """
+        self.assertEqual(SimHashIndex().search('Niall'), [])
+        index = SimHashIndex(NIALL, radius=10, blocks=16)
+        self.assertEqual(len(index), len(NIALL))
+        self.assertEqual(list(index), list(NIALL))
+        self.assertEqual(index[1], 'Neal')
+        self.assertEqual(index.fingerprint(1), simhash('Neal'))
+        self.assertEqual(index.candidates('Niall', 0), [(0, 0)])
+        self.assertEqual(index.search('Niall')[0], (1.0, 'Niall'))
+        self.assertRaises(ValueError, index.candidates, 'Niall', 11)
+        self.assertRaises(ValueError, SimHashIndex, radius=64)
+        self.assertRaises(ValueError, SimHashIndex, radius=4, blocks=4)
+
+        fingerprints = [simhash(word) for word in CORRECT]
+        for radius, blocks in ((0, None), (3, None), (8, 12), (10, 64)):
+            index = SimHashIndex(CORRECT, radius=radius, blocks=blocks)
+            for error, _ in MISSPELLINGS[::100]:
+                query = simhash(error)
+                distances = [bin(query ^ fingerprint).count('1')
+                             for fingerprint in fingerprints]
+                self.assertEqual(index.candidates(error),
+                                 [(distance, i) for distance, i in
+                                  sorted(zip(distances, range(len(CORRECT))))
+                                  if distance <= radius])
+                matches = index.search(error, 0.5)
+                self.assertEqual(matches, sorted(
+                    matches, key=lambda match: -match[0]))
+                for score, word in matches:
+                    self.assertEqual(score, sim_cosine(error, word))
+                    self.assertTrue(score >= 0.5)
+
+        index = SimHashIndex(CORRECT, 0, radius=2)
+        self.assertEqual(index.search('accommodate', 1.0),
+                         [(1.0, 'accommodate')])
+        clone = pickle.loads(pickle.dumps(index))
+        for error, _ in MISSPELLINGS[::200]:
+            self.assertEqual(clone.search(error), index.search(error))
+
+
+def _brute_nearest(words, query, k, metric, *args):
+    """rank words by similarity to query by brute force, breaking ties by
+    position
+    """
+    return [(sim, words[-i]) for sim, i in
+            sorted(((metric(query, word, *args), -i) for i, word in
+                    enumerate(words)), reverse=True)[:k]]
+
+
+class NearestMatcherTestCases(unittest.TestCase):
+    """test cases for abydos.index.NearestMatcher
+    """
+    def test_nearestmatcher_add(self):
+        """test abydos.index.NearestMatcher.add & .update
+        """
+        self.assertRaises(ValueError, NearestMatcher, NIALL, 'jaro')
+        self.assertRaises(ValueError, NearestMatcher, NIALL, levenshtein)
+
+        matcher = NearestMatcher()
+        self.assertEqual(len(matcher), 0)
+        self.assertEqual(matcher.nearest('Niall'), [])
+        self.assertEqual(matcher.add('Niall'), 0)
+        matcher.update(NIALL[1:])
+        self.assertEqual(len(matcher), len(NIALL))
+        self.assertEqual(list(matcher), list(NIALL))
+        self.assertEqual(matcher[1], 'Neal')
+
+        # q-gram blocking is the default for q-gram-based measures
+        self.assertEqual(NearestMatcher(NIALL, sim_dice).qval, 2)
+        self.assertEqual(NearestMatcher(NIALL, sim_dice, args=(3,)).qval, 3)
+        self.assertIsNone(NearestMatcher(NIALL, sim_editex).qval)
+        # Monge-Elkan scores strings sharing no q-gram, so is not blocked
+        self.assertIsNone(NearestMatcher(NIALL, sim_monge_elkan).qval)
+        self.assertIsNone(NearestMatcher(NIALL, sim_monge_elkan,
+                                         args=(sim_jaro_winkler,)).qval)
+
+    def test_nearestmatcher_nearest(self):
+        """test abydos.index.NearestMatcher.nearest
+        """
+        matcher = NearestMatcher(NIALL)
+        self.assertEqual(matcher.nearest('Niall', 0), [])
+        self.assertEqual(matcher.nearest('Niall'), [(1.0, 'Niall')])
+        self.assertEqual(len(matcher.nearest('Nial', 100)), len(NIALL))
+
+        # without blocking, the results are exact
+        words = CORRECT[::4]
+        for metric in (sim_jaro_winkler, sim_editex, sim_levenshtein,
+                       sim_lcsseq, sim_mra):
+            matcher = NearestMatcher(words, metric)
+            evaluations = 0
+            for error, _ in MISSPELLINGS[::200]:
+                for k in (1, 5):
+                    self.assertEqual(matcher.nearest(error, k),
+                                     _brute_nearest(words, error, k, metric))
+                    evaluations += matcher.evaluations
+            if metric is not sim_mra:
+                # the length bounds prune some candidates
+                self.assertLess(evaluations,
+                                len(words) * len(MISSPELLINGS[::200]) * 2)
+        matcher = NearestMatcher(words, sim_jaro_winkler, args=(2,))
+        self.assertEqual(matcher.nearest('abandonned', 3),
+                         _brute_nearest(words, 'abandonned', 3,
+                                        sim_jaro_winkler, 2))
+
+        # Editex deletes repeated letters for free
+        matcher = NearestMatcher(['A', 'BAAA', 'CAAA'], sim_editex)
+        self.assertEqual(matcher.nearest('AAAA'), [(1.0, 'A')])
+        words = ['Loyd', 'Aron', 'Lloyde', 'Aaronn', 'Floyd', 'Baron',
+                 'Lyod', 'Arron']
+        matcher = NearestMatcher(words, sim_editex)
+        for query in ('Lloyd', 'Aaron', 'LLLOOYYDD', 'AAARRRONNN', 'Ln'):
+            for k in (1, 3):
+                self.assertEqual(matcher.nearest(query, k),
+                                 _brute_nearest(words, query, k, sim_editex))
+        # & leading spaces, being preceded by a space
+        self.assertEqual(NearestMatcher(['E', 'ee', ' UUU'],
+                                        sim_editex).nearest(' e', 2),
+                         [(1.0, 'E'), (1.0, 'ee')])
+        rng = random.Random(7)
+        words = [''.join(rng.choice('ab -') for _ in
+                         range(rng.randint(0, 7))) for _ in range(200)]
+        matcher = NearestMatcher(words, sim_editex)
+        for _ in range(50):
+            query = ''.join(rng.choice('ab -') for _ in
+                            range(rng.randint(0, 7)))
+            self.assertEqual(matcher.nearest(query, 3),
+                             _brute_nearest(words, query, 3, sim_editex))
+
+        # q-gram blocking finds every string with a positive similarity
+        for metric in (sim_jaccard, sim_dice, sim_tversky):
+            matcher = NearestMatcher(words, metric)
+            for error, _ in MISSPELLINGS[::200]:
+                self.assertEqual(matcher.nearest(error, 5),
+                                 [(sim, word) for sim, word in
+                                  _brute_nearest(words, error, 5, metric)
+                                  if sim > 0])
+        self.assertEqual(NearestMatcher(['', 'a'], sim_jaccard).nearest(''),
+                         [(1.0, '')])
+
+        # results are limited to the blocks of the query
+        matcher = NearestMatcher(NIALL, keys=[double_metaphone],
+                                 max_length_diff=1)
+        blocked = [word for word in NIALL if abs(len(word) - 4) <= 1 and
+                   (set(double_metaphone(word)) &
+                    set(double_metaphone('Nial'))) - set([''])]
+        self.assertEqual(matcher.nearest('Nial', 100),
+                         _brute_nearest(blocked, 'Nial', 100,
+                                        sim_jaro_winkler))
+        self.assertEqual(matcher.nearest('Xavier'), [])
+        matcher = NearestMatcher(NIALL, keys=[soundex], qval=3)
+        self.assertEqual([word for _, word in matcher.nearest('Nil', 3)],
+                         [word for _, word in
+                          _brute_nearest(NIALL, 'Nil', 3, sim_jaro_winkler)])
+
+        clone = pickle.loads(pickle.dumps(matcher))
+        self.assertEqual(list(clone.nearest_many(['Nil', 'Nigella'], 2)),
+                         [matcher.nearest('Nil', 2),
+                          matcher.nearest('Nigella', 2)])
+
+
+if __name__ == '__main__':
+    unittest.main()
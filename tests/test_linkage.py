@@ -0,0 +1,393 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2014-2015 by Christopher C. Little.
+# This file is part of Abydos.
+#
+# Abydos is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Abydos is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Abydos. If not, see <http://www.gnu.org/licenses/>.
+
+"""abydos.tests.test_linkage
+
+This module contains unit tests for abydos.linkage
+"""
+
+from __future__ import unicode_literals
+import unittest
+from abydos.linkage import BlockingEngine, ComparisonPlan, FellegiSunter
+from abydos.stats import ConfusionTable
+from abydos.clustering import fingerprint, skeleton_key, omission_key, \
+    phonetic_fingerprint
+from abydos.phonetic import soundex, double_metaphone
+from abydos.distance import sim_jaro_winkler, sim_editex, sim_dice, \
+    dist_jaro_winkler, needleman_wunsch
+from collections import Counter
+import codecs
+import numpy
+import os
+import shutil
+import tempfile
+
+TESTDIR = os.path.dirname(__file__)
+
+NIALL = ('Niall', 'Neal', 'Neil', 'Njall', 'Njáll', 'Nigel', 'Neel', 'Nele',
+         'Nigelli', 'Nel', 'Kneale', 'Uí Néill', 'O\'Neill', 'MacNeil',
+         'MacNele', 'Niall Noígíallach')
+
+with codecs.open(TESTDIR+'/corpora/nachnamen.csv', encoding='utf-8') as _nn:
+    NACHNAMEN = [line.split(',')[0] for line in _nn if line.strip()][1:601]
+
+
+def _brute_pairs(engine, left, right=None):
+    """find the pairs of records sharing a key in blocks that are not too
+    large by brute force
+    """
+    left_keys = [set(engine.block_keys(record)) for record in left]
+    right_keys = ([set(engine.block_keys(record)) for record in right]
+                  if right is not None else [])
+    sizes = Counter(key for keys in left_keys + right_keys for key in keys)
+
+    def _shares(src_keys, tar_keys):
+        """return True if the records share a key of a small enough block
+        """
+        return any(engine.max_block_size is None or
+                   sizes[key] <= engine.max_block_size for key in
+                   src_keys & tar_keys)
+
+    if right is None:
+        return set((i, j) for i in range(len(left))
+                   for j in range(i+1, len(left))
+                   if _shares(left_keys[i], left_keys[j]))
+    return set((i, j) for i in range(len(left)) for j in range(len(right))
+               if _shares(left_keys[i], right_keys[j]))
+
+
+class BlockingEngineTestCases(unittest.TestCase):
+    """test cases for abydos.linkage.BlockingEngine
+    """
+    def test_block_keys(self):
+        """test abydos.linkage.BlockingEngine.block_keys
+        """
+        self.assertRaises(ValueError, BlockingEngine, ['soundex'])
+        self.assertRaises(ValueError, BlockingEngine, window=1)
+        self.assertRaises(ValueError, BlockingEngine, partitions=0)
+
+        engine = BlockingEngine()
+        self.assertEqual(engine.block_keys('Niall Noígíallach'),
+                         [(0, 'niall noigiallach')])
+        self.assertEqual(engine.block_keys(''), [])
+
+        # multiple keys, & empty keys ignored
+        engine = BlockingEngine([soundex, double_metaphone])
+        self.assertEqual(engine.block_keys('Niall'),
+                         [(0, 'N400'), (1, 'NL')])
+        self.assertEqual(engine.block_keys('Schmidt'),
+                         [(0, 'S530'), (1, 'SMT'), (1, 'XMT')])
+
+        # keys of fields
+        engine = BlockingEngine([(1, soundex), ('city', skeleton_key)])
+        self.assertEqual(engine.block_keys({1: 'Niall', 'city': 'Boston'}),
+                         [(0, 'N400'), (1, 'BSTNO')])
+
+    def test_pairs(self):
+        """test abydos.linkage.BlockingEngine.pairs
+        """
+        self.assertEqual(list(BlockingEngine().pairs([])), [])
+        self.assertEqual(list(BlockingEngine().pairs(NIALL, [])), [])
+
+        engine = BlockingEngine([soundex])
+        self.assertEqual(sorted(engine.pairs(['Niall', 'Neil', 'Smith'],
+                                             ['Nil', 'Schmidt', 'Smyth'])),
+                         [(0, 0), (1, 0), (2, 1), (2, 2)])
+        self.assertEqual(sorted(engine.pairs(['Niall', 'Neil', 'Smith',
+                                              'Nil'])),
+                         [(0, 1), (0, 3), (1, 3)])
+
+        left = NACHNAMEN[:400]
+        right = [name[:-1] if i % 2 else name for i, name in
+                 enumerate(NACHNAMEN[200:])]
+        temp_dir = tempfile.mkdtemp()
+        try:
+            for keys in ([soundex, double_metaphone],
+                         [skeleton_key, omission_key, phonetic_fingerprint]):
+                for max_block_size in (None, 5):
+                    # in memory, & spilled to disk
+                    for max_entries in (1000000, 50):
+                        engine = BlockingEngine(keys, max_block_size,
+                                                partitions=7,
+                                                max_entries=max_entries,
+                                                temp_dir=temp_dir)
+                        for other in (right, None):
+                            pairs = list(engine.pairs(
+                                iter(left),
+                                None if other is None else iter(other)))
+                            self.assertEqual(len(pairs), len(set(pairs)))
+                            self.assertEqual(set(pairs),
+                                             _brute_pairs(engine, left,
+                                                          other))
+                        self.assertEqual(os.listdir(temp_dir), [])
+                    if max_block_size:
+                        self.assertGreater(engine.skipped_blocks, 0)
+                    else:
+                        self.assertEqual(engine.skipped_blocks, 0)
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_neighbourhood_pairs(self):
+        """test abydos.linkage.BlockingEngine.pairs with a window
+        """
+        engine = BlockingEngine([fingerprint], window=2)
+        self.assertEqual(sorted(engine.pairs(['b', 'd', 'f'],
+                                             ['a', 'c', 'e', 'g'])),
+                         [(0, 0), (0, 1), (1, 1), (1, 2), (2, 2), (2, 3)])
+        self.assertEqual(sorted(engine.pairs(['b', 'd', 'a', 'c'])),
+                         [(0, 2), (0, 3), (1, 3)])
+        engine = BlockingEngine([fingerprint], window=3)
+        self.assertEqual(sorted(engine.pairs(['b', 'd', 'a', 'c'])),
+                         [(0, 1), (0, 2), (0, 3), (1, 3), (2, 3)])
+
+        # pairs within the window by several keys are emitted once
+        engine = BlockingEngine([soundex, double_metaphone], window=4)
+        pairs = list(engine.pairs(NIALL))
+        self.assertEqual(len(pairs), len(set(pairs)))
+        self.assertTrue(all(i < j for i, j in pairs))
+        pairs = list(engine.pairs(NACHNAMEN[:300], NACHNAMEN[300:]))
+        self.assertEqual(len(pairs), len(set(pairs)))
+        self.assertTrue(all(i < 300 and j < 300 for i, j in pairs))
+
+
+class ComparisonPlanTestCases(unittest.TestCase):
+    """test cases for abydos.linkage.ComparisonPlan
+    """
+    _fields = [('surname', sim_jaro_winkler), ('given', sim_editex),
+               ('city', sim_dice)]
+    _left = [{'surname': 'Niall', 'given': 'Anna', 'city': 'Boston'},
+             {'surname': 'Smith', 'given': 'John', 'city': None},
+             {'surname': 'Neil', 'given': 'Ann', 'city': 'Bostn'}]
+    _right = [{'surname': 'Neal', 'given': 'Anne', 'city': 'Boston'},
+              {'surname': 'Smyth', 'given': 'Jon', 'city': 'Austin'},
+              {'surname': 'Nil', 'given': None, 'city': 'Boston'}]
+
+    def _expected(self, left, right, pairs, fields):
+        """compare each field of each pair directly
+        """
+        return numpy.array([[float('nan') if left[i][field] is None or
+                             right[j][field] is None else
+                             metric(left[i][field], right[j][field], *args)
+                             for field, metric, args in
+                             [spec + ((),) if len(spec) == 2 else spec
+                              for spec in fields]] for i, j in pairs])
+
+    def _assert_matrix(self, matrix, expected):
+        """assert that two comparison matrices are equal, including NaNs
+        """
+        self.assertEqual(matrix.shape, expected.shape)
+        self.assertTrue(numpy.array_equal(numpy.isnan(matrix),
+                                          numpy.isnan(expected)))
+        self.assertTrue(numpy.allclose(numpy.nan_to_num(matrix),
+                                       numpy.nan_to_num(expected)))
+
+    def test_comparison_plan(self):
+        """test abydos.linkage.ComparisonPlan
+        """
+        self.assertRaises(ValueError, ComparisonPlan, [('surname', 'jaro')])
+        self.assertRaises(ValueError, ComparisonPlan,
+                          [('surname', dist_jaro_winkler)])
+        self.assertRaises(ValueError, ComparisonPlan,
+                          [('surname', needleman_wunsch)])
+        self.assertRaises(ValueError, ComparisonPlan, self._fields, [1, 2])
+        self.assertRaises(ValueError, ComparisonPlan, self._fields,
+                          [1, -1, 1])
+
+        plan = ComparisonPlan(self._fields)
+        self.assertEqual(plan.compare(self._left, self._right, []).shape,
+                         (0, 3))
+        pairs = [(i, j) for i in range(3) for j in range(3)]
+        expected = self._expected(self._left, self._right, pairs,
+                                  self._fields)
+        matrix = plan.compare(self._left, self._right, iter(pairs))
+        self._assert_matrix(matrix, expected)
+        self.assertTrue(plan.matchable.all())
+        # the second time, with the cached Profiles
+        self._assert_matrix(plan.compare(self._left, self._right, pairs),
+                            expected)
+        self.assertTrue(numpy.allclose(plan.score(matrix),
+                                       numpy.nansum(expected, axis=1)))
+
+        # deduplication, sequences of fields, & arguments
+        fields = [(0, sim_jaro_winkler, (2,)), (1, sim_dice, (3,))]
+        records = [('Niall', 'Boston'), ('Neil', 'Bostn'), ('Nigel', None)]
+        dedup_pairs = [(0, 1), (0, 2), (1, 2)]
+        plan = ComparisonPlan(fields, weights=[2, 1])
+        matrix = plan.compare(records, None, dedup_pairs)
+        self._assert_matrix(matrix, self._expected(records, records,
+                                                   dedup_pairs, fields))
+        self.assertTrue(numpy.allclose(plan.score(matrix),
+                                       numpy.dot(numpy.nan_to_num(matrix),
+                                                 [2, 1])))
+        plan = ComparisonPlan({'surname': sim_jaro_winkler,
+                               'city': sim_dice})
+        self.assertEqual([field for field, _, _ in plan.fields],
+                         ['city', 'surname'])
+
+    def test_comparison_plan_short_circuit(self):
+        """test abydos.linkage.ComparisonPlan's short-circuiting
+        """
+        pairs = [(i, j) for i in range(3) for j in range(3)]
+        expected = self._expected(self._left, self._right, pairs,
+                                  self._fields)
+
+        plan = ComparisonPlan(self._fields, min_sims=[0.8, None, None])
+        matrix = plan.compare(self._left, self._right, pairs)
+        matchable = expected[:, 0] >= 0.8
+        self.assertTrue(numpy.array_equal(plan.matchable, matchable))
+        self._assert_matrix(matrix[matchable], expected[matchable])
+        self.assertTrue((matrix[~matchable, 1:] == 0).all())
+        self.assertFalse(numpy.isnan(matrix[:, 0]).any())
+        plan = ComparisonPlan(self._fields, min_sims=[0.8, None, None],
+                              pruned=float('nan'))
+        matrix = plan.compare(self._left, self._right, pairs)
+        self.assertTrue(numpy.isnan(matrix[~matchable, 1:]).all())
+
+        plan = ComparisonPlan(self._fields, weights=[3, 2, 1], threshold=4.5)
+        matrix = plan.compare(self._left, self._right, pairs)
+        matchable = (numpy.dot(numpy.nan_to_num(expected), [3, 2, 1]) >= 4.5)
+        self.assertTrue(numpy.array_equal(plan.matchable, matchable))
+        self._assert_matrix(matrix[matchable], expected[matchable])
+        # a pair is compared on a field only if it could still be matchable
+        for row in range(len(pairs)):
+            for col in range(1, 3):
+                bound = (numpy.dot(numpy.nan_to_num(expected[row, :col]),
+                                   [3, 2, 1][:col]) + sum([3, 2, 1][col:]))
+                if bound < 4.5:
+                    self.assertEqual(matrix[row, col], 0)
+
+        # pairs from the blocking engine
+        engine = BlockingEngine([('surname', soundex)])
+        pairs = list(engine.pairs(self._left, self._right))
+        plan = ComparisonPlan(self._fields, cache_size=2)
+        self._assert_matrix(plan.compare(self._left, self._right, pairs),
+                            self._expected(self._left, self._right, pairs,
+                                           self._fields))
+        self.assertLessEqual(max(len(cache) for cache in plan._caches), 2)
+
+
+class FellegiSunterTestCases(unittest.TestCase):
+    """test cases for abydos.linkage.FellegiSunter
+    """
+    def _sample(self, num_pairs=20000, seed=0):
+        """generate a comparison matrix of labelled pairs, of which 5% are
+        matches, with similarities higher among matches & 5% missing
+        """
+        rng = numpy.random.RandomState(seed)
+        labels = rng.rand(num_pairs) < 0.05
+        matrix = numpy.empty((num_pairs, 3))
+        matrix[labels] = rng.beta(8, 1.5, (labels.sum(), 3))
+        matrix[~labels] = rng.beta(2, 4, ((~labels).sum(), 3))
+        matrix[rng.rand(num_pairs, 3) < 0.05] = float('nan')
+        return matrix, labels
+
+    def test_levels(self):
+        """test abydos.linkage.FellegiSunter.levels
+        """
+        model = FellegiSunter()
+        self.assertTrue(numpy.array_equal(
+            model.levels([[0.0, 0.5, float('nan')], [0.74, 0.9, 1.0]]),
+            [[0, 1, -1], [1, 3, 3]]))
+        model = FellegiSunter([[0.5], [0.25, 0.75]])
+        self.assertTrue(numpy.array_equal(
+            model.levels([[0.4, 0.4], [0.6, 0.8]]), [[0, 1], [1, 2]]))
+        self.assertRaises(ValueError, model.levels, [[0.4, 0.4, 0.4]])
+        self.assertRaises(ValueError, model.levels, [0.4, 0.4])
+        self.assertRaises(ValueError, FellegiSunter, prior=0)
+
+    def test_fellegi_sunter(self):
+        """test abydos.linkage.FellegiSunter
+        """
+        matrix, labels = self._sample()
+        model = FellegiSunter()
+        self.assertRaises(ValueError, model.match_weights, matrix)
+        self.assertRaises(ValueError, model.fit)
+        model.fit(matrix)
+        self.assertAlmostEqual(model.prior, labels.mean(), places=2)
+
+        # the estimates approach the levels' proportions in each class
+        levels = model.levels(matrix)
+        for col in range(3):
+            column = levels[:, col]
+            for probs, mask in ((model.m, labels), (model.u, ~labels)):
+                self.assertAlmostEqual(probs[col].sum(), 1)
+                mask = mask & (column >= 0)
+                observed = numpy.bincount(column[mask], minlength=4)
+                self.assertTrue(numpy.allclose(probs[col],
+                                               observed / mask.sum(),
+                                               atol=0.02))
+
+        # match weights increase with agreement & ignore missing values
+        weights = model.match_weights([[0.1, 0.1, 0.1], [0.95, 0.1, 0.1],
+                                       [0.95, 0.95, 0.95],
+                                       [0.95, float('nan'), float('nan')]])
+        self.assertTrue(numpy.all(numpy.diff(weights[:3]) > 0))
+        self.assertAlmostEqual(weights[3], numpy.log2(model.m[0][3] /
+                                                      model.u[0][3]))
+        probs = model.match_probability(matrix)
+        self.assertTrue(numpy.all((probs >= 0) & (probs <= 1)))
+        self.assertTrue(numpy.array_equal(model.predict(matrix, 0.9),
+                                          probs >= 0.9))
+
+        # the patterns of mini-batches give the same estimates
+        batched = FellegiSunter()
+        for batch in numpy.array_split(matrix, 7):
+            batched.partial_fit(batch)
+        batched.fit()
+        self.assertAlmostEqual(batched.prior, model.prior)
+        for col in range(3):
+            self.assertTrue(numpy.allclose(batched.m[col], model.m[col]))
+            self.assertTrue(numpy.allclose(batched.u[col], model.u[col]))
+
+        # evaluation against labelled pairs
+        table = model.evaluate(matrix, labels)
+        self.assertIsInstance(table, ConfusionTable)
+        self.assertEqual(table.population(), len(labels))
+        self.assertEqual(table.cond_pos_pop(), labels.sum())
+        self.assertGreater(table.f1_score(), 0.9)
+        strict = model.evaluate(matrix, labels, 0.999)
+        self.assertLessEqual(strict.test_pos_pop(), table.test_pos_pop())
+        self.assertRaises(ValueError, model.evaluate, matrix, labels[:-1])
+
+        # a comparison plan's matrix
+        plan = ComparisonPlan([('surname', sim_jaro_winkler),
+                               ('given', sim_editex), ('city', sim_dice)])
+        left = [{'surname': 'Niall', 'given': 'Anna', 'city': 'Boston'},
+                {'surname': 'Smith', 'given': 'John', 'city': None}]
+        right = [{'surname': 'Neil', 'given': 'Ann', 'city': 'Bostn'},
+                 {'surname': 'Smyth', 'given': 'Jon', 'city': 'Austin'}]
+        pairs = [(0, 0), (0, 1), (1, 0), (1, 1)]
+        self.assertTrue(numpy.array_equal(
+            model.predict(plan.compare(left, right, pairs)),
+            [True, False, False, True]))
+
+        # the fields of pruned pairs disagree, rather than being missing
+        plan = ComparisonPlan([('surname', sim_jaro_winkler),
+                               ('given', sim_editex), ('city', sim_dice)],
+                              min_sims=[0.9, None, None])
+        right = [{'surname': 'Nigel', 'given': 'Ann', 'city': 'Bostn'}]
+        matrix = plan.compare(left, right, [(0, 0)])
+        self.assertFalse(plan.matchable[0])
+        self.assertEqual(matrix[0, 1:].tolist(), [0, 0])
+        self.assertFalse(model.predict(matrix)[0])
+        self.assertTrue(model.predict([[matrix[0, 0], float('nan'),
+                                        float('nan')]])[0])
+
+
+if __name__ == '__main__':
+    unittest.main()